@@ -0,0 +1,94 @@
+from dataclasses import dataclass
+from typing import Collection
+from fastapi import HTTPException, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from .cache import TTLCache, register_cache
+from .core_config import settings
+from .models import Model, WorkspaceMember
+from .principals import evict_principal
+
+ADMIN_ROLES = frozenset({"owner", "admin"})
+
+
+@dataclass(frozen=True)
+class ModelRef:
+    """The parts of a ``Model`` row that authorization and validation read."""
+
+    id: int
+    workspace_id: int
+    slug: str
+    schema_version: int
+
+
+# Only granted roles are cached; a refused user is re-checked on every request
+# so being added to a workspace takes effect immediately on every worker.
+role_cache: TTLCache[str] = register_cache(
+    "workspace_roles", TTLCache(settings.authz_cache_size, settings.authz_cache_ttl)
+)
+model_registry: TTLCache[ModelRef] = register_cache(
+    "models", TTLCache(settings.authz_cache_size, settings.authz_cache_ttl)
+)
+
+
+async def resolve_role(session: AsyncSession, user_id: int, workspace_id: int) -> str | None:
+    role = role_cache.get((user_id, workspace_id))
+    if role is None:
+        result = await session.execute(
+            select(WorkspaceMember.role).where(
+                WorkspaceMember.user_id == user_id, WorkspaceMember.workspace_id == workspace_id
+            )
+        )
+        role = result.scalars().first()
+        if role is not None:
+            role_cache.set((user_id, workspace_id), role)
+    return role
+
+
+async def require_membership(
+    session: AsyncSession, user_id: int, workspace_id: int, roles: Collection[str] | None = None
+) -> str:
+    role = await resolve_role(session, user_id, workspace_id)
+    if role is None:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not a member of workspace")
+    if roles is not None and role not in roles:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Workspace admin role required")
+    return role
+
+
+async def resolve_model(session: AsyncSession, model_id: int) -> ModelRef:
+    ref = model_registry.get(model_id)
+    if ref is None:
+        result = await session.execute(
+            select(Model.id, Model.workspace_id, Model.slug, Model.schema_version).where(
+                Model.id == model_id, Model.deleted_at.is_(None)
+            )
+        )
+        row = result.first()
+        if row is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Model not found")
+        ref = ModelRef(id=row.id, workspace_id=row.workspace_id, slug=row.slug, schema_version=row.schema_version or 0)
+        model_registry.set(model_id, ref)
+    return ref
+
+
+async def get_authorized_model(
+    session: AsyncSession, model_id: int, user_id: int, roles: Collection[str] | None = None
+) -> ModelRef:
+    ref = await resolve_model(session, model_id)
+    await require_membership(session, user_id, ref.workspace_id, roles)
+    return ref
+
+
+def forget_model(model_id: int) -> None:
+    """Drop a model from the registry after it is renamed, changed or deleted."""
+    model_registry.pop(model_id)
+
+
+def invalidate_memberships(user_id: int | None = None, workspace_id: int | None = None) -> None:
+    """Forget cached roles after memberships of a user and/or workspace change."""
+    role_cache.discard(
+        lambda key: (user_id is None or key[0] == user_id) and (workspace_id is None or key[1] == workspace_id)
+    )
+    if user_id is not None:
+        evict_principal(user_id)
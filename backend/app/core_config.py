@@ -1,14 +1,61 @@
 from pydantic import BaseModel, Field
+import json
 import os
 
+
+def _plan_record_limits() -> dict[str, int | None]:
+    # PLAN_RECORD_LIMITS is a JSON object of plan name to per-model record
+    # limit; null means unlimited. The free plan defaults to FREE_RECORD_LIMIT.
+    limits = {"free": int(os.getenv("FREE_RECORD_LIMIT", "500"))}
+    limits.update(json.loads(os.getenv("PLAN_RECORD_LIMITS", "{}")))
+    return limits
+
+
 class Settings(BaseModel):
     app_name: str = "AtlasBuilder"
     api_prefix: str = "/api"
     db_url: str = Field(default_factory=lambda: os.getenv("DATABASE_URL", "postgresql+asyncpg://postgres:postgres@db:5432/atlas"))
+    db_pool_size: int = int(os.getenv("DB_POOL_SIZE", "10"))
+    db_max_overflow: int = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+    db_pool_timeout: float = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+    db_pool_recycle: int = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+    db_pool_pre_ping: bool = os.getenv("DB_POOL_PRE_PING", "true").lower() in {"1", "true", "yes"}
+    db_statement_cache_size: int = int(os.getenv("DB_STATEMENT_CACHE_SIZE", "100"))
+    # Behind pgbouncer in transaction mode: no client-side pool and no
+    # prepared statement caching, since a session may hop server connections.
+    db_pgbouncer: bool = os.getenv("DB_PGBOUNCER", "false").lower() in {"1", "true", "yes"}
     jwt_secret: str = Field(default_factory=lambda: os.getenv("JWT_SECRET", "dev-secret"))
     jwt_algorithm: str = "HS256"
     access_token_expires_minutes: int = 60 * 24
+    # Embed the email in access tokens so requests skip the user lookup
+    # entirely. Tokens then stay valid until they expire, even after logout
+    # or a password change.
+    auth_embedded_claims: bool = os.getenv("AUTH_EMBEDDED_CLAIMS", "false").lower() in {"1", "true", "yes"}
+    principal_cache_size: int = int(os.getenv("PRINCIPAL_CACHE_SIZE", "10000"))
+    principal_cache_ttl: float = float(os.getenv("PRINCIPAL_CACHE_TTL", "60"))
+    # bcrypt cost factor; stored hashes with a different cost are rehashed on
+    # the next successful login.
+    bcrypt_rounds: int = int(os.getenv("BCRYPT_ROUNDS", "12"))
+    password_hash_concurrency: int = int(os.getenv("PASSWORD_HASH_CONCURRENCY", "4"))
+    authz_cache_size: int = int(os.getenv("AUTHZ_CACHE_SIZE", "10000"))
+    authz_cache_ttl: float = float(os.getenv("AUTHZ_CACHE_TTL", "30"))
     free_record_limit: int = int(os.getenv("FREE_RECORD_LIMIT", "500"))
+    plan_record_limits: dict[str, int | None] = Field(default_factory=_plan_record_limits)
+    record_batch_max: int = int(os.getenv("RECORD_BATCH_MAX", "5000"))
+    # Record ids covered per data-migration batch, and the pause between batches.
+    migration_batch_size: int = int(os.getenv("MIGRATION_BATCH_SIZE", "1000"))
+    migration_throttle_ms: int = int(os.getenv("MIGRATION_THROTTLE_MS", "50"))
+    # Models with more records than this are deleted by a background purge job.
+    purge_sync_threshold: int = int(os.getenv("PURGE_SYNC_THRESHOLD", "10000"))
+    purge_batch_size: int = int(os.getenv("PURGE_BATCH_SIZE", "5000"))
+    purge_throttle_ms: int = int(os.getenv("PURGE_THROTTLE_MS", "50"))
+    schema_cache_size: int = int(os.getenv("SCHEMA_CACHE_SIZE", "512"))
+    schema_registry_ttl: float = float(os.getenv("SCHEMA_REGISTRY_TTL", "600"))
+    # Add a Server-Timing header (db, serialize, validate, total) to responses.
+    server_timing: bool = os.getenv("SERVER_TIMING", "true").lower() in {"1", "true", "yes"}
+    # Share of requests slower than SLOW_REQUEST_MS logged with EXPLAIN plans.
+    slow_request_ms: int = int(os.getenv("SLOW_REQUEST_MS", "500"))
+    slow_request_sample_rate: float = float(os.getenv("SLOW_REQUEST_SAMPLE_RATE", "0.1"))
     cors_origins: list[str] = Field(default_factory=lambda: os.getenv("CORS_ORIGINS", "http://localhost:3001,http://localhost:3000").split(","))
 
 settings = Settings()
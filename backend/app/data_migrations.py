@@ -0,0 +1,164 @@
+import asyncio
+import logging
+from datetime import datetime
+from functools import partial
+from typing import Any
+from sqlalchemy import Update, case, func, select, update
+from sqlalchemy.dialects.postgresql import JSONB, array
+from sqlalchemy.ext.asyncio import AsyncSession
+from .core_config import settings
+from .db import AsyncSessionLocal
+from .field_diff import FieldDiff
+from .indexes import field_expression, field_text, model_scope
+from .jobs import ACTIVE_STATUSES, JobFailed, claim_stale_jobs, create_job, run_job
+from .models import Job, Model, Record
+
+logger = logging.getLogger(__name__)
+
+MIGRATION_JOB_KIND = "migrate_records"
+WAIT_SECONDS = 2
+
+
+def migration_operations(diff: FieldDiff) -> list[dict[str, str]]:
+    """Document rewrites implied by a field diff: renames first, then type changes."""
+    operations = [{"op": "rename", "fields": dict(diff.renamed)}] if diff.renamed else []
+    operations += [
+        {"op": "retype", "field": slug, "from": old_type, "to": new_type}
+        for slug, old_type, new_type in diff.retyped
+    ]
+    return operations
+
+
+def _converted_value(slug: str, data_type: str):
+    if data_type in {"string", "text", "enum"}:
+        return func.to_jsonb(field_text(slug))
+    # Values that do not convert cleanly come back NULL from the cast functions;
+    # those keep their old value so the validate-records job can report them.
+    return func.to_jsonb(field_expression(slug, data_type))
+
+
+def operation_statement(model_id: int, operation: dict[str, str], low: int, high: int) -> Update:
+    """An UPDATE applying ``operation`` to records with ``low <= id < high``."""
+    data = Record.data
+    if operation["op"] == "rename":
+        # Jobs queued before renames were grouped carry one "from"/"to" pair.
+        renames = operation.get("fields") or {operation["from"]: operation["to"]}
+        # Every new key reads the original document, so chained (a -> b,
+        # b -> c) and swapped renames keep all values.
+        value = data.op("-", return_type=JSONB)(array(list(renames)))
+        for old, new in renames.items():
+            moved = case(
+                (data.has_key(old), func.jsonb_build_object(new, data.op("->", return_type=JSONB)(old))),
+                else_=func.jsonb_build_object(),
+            )
+            value = value.op("||", return_type=JSONB)(moved)
+        touched = data.has_any(array(list(renames)))
+    else:
+        key = operation["field"]
+        touched = data.has_key(key)
+        value = func.jsonb_set(
+            data,
+            array([key]),
+            func.coalesce(_converted_value(key, operation["to"]), data.op("->", return_type=JSONB)(key)),
+            type_=JSONB,
+        )
+    return (
+        update(Record)
+        .where(model_scope(model_id), Record.id >= low, Record.id < high, touched)
+        .values(data=value)
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def _wait_for_earlier_migrations(model_id: int, job_id: int) -> None:
+    # Operations of consecutive schema changes must apply in order (a -> b
+    # then b -> c), so a migration waits for older unfinished ones.
+    while True:
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(
+                select(Job.id).where(
+                    Job.kind == MIGRATION_JOB_KIND,
+                    Job.model_id == model_id,
+                    Job.id < job_id,
+                    Job.status.in_(ACTIVE_STATUSES),
+                ).limit(1)
+            )
+            if result.first() is None:
+                return
+            # Heartbeat so resume_migrations does not mistake waiting for dead.
+            await session.execute(update(Job).where(Job.id == job_id).values(updated_at=datetime.utcnow()))
+            await session.commit()
+        await asyncio.sleep(WAIT_SECONDS)
+
+
+def _next_batch(model_id: int, last_id: int, max_id: int):
+    """Highest id and row count of the model's next batch after ``last_id``."""
+    batch = (
+        select(Record.id)
+        .where(model_scope(model_id), Record.id > last_id, Record.id <= max_id)
+        .order_by(Record.id)
+        .limit(settings.migration_batch_size)
+        .subquery()
+    )
+    return select(func.max(batch.c.id), func.count()).select_from(batch)
+
+
+async def migrate_records(model_id: int, job_id: int) -> dict:
+    """Apply a migration job's operations batch by batch over the model's ids.
+
+    Batches walk the model's own ids in order, so records of other models
+    never cost empty batches. Every batch commits together with its
+    checkpoint (``result.last_id``), so a restarted job continues where it
+    stopped and no batch is applied twice.
+    """
+    await _wait_for_earlier_migrations(model_id, job_id)
+    async with AsyncSessionLocal() as session:
+        job = await session.get(Job, job_id)
+        checkpoint: dict[str, Any] = dict(job.result or {})
+        operations = checkpoint.get("operations", [])
+        if "max_id" not in checkpoint:
+            bounds = await session.execute(
+                select(func.max(Record.id), func.count()).where(model_scope(model_id))
+            )
+            max_id, total = bounds.one()
+            checkpoint.update(max_id=max_id or 0, total=total, last_id=0, processed=0, rows_updated=0)
+        elif "last_id" not in checkpoint:
+            # Checkpoint written by the id-range version of this job.
+            checkpoint.update(last_id=checkpoint["next_id"] - 1, processed=job.processed or 0)
+        job.total = checkpoint.get("total", job.total)
+        await session.commit()
+
+        while operations:
+            last_id = checkpoint["last_id"]
+            batch_end, count = (await session.execute(_next_batch(model_id, last_id, checkpoint["max_id"]))).one()
+            if not count:
+                break
+            try:
+                for operation in operations:
+                    result = await session.execute(operation_statement(model_id, operation, last_id + 1, batch_end + 1))
+                    checkpoint["rows_updated"] += result.rowcount or 0
+            except Exception as exc:
+                await session.rollback()
+                raise JobFailed(f"Migrating ids {last_id + 1}-{batch_end} failed: {exc}"[:1000], checkpoint)
+            checkpoint["last_id"] = batch_end
+            checkpoint["processed"] += count
+            job.result = dict(checkpoint)
+            job.processed = checkpoint["processed"]
+            await session.commit()
+            if settings.migration_throttle_ms:
+                await asyncio.sleep(settings.migration_throttle_ms / 1000)
+    return checkpoint
+
+
+def schedule_migration(session: AsyncSession, model: Model, user_id: int, operations: list[dict[str, str]]) -> Job:
+    job = create_job(session, MIGRATION_JOB_KIND, model.workspace_id, model_id=model.id, user_id=user_id)
+    job.result = {"operations": operations}
+    return job
+
+
+async def resume_migrations() -> None:
+    """Restart migrations left queued or abandoned by a stopped worker."""
+    jobs = await claim_stale_jobs(MIGRATION_JOB_KIND)
+    if jobs:
+        logger.info("Resuming record migration jobs %s", [job.id for job in jobs])
+    await asyncio.gather(*(run_job(job.id, partial(migrate_records, job.model_id)) for job in jobs))
@@ -1,19 +1,17 @@
-from typing import Generator
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import jwt, JWTError
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
 from .core_config import settings
 from .db import get_session
-from .models import User
+from .principals import Principal, get_principal, principal_from_claims
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.api_prefix}/auth/token")
 
 async def get_current_user(
     token: str = Depends(oauth2_scheme),
     session: AsyncSession = Depends(get_session),
-) -> User:
+) -> Principal:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -21,14 +19,17 @@ async def get_current_user(
     )
     try:
         payload = jwt.decode(token, settings.jwt_secret, algorithms=[settings.jwt_algorithm])
-        user_id: str | None = payload.get("sub")
-        if user_id is None:
-            raise credentials_exception
-    except JWTError:
+        user_id = int(payload["sub"])
+        token_version = int(payload.get("ver", 0))
+    except (JWTError, KeyError, TypeError, ValueError):
         raise credentials_exception
 
-    result = await session.execute(select(User).where(User.id == int(user_id)))
-    user = result.scalars().first()
-    if not user:
+    if settings.auth_embedded_claims:
+        principal = principal_from_claims(payload)
+        if principal is not None:
+            return principal
+
+    principal = await get_principal(session, user_id, token_version)
+    if principal is None:
         raise credentials_exception
-    return user
+    return principal
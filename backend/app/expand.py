@@ -0,0 +1,123 @@
+from collections import defaultdict
+from typing import Any, Sequence
+from fastapi import HTTPException, status
+from sqlalchemy import Integer, any_, literal, select
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.ext.asyncio import AsyncSession
+from .authz import resolve_model, resolve_role
+from .model_schema import ModelSchema, get_model_schema
+from .models import Record
+
+MAX_EXPAND_DEPTH = 2
+
+# {"customer": {"company": {}}} for expand=customer.company
+ExpandTree = dict[str, "ExpandTree"]
+
+
+def _invalid(path: str, error: str) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=[{"field": path, "error": error}]
+    )
+
+
+def parse_expand(expand: str | None) -> ExpandTree:
+    """Parse ``expand=customer,customer.company`` into a tree of relation slugs."""
+    tree: ExpandTree = {}
+    for path in (expand or "").split(","):
+        path = path.strip()
+        if not path:
+            continue
+        parts = path.split(".")
+        if not all(parts):
+            raise _invalid(path, "Invalid expand path")
+        if len(parts) > MAX_EXPAND_DEPTH:
+            raise _invalid(path, f"expand is limited to {MAX_EXPAND_DEPTH} levels")
+        node = tree
+        for part in parts:
+            node = node.setdefault(part, {})
+    return tree
+
+
+def _relation_id(data: Any, slug: str) -> int | None:
+    value = data.get(slug) if isinstance(data, dict) else None
+    return value if isinstance(value, int) and not isinstance(value, bool) else None
+
+
+async def _visible_workspaces(session: AsyncSession, user_id: int, workspace_ids: set[int]) -> set[int]:
+    return {ws for ws in workspace_ids if await resolve_role(session, user_id, ws) is not None}
+
+
+async def expand_records(
+    session: AsyncSession, schema: ModelSchema, records: Sequence[Record], tree: ExpandTree, user_id: int
+) -> list[dict[str, Any]]:
+    """Resolve the relation fields in ``tree`` for every record of a page.
+
+    Referenced ids are loaded with one ``id = ANY(...)`` query per target
+    model, and nested paths with one more round per level, so the cost does
+    not grow with the page size. Targets that are missing or in a workspace
+    the user cannot read expand to ``None``. Returns one ``{slug: related}``
+    mapping per record, in order.
+    """
+    fields = []
+    for slug in tree:
+        field = schema.field(slug)
+        if field is None or field.data_type != "relation":
+            raise _invalid(slug, "Only relation fields can be expanded")
+        fields.append(field)
+
+    wanted: dict[int | None, set[int]] = defaultdict(set)
+    for record in records:
+        for field in fields:
+            related_id = _relation_id(record.data, field.slug)
+            if related_id is not None:
+                wanted[field.relation_model_id].add(related_id)
+
+    found: dict[int | None, dict[int, Record]] = {}
+    for target_model_id, ids in wanted.items():
+        query = select(Record).where(Record.id == any_(literal(sorted(ids), ARRAY(Integer))))
+        if target_model_id is not None:
+            query = query.where(Record.model_id == target_model_id)
+        result = await session.execute(query)
+        found[target_model_id] = {related.id: related for related in result.scalars().all()}
+
+    workspaces = {related.workspace_id for rows in found.values() for related in rows.values()}
+    visible = await _visible_workspaces(session, user_id, workspaces)
+    for rows in found.values():
+        for related_id in [key for key, related in rows.items() if related.workspace_id not in visible]:
+            del rows[related_id]
+
+    nested: dict[tuple[str, int], dict[str, Any]] = {}
+    for field in fields:
+        if not tree[field.slug]:
+            continue
+        targets = found.get(field.relation_model_id, {})
+        by_model: dict[int, dict[int, Record]] = defaultdict(dict)
+        for record in records:
+            related = targets.get(_relation_id(record.data, field.slug))
+            if related is not None:
+                by_model[related.model_id][related.id] = related
+        for target_model_id, unique_records in by_model.items():
+            try:
+                target_model = await resolve_model(session, target_model_id)
+            except HTTPException:
+                # The target model is being deleted; leave its records unexpanded.
+                continue
+            target_schema = await get_model_schema(session, target_model)
+            related_records = list(unique_records.values())
+            expansions = await expand_records(session, target_schema, related_records, tree[field.slug], user_id)
+            for related, expansion in zip(related_records, expansions):
+                nested[(field.slug, related.id)] = expansion
+
+    expanded: list[dict[str, Any]] = []
+    for record in records:
+        values: dict[str, Any] = {}
+        for field in fields:
+            related = found.get(field.relation_model_id, {}).get(_relation_id(record.data, field.slug))
+            if related is None:
+                values[field.slug] = None
+                continue
+            values[field.slug] = {"id": related.id, "model_id": related.model_id, "data": related.data}
+            if (field.slug, related.id) in nested:
+                values[field.slug]["expanded"] = nested[(field.slug, related.id)]
+        expanded.append(values)
+    return expanded
@@ -0,0 +1,81 @@
+from dataclasses import dataclass, field
+from typing import Any, Sequence
+from .models import ModelField
+from .schemas import FieldUpdate
+
+FIELD_ATTRIBUTES = ("name", "slug", "data_type", "is_required", "is_unique", "position", "config")
+NEW_FIELD_DEFAULTS = {"is_required": False, "is_unique": False, "position": 0, "config": None}
+
+
+@dataclass
+class FieldDiff:
+    """Row-level changes needed to turn a model's fields into an incoming list."""
+
+    inserts: list[dict[str, Any]] = field(default_factory=list)
+    updates: list[tuple[ModelField, dict[str, Any]]] = field(default_factory=list)
+    deletes: list[ModelField] = field(default_factory=list)
+    errors: list[dict[str, str]] = field(default_factory=list)
+
+    @property
+    def changed(self) -> bool:
+        return bool(self.inserts or self.updates or self.deletes)
+
+    @property
+    def renamed(self) -> list[tuple[str, str]]:
+        return [(row.slug, changes["slug"]) for row, changes in self.updates if "slug" in changes]
+
+    @property
+    def retyped(self) -> list[tuple[str, str, str]]:
+        """``(current slug, old type, new type)`` for fields whose type changes."""
+        return [
+            (changes.get("slug", row.slug), row.data_type, changes["data_type"])
+            for row, changes in self.updates
+            if "data_type" in changes
+        ]
+
+
+def diff_fields(existing: Sequence[ModelField], incoming: Sequence[FieldUpdate]) -> FieldDiff:
+    """Match ``incoming`` to ``existing`` by id, then by slug.
+
+    ``incoming`` is the complete field list: unmatched existing rows are
+    deleted, unmatched incoming entries are inserted. On matched rows, omitted
+    attributes keep their stored value.
+    """
+    diff = FieldDiff()
+    by_id = {row.id: row for row in existing}
+    by_slug = {row.slug: row for row in existing}
+    matched: set[int] = set()
+    seen_slugs: set[str] = set()
+
+    for item in incoming:
+        values = item.model_dump(exclude_unset=True, exclude={"id"})
+        values = {key: value for key, value in values.items() if value is not None or key == "config"}
+        row = by_id.get(item.id) if item.id is not None else None
+        if row is None and item.id is None:
+            row = by_slug.get(item.slug)
+        if row is not None and row.id in matched:
+            row = None
+
+        slug = values.get("slug", row.slug if row is not None else None)
+        if slug in seen_slugs:
+            diff.errors.append({"field": slug, "error": "Duplicate field slug"})
+            continue
+        if slug:
+            seen_slugs.add(slug)
+
+        if row is None:
+            if item.id is not None:
+                diff.errors.append({"field": slug or str(item.id), "error": "Unknown field id"})
+            elif not values.get("name") or not slug or not values.get("data_type"):
+                diff.errors.append({"field": slug or "", "error": "Fields must include name, slug, and data_type"})
+            else:
+                diff.inserts.append({**NEW_FIELD_DEFAULTS, **values})
+            continue
+
+        matched.add(row.id)
+        changes = {key: value for key, value in values.items() if getattr(row, key) != value}
+        if changes:
+            diff.updates.append((row, changes))
+
+    diff.deletes = [row for row in existing if row.id not in matched]
+    return diff
@@ -0,0 +1,314 @@
+import hashlib
+import json
+import logging
+from typing import Any, Iterable
+from sqlalchemy import Boolean, Date, DateTime, Numeric, Text, func, literal, select, text
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+from .db import AsyncSessionLocal, engine
+from .models import FieldIndex, ModelField, Record
+
+logger = logging.getLogger(__name__)
+
+# CREATE/DROP INDEX CONCURRENTLY cannot run inside a transaction block.
+autocommit_engine = engine.execution_options(isolation_level="AUTOCOMMIT")
+
+# Text -> typed casts used by expression indexes and typed filters/sorts. The
+# plain casts are not IMMUTABLE (date parsing depends on DateStyle/TimeZone)
+# and raise on malformed documents, so they are wrapped in functions that pin
+# the settings and return NULL instead of failing the index build.
+CAST_FUNCTIONS = {
+    "number": ("records_numeric", Numeric),
+    "relation": ("records_numeric", Numeric),
+    "boolean": ("records_boolean", Boolean),
+    "date": ("records_date", Date),
+    "datetime": ("records_timestamptz", DateTime(timezone=True)),
+}
+
+CAST_FUNCTIONS_SQL = [
+    # Trigram operators for record search; pg_trgm is a trusted extension, so
+    # the database owner can create it.
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    r"""
+    CREATE OR REPLACE FUNCTION records_numeric(value text) RETURNS numeric
+    LANGUAGE sql IMMUTABLE PARALLEL SAFE AS $$
+        SELECT CASE WHEN value ~ '^-?[0-9]+(\.[0-9]+)?([eE][-+]?[0-9]+)?$' THEN value::numeric END
+    $$
+    """,
+    """
+    CREATE OR REPLACE FUNCTION records_boolean(value text) RETURNS boolean
+    LANGUAGE sql IMMUTABLE PARALLEL SAFE AS $$
+        SELECT CASE value WHEN 'true' THEN true WHEN 'false' THEN false END
+    $$
+    """,
+    """
+    CREATE OR REPLACE FUNCTION records_date(value text) RETURNS date
+    LANGUAGE plpgsql IMMUTABLE PARALLEL SAFE SET datestyle = 'ISO, YMD' SET timezone = 'UTC' AS $$
+    BEGIN
+        RETURN value::timestamp::date;
+    EXCEPTION WHEN others THEN
+        RETURN NULL;
+    END;
+    $$
+    """,
+    """
+    CREATE OR REPLACE FUNCTION records_search_text(data jsonb) RETURNS text
+    LANGUAGE sql IMMUTABLE PARALLEL SAFE AS $$
+        SELECT coalesce(string_agg(value #>> '{}', ' ' ORDER BY key), '')
+        FROM jsonb_each(data) WHERE jsonb_typeof(value) = 'string'
+    $$
+    """,
+    """
+    CREATE OR REPLACE FUNCTION records_timestamptz(value text) RETURNS timestamptz
+    LANGUAGE plpgsql IMMUTABLE PARALLEL SAFE SET datestyle = 'ISO, YMD' SET timezone = 'UTC' AS $$
+    BEGIN
+        RETURN value::timestamptz;
+    EXCEPTION WHEN others THEN
+        RETURN NULL;
+    END;
+    $$
+    """,
+]
+
+
+async def install_cast_functions(connection: AsyncConnection) -> None:
+    for statement in CAST_FUNCTIONS_SQL:
+        await connection.exec_driver_sql(statement)
+
+
+def field_text(slug: str):
+    # Render the key inline so Postgres can match the expression against the
+    # per-field indexes (a bound parameter is opaque to the planner).
+    return Record.data.op("->>", return_type=Text)(literal(slug, literal_execute=True))
+
+
+def field_expression(slug: str, data_type: str):
+    cast = CAST_FUNCTIONS.get(data_type)
+    if cast is None:
+        return field_text(slug)
+    function_name, type_ = cast
+    return getattr(func, function_name)(field_text(slug), type_=type_)
+
+
+def model_scope(model_id: int):
+    # Inlined for the same reason as field_text: the per-model partial indexes
+    # are only usable when the planner can see the model id.
+    return Record.model_id == literal(int(model_id), literal_execute=True)
+
+
+def unique_text(value: Any) -> str:
+    """Render a value the way ``data->>slug`` returns it from JSONB."""
+    if isinstance(value, str):
+        return value
+    return json.dumps(value)
+
+
+def _quote_literal(value: str) -> str:
+    return "'" + value.replace("'", "''") + "'"
+
+
+def _expression_sql(slug: str, data_type: str | None = None) -> str:
+    expression = f"data ->> {_quote_literal(slug)}"
+    cast = CAST_FUNCTIONS.get(data_type or "")
+    return f"{cast[0]}({expression})" if cast else expression
+
+
+def unique_index_name(model_id: int, slug: str) -> str:
+    digest = hashlib.md5(slug.encode("utf-8")).hexdigest()[:12]
+    return f"uq_records_{int(model_id)}_{digest}"
+
+
+def field_index_name(model_id: int, slug: str, data_type: str) -> str:
+    digest = hashlib.md5(f"{slug}:{data_type}".encode("utf-8")).hexdigest()[:12]
+    return f"ix_records_{int(model_id)}_{digest}"
+
+
+def is_indexed(field: ModelField) -> bool:
+    return isinstance(field.config, dict) and bool(field.config.get("indexed"))
+
+
+async def has_duplicate_values(session: AsyncSession, model_id: int, slug: str) -> bool:
+    """Whether existing records of the model share a value of ``slug``."""
+    value = field_text(slug)
+    result = await session.execute(
+        select(literal(1))
+        .where(model_scope(model_id), value.is_not(None))
+        .group_by(value)
+        .having(func.count() > 1)
+        .limit(1)
+    )
+    return result.first() is not None
+
+
+async def unique_index_errors(session: AsyncSession, model_id: int, slugs: Iterable[str]) -> list[dict[str, str]]:
+    """Field errors for ``slugs`` whose existing values are not unique.
+
+    Runs inside the caller's transaction, before the schema change commits;
+    the indexes themselves are built afterwards by :func:`build_unique_indexes`.
+    """
+    return [
+        {"field": slug, "error": "Existing records contain duplicate values"}
+        for slug in sorted(slugs)
+        if await has_duplicate_values(session, model_id, slug)
+    ]
+
+
+async def build_unique_indexes(model_id: int, slugs: Iterable[str]) -> list[dict[str, str]]:
+    """Build the unique indexes for ``slugs`` without blocking writes to records.
+
+    Runs after the schema change has committed: a concurrent build waits for
+    every open transaction, including the caller's. Until an index is valid,
+    the pre-check in record validation is what enforces uniqueness. Returns
+    field errors for builds that failed because duplicates slipped in.
+    """
+    errors: list[dict[str, str]] = []
+    async with autocommit_engine.connect() as connection:
+        for slug in sorted(slugs):
+            name = unique_index_name(model_id, slug)
+            # A failed concurrent build leaves an INVALID index behind.
+            await connection.exec_driver_sql(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+            try:
+                await connection.exec_driver_sql(
+                    f"CREATE UNIQUE INDEX CONCURRENTLY {name} "
+                    f"ON records (({_expression_sql(slug)})) WHERE model_id = {int(model_id)}"
+                )
+            except IntegrityError:
+                await connection.exec_driver_sql(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+                errors.append({"field": slug, "error": "Existing records contain duplicate values"})
+    return errors
+
+
+def unique_violation_field(exc: IntegrityError, model_id: int, slugs: Iterable[str]) -> str | None:
+    cause = getattr(exc.orig, "__cause__", None)
+    constraint = getattr(cause, "constraint_name", None) or str(exc.orig)
+    for slug in slugs:
+        if unique_index_name(model_id, slug) in constraint:
+            return slug
+    return None
+
+
+async def sync_field_indexes(session: AsyncSession, model_id: int) -> list[str]:
+    """Reconcile ``field_indexes`` rows with the model's ``indexed`` fields.
+
+    Only bookkeeping happens here, inside the caller's transaction; the DDL
+    runs afterwards in :func:`run_index_maintenance`. Returns the names of the
+    indexes that still need to be built or dropped.
+    """
+    fields_result = await session.execute(select(ModelField).where(ModelField.model_id == model_id))
+    desired = {(field.slug, field.data_type) for field in fields_result.scalars().all() if is_indexed(field)}
+
+    indexes_result = await session.execute(select(FieldIndex).where(FieldIndex.model_id == model_id))
+    existing = {(index.field_slug, index.data_type): index for index in indexes_result.scalars().all()}
+
+    for key, index in existing.items():
+        if key not in desired:
+            index.status = "dropping"
+        elif index.status in {"failed", "dropping"}:
+            index.status = "pending"
+            index.error = None
+
+    pending = [index.index_name for index in existing.values() if index.status != "ready"]
+    for slug, data_type in desired - existing.keys():
+        index_name = field_index_name(model_id, slug, data_type)
+        session.add(
+            FieldIndex(
+                model_id=model_id,
+                field_slug=slug,
+                data_type=data_type,
+                index_name=index_name,
+                status="pending",
+            )
+        )
+        pending.append(index_name)
+    return sorted(pending)
+
+
+async def _set_status(index_id: int, status: str, error: str | None = None) -> None:
+    async with AsyncSessionLocal() as session:
+        index = await session.get(FieldIndex, index_id)
+        if index is None:
+            return
+        index.status = status
+        index.error = error
+        await session.commit()
+
+
+async def _build_index(index: FieldIndex) -> None:
+    await _set_status(index.id, "building")
+    statement = (
+        f"CREATE INDEX CONCURRENTLY {index.index_name} ON records "
+        f"(({_expression_sql(index.field_slug, index.data_type)})) WHERE model_id = {int(index.model_id)}"
+    )
+    try:
+        async with autocommit_engine.connect() as connection:
+            # A failed concurrent build leaves an INVALID index behind.
+            await connection.exec_driver_sql(f"DROP INDEX CONCURRENTLY IF EXISTS {index.index_name}")
+            await connection.exec_driver_sql(statement)
+    except Exception as exc:
+        logger.exception("Building index %s failed", index.index_name)
+        await _set_status(index.id, "failed", str(exc)[:1000])
+        return
+    await _set_status(index.id, "ready")
+
+
+async def drop_indexes(index_names: Iterable[str]) -> None:
+    async with autocommit_engine.connect() as connection:
+        for name in index_names:
+            await connection.exec_driver_sql(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+
+
+async def run_index_maintenance(model_id: int) -> None:
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(
+            select(FieldIndex)
+            .where(FieldIndex.model_id == model_id, FieldIndex.status.in_(["pending", "dropping"]))
+            .order_by(FieldIndex.id)
+        )
+        indexes = result.scalars().all()
+
+    for index in indexes:
+        if index.status == "pending":
+            await _build_index(index)
+            continue
+        try:
+            await drop_indexes([index.index_name])
+        except Exception:
+            logger.exception("Dropping index %s failed", index.index_name)
+            continue
+        async with AsyncSessionLocal() as session:
+            stale = await session.get(FieldIndex, index.id)
+            if stale is not None and stale.status == "dropping":
+                await session.delete(stale)
+                await session.commit()
+
+
+async def index_statistics(session: AsyncSession, index_names: list[str]) -> dict[str, dict[str, Any]]:
+    if not index_names:
+        return {}
+    stats: dict[str, dict[str, Any]] = {name: {} for name in index_names}
+    sizes = await session.execute(
+        text(
+            "SELECT c.relname, pg_relation_size(c.oid) FROM pg_class c "
+            "WHERE c.relkind = 'i' AND c.relname = ANY(:names)"
+        ),
+        {"names": index_names},
+    )
+    for name, size in sizes.all():
+        stats[name]["size_bytes"] = size
+    progress = await session.execute(
+        text(
+            "SELECT c.relname, p.phase, p.blocks_done, p.blocks_total, p.tuples_done, p.tuples_total "
+            "FROM pg_stat_progress_create_index p JOIN pg_class c ON c.oid = p.index_relid "
+            "WHERE c.relname = ANY(:names)"
+        ),
+        {"names": index_names},
+    )
+    for name, phase, blocks_done, blocks_total, tuples_done, tuples_total in progress.all():
+        stats[name]["progress"] = {
+            "phase": phase,
+            "blocks_done": blocks_done,
+            "blocks_total": blocks_total,
+            "tuples_done": tuples_done,
+            "tuples_total": tuples_total,
+        }
+    return stats
@@ -0,0 +1,248 @@
+import asyncio
+import logging
+import random
+import re
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterator
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from .core_config import settings
+
+logger = logging.getLogger(__name__)
+
+SLOWEST_STATEMENTS = 3
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+_EXPLAINABLE = re.compile(r"^\s*(select|with|insert|update|delete)\b", re.IGNORECASE)
+
+
+@dataclass
+class RequestTimings:
+    """What one request spent, collected while it runs."""
+
+    queries: int = 0
+    db_seconds: float = 0.0
+    phases: dict[str, float] = field(default_factory=lambda: defaultdict(float))
+    # (seconds, statement, parameters), slowest first
+    slowest: list[tuple[float, str, Any]] = field(default_factory=list)
+    # Set once the response is sent; background tasks run after that in the
+    # same context and must not be charged to the request.
+    done: bool = False
+
+    def record_query(self, seconds: float, statement: str, parameters: Any, executemany: bool = False) -> None:
+        if self.done:
+            return
+        self.queries += 1
+        self.db_seconds += seconds
+        # executemany batches cannot be explained as one statement.
+        if executemany:
+            return
+        if len(self.slowest) < SLOWEST_STATEMENTS or seconds > self.slowest[-1][0]:
+            self.slowest.append((seconds, statement, parameters))
+            self.slowest.sort(key=lambda entry: entry[0], reverse=True)
+            del self.slowest[SLOWEST_STATEMENTS:]
+
+
+current_timings: ContextVar[RequestTimings | None] = ContextVar("current_timings", default=None)
+
+
+@contextmanager
+def timed(phase: str) -> Iterator[None]:
+    """Add the time spent in the block to the current request's ``phase``."""
+    timings = current_timings.get()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        if timings is not None and not timings.done:
+            timings.phases[phase] += time.perf_counter() - start
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    seconds = time.perf_counter() - conn.info["query_start"].pop()
+    timings = current_timings.get()
+    if timings is not None:
+        timings.record_query(seconds, statement, parameters, executemany)
+
+
+def _handle_error(context) -> None:
+    # Failed statements never reach after_cursor_execute; without this their
+    # start times would pile up on the pooled connection.
+    conn = context.connection
+    starts = conn.info.get("query_start") if conn is not None else None
+    if not starts:
+        return
+    seconds = time.perf_counter() - starts.pop()
+    timings = current_timings.get()
+    if timings is not None:
+        executemany = bool(context.execution_context and context.execution_context.executemany)
+        timings.record_query(seconds, context.statement, context.parameters, executemany)
+
+
+def instrument_engine(sync_engine: Engine) -> None:
+    # SQLAlchemy runs these inside the awaiting task's context, so the
+    # ContextVar resolves to the request that issued the statement.
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(sync_engine, "handle_error", _handle_error)
+
+
+class Histogram:
+    """Cumulative-bucket histogram per label set, in Prometheus terms."""
+
+    def __init__(self, buckets: tuple[float, ...] = DURATION_BUCKETS):
+        self.buckets = buckets
+        self._series: dict[tuple[str, ...], list[float]] = {}
+
+    def observe(self, labels: tuple[str, ...], value: float) -> None:
+        # counts per bucket (+Inf last), then sum and count
+        series = self._series.setdefault(labels, [0.0] * (len(self.buckets) + 3))
+        series[bisect_left(self.buckets, value)] += 1
+        series[-2] += value
+        series[-1] += 1
+
+    def render(self, name: str, label_names: tuple[str, ...]) -> list[str]:
+        lines = [f"# TYPE {name} histogram"]
+        for labels, series in sorted(self._series.items()):
+            label_text = ",".join(f'{key}="{_escape(value)}"' for key, value in zip(label_names, labels))
+            cumulative = 0.0
+            for bound, count in zip([*map(str, self.buckets), "+Inf"], series):
+                cumulative += count
+                lines.append(f'{name}_bucket{{{label_text},le="{bound}"}} {cumulative:g}')
+            lines.append(f"{name}_sum{{{label_text}}} {series[-2]:.6f}")
+            lines.append(f"{name}_count{{{label_text}}} {series[-1]:g}")
+        return lines
+
+
+request_duration = Histogram()
+request_db_duration = Histogram()
+request_queries: dict[tuple[str, ...], int] = defaultdict(int)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _gauges(name: str, label: str, stats: dict[str, dict[str, Any]]) -> list[str]:
+    lines = []
+    for key, values in sorted(stats.items()):
+        for stat, value in sorted(values.items()):
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                lines.append(f'{name}_{stat}{{{label}="{_escape(key)}"}} {value:g}')
+    return lines
+
+
+def render_metrics(extra: dict[str, dict[str, dict[str, Any]]]) -> str:
+    """Prometheus text exposition of request metrics plus ``extra`` gauge groups.
+
+    ``extra`` maps a metric prefix to ``{label value: {stat: number}}``.
+    """
+    lines = request_duration.render("http_request_duration_seconds", ("method", "route", "status"))
+    lines += request_db_duration.render("http_request_db_seconds", ("method", "route"))
+    lines.append("# TYPE http_request_db_queries_total counter")
+    for (method, route), count in sorted(request_queries.items()):
+        lines.append(f'http_request_db_queries_total{{method="{method}",route="{_escape(route)}"}} {count}')
+    for prefix, stats in extra.items():
+        lines += _gauges(prefix, "name", stats)
+    return "\n".join(lines) + "\n"
+
+
+def server_timing(timings: RequestTimings, total: float) -> str:
+    entries = [f'db;dur={timings.db_seconds * 1000:.1f};desc="{timings.queries} queries"']
+    entries += [f"{phase};dur={seconds * 1000:.1f}" for phase, seconds in timings.phases.items()]
+    entries.append(f"total;dur={total * 1000:.1f}")
+    return ", ".join(entries)
+
+
+slow_request_tasks: set[asyncio.Task] = set()
+
+
+async def log_slow_request(
+    label: str, total: float, timings: RequestTimings, connect: Callable[[], Any]
+) -> None:
+    """Log a slow request with the plans of its slowest statements.
+
+    Only the SQL and plans are logged, never parameter values. ``EXPLAIN``
+    without ``ANALYZE`` plans the statement without running it.
+    """
+    current_timings.set(None)
+    plans = []
+    try:
+        async with connect() as connection:
+            for seconds, statement, parameters in timings.slowest:
+                if not _EXPLAINABLE.match(statement):
+                    continue
+                result = await connection.exec_driver_sql(f"EXPLAIN {statement}", parameters)
+                plan = "\n".join(row[0] for row in result.all())
+                plans.append(f"-- {seconds * 1000:.1f} ms\n{statement}\n{plan}")
+    except Exception:
+        logger.exception("Could not explain statements of slow request %s", label)
+    logger.warning(
+        "Slow request %s: %.1f ms, %d queries, %.1f ms in database\n%s",
+        label,
+        total * 1000,
+        timings.queries,
+        timings.db_seconds * 1000,
+        "\n\n".join(plans),
+    )
+
+
+class InstrumentationMiddleware:
+    """Time each HTTP request, add ``Server-Timing`` and feed ``/metrics``.
+
+    A plain ASGI middleware: the request runs in the caller's context, so the
+    engine hooks see the same ``RequestTimings``.
+    """
+
+    def __init__(self, app, connect: Callable[[], Any]):
+        self.app = app
+        self.connect = connect
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        timings = RequestTimings()
+        token = current_timings.set(timings)
+        start = time.perf_counter()
+        status_code = 500
+
+        async def send_with_timing(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if settings.server_timing:
+                    header = server_timing(timings, time.perf_counter() - start).encode()
+                    message = {**message, "headers": [*message.get("headers", []), (b"server-timing", header)]}
+            await send(message)
+            if message["type"] == "http.response.body" and not message.get("more_body", False):
+                self._finish(scope, timings, time.perf_counter() - start, status_code)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            current_timings.reset(token)
+            # Requests that failed before sending a complete response.
+            self._finish(scope, timings, time.perf_counter() - start, status_code)
+
+    def _finish(self, scope, timings: RequestTimings, total: float, status_code: int) -> None:
+        if timings.done:
+            return
+        timings.done = True
+        route = getattr(scope.get("route"), "path", None) or "unmatched"
+        method = scope["method"]
+        request_duration.observe((method, route, str(status_code)), total)
+        request_db_duration.observe((method, route), timings.db_seconds)
+        request_queries[(method, route)] += timings.queries
+        if total * 1000 >= settings.slow_request_ms and random.random() < settings.slow_request_sample_rate:
+            task = asyncio.create_task(log_slow_request(f"{method} {route}", total, timings, self.connect))
+            slow_request_tasks.add(task)
+            task.add_done_callback(slow_request_tasks.discard)
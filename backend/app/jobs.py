@@ -0,0 +1,81 @@
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
+from .db import AsyncSessionLocal
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+JobWork = Callable[[int], Awaitable[dict | None]]
+
+ACTIVE_STATUSES = ("queued", "running")
+# An active job that has not written progress for this long is assumed to
+# belong to a dead worker and may be resumed by another one.
+STALE_AFTER = timedelta(minutes=5)
+
+
+class JobFailed(Exception):
+    """Raised by job work to fail the job while still recording a result."""
+
+    def __init__(self, message: str, result: dict | None = None):
+        super().__init__(message)
+        self.result = result
+
+
+def create_job(
+    session: AsyncSession, kind: str, workspace_id: int, model_id: int | None = None, user_id: int | None = None
+) -> Job:
+    job = Job(kind=kind, workspace_id=workspace_id, model_id=model_id, created_by=user_id, status="queued")
+    session.add(job)
+    return job
+
+
+async def update_job(job_id: int, **values: Any) -> None:
+    # Progress is written from its own short transaction so pollers see it
+    # while the job's work is still running.
+    async with AsyncSessionLocal() as session:
+        job = await session.get(Job, job_id)
+        if job is None:
+            return
+        for key, value in values.items():
+            setattr(job, key, value)
+        await session.commit()
+
+
+async def claim_stale_jobs(kind: str) -> list[Job]:
+    """Mark abandoned jobs of ``kind`` as running again and return them.
+
+    Claiming bumps ``updated_at`` so workers starting at the same time do not
+    resume the same job twice.
+    """
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(
+            update(Job)
+            .where(
+                Job.kind == kind,
+                Job.status.in_(ACTIVE_STATUSES),
+                Job.updated_at < datetime.utcnow() - STALE_AFTER,
+            )
+            .values(status="running", updated_at=datetime.utcnow())
+            .returning(Job)
+        )
+        claimed = list(result.scalars().all())
+        await session.commit()
+    return sorted(claimed, key=lambda job: job.id)
+
+
+async def run_job(job_id: int, work: JobWork) -> None:
+    """Run ``work(job_id)`` and record its outcome on the job row."""
+    await update_job(job_id, status="running")
+    try:
+        result = await work(job_id)
+    except JobFailed as exc:
+        await update_job(job_id, status="failed", error=str(exc), result=exc.result)
+        return
+    except Exception as exc:
+        logger.exception("Job %s failed", job_id)
+        await update_job(job_id, status="failed", error=str(exc)[:1000])
+        return
+    await update_job(job_id, status="succeeded", result=result)
@@ -1,33 +1,87 @@
 import asyncio
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
+from .cache import cache_stats
 from .core_config import settings
-from .db import engine, Base
-from .routers import auth, workspaces, models, records
+from .data_migrations import resume_migrations
+from .db import engine, Base, pool_stats
+from .indexes import install_cast_functions
+from .instrumentation import InstrumentationMiddleware, instrument_engine, render_metrics
+from .purge import resume_purges
+from .security import password_hashing_stats
+from .schema_registry import listen_for_model_changes
+from .unique_indexes import resume_unique_indexes
+from .routers import auth, workspaces, models, records, imports, exports, jobs
+
+background_tasks: set[asyncio.Task] = set()
 
 app = FastAPI(title=settings.app_name, openapi_url=f"{settings.api_prefix}/openapi.json")
 
+instrument_engine(engine.sync_engine)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.cors_origins,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing"],
 )
+# Added last so it wraps CORS and times the whole request.
+app.add_middleware(InstrumentationMiddleware, connect=engine.connect)
 
 app.include_router(auth.router, prefix=settings.api_prefix)
 app.include_router(workspaces.router, prefix=settings.api_prefix)
 app.include_router(workspaces.legacy_router, prefix=settings.api_prefix)
 app.include_router(models.router, prefix=settings.api_prefix)
 app.include_router(records.router, prefix=settings.api_prefix)
+app.include_router(imports.router, prefix=settings.api_prefix)
+app.include_router(exports.router, prefix=settings.api_prefix)
+app.include_router(jobs.router, prefix=settings.api_prefix)
 
 
 @app.on_event("startup")
 async def on_startup() -> None:
     async with engine.begin() as conn:
+        await install_cast_functions(conn)
         await conn.run_sync(Base.metadata.create_all)
+    # LISTEN needs a session-pinned connection, which pgbouncer's transaction
+    # mode cannot provide; the registry TTL bounds staleness there instead.
+    if not settings.db_pgbouncer:
+        background_tasks.add(asyncio.create_task(listen_for_model_changes()))
+    background_tasks.add(asyncio.create_task(resume_migrations()))
+    background_tasks.add(asyncio.create_task(resume_purges()))
+    background_tasks.add(asyncio.create_task(resume_unique_indexes()))
+
+
+@app.on_event("shutdown")
+async def on_shutdown() -> None:
+    for task in background_tasks:
+        task.cancel()
+    await asyncio.gather(*background_tasks, return_exceptions=True)
+    background_tasks.clear()
 
 
 @app.get("/health")
 async def healthcheck():
-    return {"status": "ok"}
+    return {
+        "status": "ok",
+        "caches": cache_stats(),
+        "password_hashing": password_hashing_stats(),
+        "db_pool": pool_stats(),
+    }
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    return PlainTextResponse(
+        render_metrics(
+            {
+                "atlas_cache": cache_stats(),
+                "atlas_password_hashing": {"bcrypt": password_hashing_stats()},
+                "atlas_db_pool": {"default": pool_stats()},
+            }
+        ),
+        media_type="text/plain; version=0.0.4",
+    )
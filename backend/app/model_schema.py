@@ -0,0 +1,246 @@
+import math
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Any, Callable, Iterable
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from .authz import ModelRef
+from .core_config import settings
+from .models import Model, ModelField
+
+FieldCheck = Callable[[Any], "str | None"]
+
+
+def coerce_date(value: Any) -> date:
+    if isinstance(value, (datetime, date)):
+        return value.date() if isinstance(value, datetime) else value
+    if isinstance(value, str):
+        return datetime.fromisoformat(value).date()
+    raise ValueError("Invalid date")
+
+
+def _check_string(value: Any) -> str | None:
+    return None if isinstance(value, str) else "Must be a string"
+
+
+def _check_number(value: Any) -> str | None:
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return "Must be a number"
+    return None
+
+
+def _check_boolean(value: Any) -> str | None:
+    return None if isinstance(value, bool) else "Must be a boolean"
+
+
+def _check_date(value: Any) -> str | None:
+    coerce_date(value)
+    return None
+
+
+def _check_datetime(value: Any) -> str | None:
+    if isinstance(value, str):
+        datetime.fromisoformat(value)
+    elif not isinstance(value, datetime):
+        return "Must be a datetime string or object"
+    return None
+
+
+def _check_relation(value: Any) -> str | None:
+    return None if isinstance(value, int) else "Must reference related record id"
+
+
+def _check_unsupported(value: Any) -> str | None:
+    return "Unsupported field type"
+
+
+def _enum_check(config: Any) -> FieldCheck:
+    options: Iterable[Any] = []
+    if isinstance(config, dict):
+        options = config.get("values") or config.get("options") or []
+    try:
+        allowed: frozenset | tuple = frozenset(options)
+    except TypeError:
+        allowed = tuple(options)
+
+    def check(value: Any) -> str | None:
+        try:
+            permitted = value in allowed
+        except TypeError:
+            permitted = False
+        return None if permitted else "Value not permitted"
+
+    return check
+
+
+TYPE_CHECKS: dict[str, FieldCheck] = {
+    "string": _check_string,
+    "text": _check_string,
+    "number": _check_number,
+    "boolean": _check_boolean,
+    "date": _check_date,
+    "datetime": _check_datetime,
+    "relation": _check_relation,
+}
+
+
+@dataclass(frozen=True)
+class CompiledField:
+    slug: str
+    data_type: str
+    is_required: bool
+    is_unique: bool
+    check: FieldCheck
+    relation_workspace_id: int | None = None
+    relation_model_id: int | None = None
+
+    def validate(self, value: Any) -> str | None:
+        if value is None:
+            return "Field cannot be null"
+        try:
+            return self.check(value)
+        except Exception:
+            return "Invalid value"
+
+
+_TRUE_TEXT = {"true", "1", "yes", "y"}
+_FALSE_TEXT = {"false", "0", "no", "n"}
+
+
+def coerce_text(field: CompiledField, raw: str) -> Any:
+    """Turn a flat-file cell into the JSON value ``field`` expects.
+
+    Only the representation changes; the result still goes through
+    :meth:`CompiledField.validate`. Raises ``ValueError`` when the cell
+    cannot be converted.
+    """
+    if field.data_type == "number":
+        try:
+            return int(raw)
+        except ValueError:
+            number = float(raw)
+            if not math.isfinite(number):
+                raise ValueError(raw)
+            return number
+    if field.data_type == "relation":
+        return int(raw)
+    if field.data_type == "boolean":
+        lowered = raw.strip().lower()
+        if lowered in _TRUE_TEXT:
+            return True
+        if lowered in _FALSE_TEXT:
+            return False
+        raise ValueError(raw)
+    return raw
+
+
+@dataclass(frozen=True)
+class ModelSchema:
+    model_id: int
+    workspace_id: int
+    version: int
+    fields: tuple[CompiledField, ...]
+    required: frozenset[str]
+    unique_fields: tuple[CompiledField, ...]
+    relation_fields: tuple[CompiledField, ...]
+
+    @property
+    def unique_slugs(self) -> list[str]:
+        return [field.slug for field in self.unique_fields]
+
+    def field(self, slug: str) -> CompiledField | None:
+        for field in self.fields:
+            if field.slug == slug:
+                return field
+        return None
+
+    def check(self, data: dict) -> dict[str, str]:
+        """Run the database-free checks; returns ``{slug: error}`` in field order."""
+        errors: dict[str, str] = {}
+        missing = self.required.difference(data)
+        for field in self.fields:
+            if field.slug in missing:
+                errors[field.slug] = "Field is required"
+            elif field.slug in data:
+                error = field.validate(data[field.slug])
+                if error:
+                    errors[field.slug] = error
+        return errors
+
+
+def compile_field(field: ModelField, default_workspace_id: int) -> CompiledField:
+    config = field.config if isinstance(field.config, dict) else {}
+    if field.data_type == "enum":
+        check = _enum_check(config)
+    else:
+        check = TYPE_CHECKS.get(field.data_type, _check_unsupported)
+    relation_workspace_id = relation_model_id = None
+    if field.data_type == "relation":
+        relation_workspace_id = config.get("workspace_id", default_workspace_id)
+        relation_model_id = config.get("model_id")
+    return CompiledField(
+        slug=field.slug,
+        data_type=field.data_type,
+        is_required=bool(field.is_required),
+        is_unique=bool(field.is_unique),
+        check=check,
+        relation_workspace_id=relation_workspace_id,
+        relation_model_id=relation_model_id,
+    )
+
+
+def compile_model_schema(model: Model | ModelRef, fields: Iterable[ModelField]) -> ModelSchema:
+    compiled = tuple(compile_field(field, model.workspace_id) for field in fields)
+    return ModelSchema(
+        model_id=model.id,
+        workspace_id=model.workspace_id,
+        version=model.schema_version or 0,
+        fields=compiled,
+        required=frozenset(field.slug for field in compiled if field.is_required),
+        unique_fields=tuple(field for field in compiled if field.is_unique),
+        relation_fields=tuple(field for field in compiled if field.data_type == "relation"),
+    )
+
+
+class SchemaCache:
+    """In-process LRU of compiled schemas keyed by ``(model_id, schema_version)``."""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._entries: OrderedDict[tuple[int, int], ModelSchema] = OrderedDict()
+
+    def get(self, model_id: int, version: int) -> ModelSchema | None:
+        key = (model_id, version)
+        schema = self._entries.get(key)
+        if schema is not None:
+            self._entries.move_to_end(key)
+        return schema
+
+    def put(self, schema: ModelSchema) -> None:
+        self.invalidate(schema.model_id)
+        self._entries[(schema.model_id, schema.version)] = schema
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, model_id: int) -> None:
+        for key in [key for key in self._entries if key[0] == model_id]:
+            del self._entries[key]
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+schema_cache = SchemaCache(settings.schema_cache_size)
+
+
+async def get_model_schema(session: AsyncSession, model: Model | ModelRef) -> ModelSchema:
+    version = model.schema_version or 0
+    schema = schema_cache.get(model.id, version)
+    if schema is None:
+        result = await session.execute(
+            select(ModelField).where(ModelField.model_id == model.id).order_by(ModelField.position, ModelField.id)
+        )
+        schema = compile_model_schema(model, result.scalars().all())
+        schema_cache.put(schema)
+    return schema
@@ -1,13 +1,16 @@
 from datetime import datetime
 from typing import Optional
 from sqlalchemy import (
+    BigInteger,
     Boolean,
     DateTime,
     ForeignKey,
+    Index,
     Integer,
     String,
     Text,
     UniqueConstraint,
+    text,
 )
 from sqlalchemy.dialects.postgresql import ENUM, JSONB
 from sqlalchemy.orm import relationship, Mapped, mapped_column
@@ -43,6 +46,7 @@ class User(Base):
     email: Mapped[str] = mapped_column(String(255), unique=True, nullable=False, index=True)
     password_hash: Mapped[str] = mapped_column(String(255), nullable=False)
     name: Mapped[Optional[str]] = mapped_column(String(255))
+    token_version: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
     memberships = relationship("WorkspaceMember", back_populates="user")
     workspaces_created = relationship("Workspace", back_populates="creator")
@@ -62,10 +66,15 @@ class Workspace(Base):
     name: Mapped[str] = mapped_column(String(255), unique=True, nullable=False)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
     created_by: Mapped[Optional[int]] = mapped_column(ForeignKey("users.id", ondelete="SET NULL"))
+    plan: Mapped[str] = mapped_column(String(50), default="free", server_default="free", nullable=False)
+    # Overrides the plan's per-model record limit when set.
+    record_limit: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
 
     creator = relationship("User", back_populates="workspaces_created")
-    memberships = relationship("WorkspaceMember", back_populates="workspace")
-    models = relationship("Model", back_populates="workspace")
+    # Children are removed by ON DELETE CASCADE; passive_deletes keeps the ORM
+    # from loading them just to delete or detach them.
+    memberships = relationship("WorkspaceMember", back_populates="workspace", passive_deletes=True)
+    models = relationship("Model", back_populates="workspace", passive_deletes=True)
 
 
 class WorkspaceMember(Base):
@@ -90,13 +99,33 @@ class Model(Base):
     name: Mapped[str] = mapped_column(String(255), nullable=False)
     slug: Mapped[str] = mapped_column(String(255), nullable=False)
     description: Mapped[Optional[str]] = mapped_column(Text)
+    schema_version: Mapped[int] = mapped_column(Integer, default=1, nullable=False)
+    # Set while a purge job deletes the records of a large model.
+    deleted_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
     created_by: Mapped[Optional[int]] = mapped_column(ForeignKey("users.id", ondelete="SET NULL"))
 
     workspace = relationship("Workspace", back_populates="models")
     creator = relationship("User", back_populates="models_created")
-    fields = relationship("ModelField", back_populates="model", cascade="all, delete")
-    records = relationship("Record", back_populates="model", cascade="all, delete")
+    fields = relationship(
+        "ModelField",
+        back_populates="model",
+        cascade="all, delete",
+        passive_deletes=True,
+        order_by="(ModelField.position, ModelField.id)",
+    )
+    records = relationship("Record", back_populates="model", cascade="all, delete", passive_deletes=True)
+    indexes = relationship("FieldIndex", back_populates="model", cascade="all, delete", passive_deletes=True)
+
+
+class RecordCounter(Base):
+    """Live record count of a model, kept in step with inserts and deletes."""
+
+    __tablename__ = "record_counters"
+
+    model_id: Mapped[int] = mapped_column(ForeignKey("models.id", ondelete="CASCADE"), primary_key=True)
+    workspace_id: Mapped[int] = mapped_column(ForeignKey("workspaces.id", ondelete="CASCADE"), index=True)
+    record_count: Mapped[int] = mapped_column(BigInteger, default=0, nullable=False)
 
 
 class ModelField(Base):
@@ -117,6 +146,24 @@ class ModelField(Base):
 
 class Record(Base):
     __tablename__ = "records"
+    # Cascading deletes and chunked purges look records up by these keys.
+    __table_args__ = (
+        Index("ix_records_model_id_id", "model_id", "id"),
+        # Default keyset pagination: created_at, then id.
+        Index("ix_records_model_id_created_at_id", "model_id", "created_at", "id"),
+        Index("ix_records_workspace_id", "workspace_id"),
+        # Record search; records_search_text is installed before create_all.
+        Index(
+            "ix_records_search",
+            text("to_tsvector('simple'::regconfig, records_search_text(data))"),
+            postgresql_using="gin",
+        ).ddl_if(dialect="postgresql"),
+        Index(
+            "ix_records_search_trgm",
+            text("records_search_text(data) gin_trgm_ops"),
+            postgresql_using="gin",
+        ).ddl_if(dialect="postgresql"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     model_id: Mapped[int] = mapped_column(ForeignKey("models.id", ondelete="CASCADE"))
@@ -131,3 +178,37 @@ class Record(Base):
     workspace = relationship("Workspace")
     created_by_user = relationship("User", foreign_keys=[created_by], back_populates="records_created")
     updated_by_user = relationship("User", foreign_keys=[updated_by], back_populates="records_updated")
+
+
+class FieldIndex(Base):
+    __tablename__ = "field_indexes"
+    __table_args__ = (UniqueConstraint("model_id", "field_slug", "data_type", name="uq_field_index"),)
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    model_id: Mapped[int] = mapped_column(ForeignKey("models.id", ondelete="CASCADE"), index=True)
+    field_slug: Mapped[str] = mapped_column(String(255), nullable=False)
+    data_type: Mapped[str] = mapped_column(String(32), nullable=False)
+    index_name: Mapped[str] = mapped_column(String(63), unique=True, nullable=False)
+    status: Mapped[str] = mapped_column(String(32), default="pending", nullable=False)
+    error: Mapped[Optional[str]] = mapped_column(Text)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    model = relationship("Model", back_populates="indexes")
+
+
+class Job(Base):
+    __tablename__ = "jobs"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    kind: Mapped[str] = mapped_column(String(64), nullable=False)
+    status: Mapped[str] = mapped_column(String(32), default="queued", nullable=False)
+    workspace_id: Mapped[int] = mapped_column(ForeignKey("workspaces.id", ondelete="CASCADE"), index=True)
+    model_id: Mapped[Optional[int]] = mapped_column(ForeignKey("models.id", ondelete="CASCADE"), nullable=True)
+    created_by: Mapped[Optional[int]] = mapped_column(ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
+    processed: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    total: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    result: Mapped[Optional[dict]] = mapped_column(JSONB, nullable=True)
+    error: Mapped[Optional[str]] = mapped_column(Text)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -0,0 +1,95 @@
+import base64
+import binascii
+import json
+from datetime import date, datetime
+from decimal import Decimal, InvalidOperation
+from typing import Any, Sequence
+from fastapi import HTTPException, status
+from sqlalchemy import and_, asc, desc, false, or_, tuple_
+from sqlalchemy.sql import ColumnElement, Select
+from .models import Record
+
+SortColumn = tuple[ColumnElement, str]
+# What a decoded cursor key may hold: JSON scalars and the tagged values below.
+CURSOR_VALUE_TYPES = (str, int, float, bool, type(None), datetime, date, Decimal)
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {"$dt": value.isoformat()}
+    if isinstance(value, date):
+        return {"$d": value.isoformat()}
+    if isinstance(value, Decimal):
+        return {"$n": str(value)}
+    raise TypeError(f"Unsupported cursor value {type(value).__name__}")
+
+
+def _decode_value(value: dict) -> Any:
+    if "$dt" in value:
+        return datetime.fromisoformat(value["$dt"])
+    if "$d" in value:
+        return date.fromisoformat(value["$d"])
+    if "$n" in value:
+        return Decimal(value["$n"])
+    return value
+
+
+def encode_cursor(signature: str, values: Sequence[Any], record_id: int) -> str:
+    payload = json.dumps({"s": signature, "k": list(values), "id": record_id}, default=_encode_value)
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, signature: str, size: int) -> tuple[list[Any], int]:
+    invalid = HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw, object_hook=_decode_value)
+        values, record_id = payload["k"], payload["id"]
+    except (binascii.Error, ValueError, InvalidOperation, KeyError, TypeError):
+        raise invalid
+    if payload.get("s") != signature or not isinstance(values, list) or len(values) != size:
+        raise invalid
+    if not isinstance(record_id, int) or isinstance(record_id, bool):
+        raise invalid
+    if not all(isinstance(value, CURSOR_VALUE_TYPES) for value in values):
+        raise invalid
+    return values, record_id
+
+
+def _equals(column: ColumnElement, value: Any) -> ColumnElement:
+    return column.is_(None) if value is None else column == value
+
+
+def _after(column: ColumnElement, value: Any, order: str) -> ColumnElement:
+    # Postgres sorts NULLs last in ascending order and first in descending
+    # order; the predicates mirror that so NULL-valued rows are not skipped.
+    if order == "asc":
+        return false() if value is None else or_(column > value, column.is_(None))
+    return column.is_not(None) if value is None else column < value
+
+
+def _not_null(column: ColumnElement) -> bool:
+    # Table columns declared NOT NULL; JSON field expressions can always be NULL.
+    return getattr(getattr(column, "expression", column), "nullable", True) is False
+
+
+def keyset_predicate(columns: Sequence[SortColumn], values: Sequence[Any], record_id: int) -> ColumnElement:
+    id_order = columns[0][1] if columns else "asc"
+    keys = [*columns, (Record.id, id_order)]
+    key_values = [*values, record_id]
+    if all(_not_null(column) and order == id_order for column, order in columns) and None not in values:
+        # A row comparison is one range scan on a matching btree index.
+        row, bound = tuple_(*(column for column, _ in keys)), tuple_(*key_values)
+        return row > bound if id_order == "asc" else row < bound
+    clauses = []
+    for position, (column, order) in enumerate(keys):
+        prefix = [_equals(keys[i][0], key_values[i]) for i in range(position)]
+        clauses.append(and_(*prefix, _after(column, key_values[position], order)))
+    return or_(*clauses)
+
+
+def order_by_keyset(query: Select, columns: Sequence[SortColumn]) -> Select:
+    id_order = columns[0][1] if columns else "asc"
+    for column, order in [*columns, (Record.id, id_order)]:
+        query = query.order_by(asc(column) if order == "asc" else desc(column))
+    return query
@@ -0,0 +1,75 @@
+from dataclasses import dataclass
+from typing import Any
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from .cache import TTLCache, register_cache
+from .core_config import settings
+from .models import User
+
+
+@dataclass(frozen=True)
+class Principal:
+    """What request handlers need to know about the caller.
+
+    Handlers only ever read ``id`` (and occasionally ``email``), so this
+    snapshot stands in for the ``User`` row without loading it per request.
+    Workspace roles are resolved separately by ``authz.resolve_role``.
+    """
+
+    id: int
+    email: str
+    token_version: int = 0
+
+
+principal_cache: TTLCache[Principal] = register_cache(
+    "principals", TTLCache(settings.principal_cache_size, settings.principal_cache_ttl)
+)
+
+
+async def load_principal(session: AsyncSession, user_id: int) -> Principal | None:
+    result = await session.execute(
+        select(User.id, User.email, User.token_version).where(User.id == user_id)
+    )
+    row = result.first()
+    if row is None:
+        return None
+    principal = Principal(id=row.id, email=row.email, token_version=row.token_version or 0)
+    principal_cache.set(user_id, principal)
+    return principal
+
+
+async def get_principal(session: AsyncSession, user_id: int, token_version: int) -> Principal | None:
+    """Return the cached principal, reloading when the token is newer than the entry.
+
+    A token version older than the stored one means the user logged out or
+    changed password after the token was issued; ``None`` is returned then.
+    """
+    principal = principal_cache.get(user_id)
+    if principal is None or principal.token_version < token_version:
+        principal = await load_principal(session, user_id)
+    if principal is None or principal.token_version != token_version:
+        return None
+    return principal
+
+
+def evict_principal(user_id: int) -> None:
+    """Forget a cached principal in this process.
+
+    Other workers drop theirs when ``schema_registry.notify_principal_changed``
+    is delivered.
+    """
+    principal_cache.pop(user_id)
+
+
+def principal_claims(principal: Principal) -> dict[str, Any]:
+    """Claims embedded in access tokens when ``auth_embedded_claims`` is on."""
+    return {"email": principal.email}
+
+
+def principal_from_claims(payload: dict[str, Any]) -> Principal | None:
+    if "email" not in payload:
+        return None
+    try:
+        return Principal(id=int(payload["sub"]), email=payload["email"], token_version=int(payload.get("ver", 0)))
+    except (TypeError, ValueError):
+        return None
@@ -0,0 +1,73 @@
+import asyncio
+import logging
+from datetime import datetime
+from functools import partial
+from sqlalchemy import Delete, delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from .core_config import settings
+from .db import AsyncSessionLocal
+from .indexes import model_scope
+from .jobs import claim_stale_jobs, create_job, run_job, update_job
+from .models import Job, Model, Record
+from .schema_registry import invalidate_model, notify_model_changed
+
+logger = logging.getLogger(__name__)
+
+PURGE_JOB_KIND = "purge_model"
+
+
+async def has_more_records(session: AsyncSession, scope, threshold: int) -> bool:
+    """Whether more than ``threshold`` records match ``scope``, without counting them all."""
+    result = await session.execute(select(Record.id).where(scope).offset(threshold).limit(1))
+    return result.first() is not None
+
+
+def purge_statement(model_id: int, batch_size: int) -> Delete:
+    chunk = select(Record.id).where(model_scope(model_id)).order_by(Record.id).limit(batch_size)
+    return delete(Record).where(Record.id.in_(chunk.scalar_subquery())).execution_options(synchronize_session=False)
+
+
+def tombstone_slug(model: Model) -> str:
+    # Frees the (workspace_id, slug) pair for a new model while the old one purges.
+    suffix = f"~deleted-{model.id}"
+    return model.slug[: 255 - len(suffix)] + suffix
+
+
+def schedule_purge(session: AsyncSession, model: Model, user_id: int) -> Job:
+    """Hide ``model`` and queue a job that deletes it in chunks.
+
+    The job is not linked through ``jobs.model_id``: that foreign key cascades,
+    and the job row has to outlive the model so its outcome can be polled.
+    """
+    model.deleted_at = datetime.utcnow()
+    model.slug = tombstone_slug(model)
+    job = create_job(session, PURGE_JOB_KIND, model.workspace_id, user_id=user_id)
+    job.result = {"model_id": model.id, "deleted_records": 0}
+    return job
+
+
+async def purge_model(model_id: int, job_id: int) -> dict:
+    """Delete a model's records in short transactions, then the model itself."""
+    deleted = 0
+    async with AsyncSessionLocal() as session:
+        while True:
+            result = await session.execute(purge_statement(model_id, settings.purge_batch_size))
+            await session.commit()
+            deleted += result.rowcount or 0
+            await update_job(job_id, processed=deleted, result={"model_id": model_id, "deleted_records": deleted})
+            if (result.rowcount or 0) < settings.purge_batch_size:
+                break
+            if settings.purge_throttle_ms:
+                await asyncio.sleep(settings.purge_throttle_ms / 1000)
+        await session.execute(delete(Model).where(Model.id == model_id))
+        await notify_model_changed(session, model_id)
+        await session.commit()
+    invalidate_model(model_id)
+    return {"model_id": model_id, "deleted_records": deleted}
+
+
+async def resume_purges() -> None:
+    jobs = await claim_stale_jobs(PURGE_JOB_KIND)
+    if jobs:
+        logger.info("Resuming model purge jobs %s", [job.id for job in jobs])
+    await asyncio.gather(*(run_job(job.id, partial(purge_model, job.result["model_id"])) for job in jobs))
@@ -0,0 +1,181 @@
+from dataclasses import dataclass
+from datetime import date, datetime, timezone
+from decimal import Decimal, InvalidOperation
+from typing import Any, Iterable
+from fastapi import HTTPException, status
+from sqlalchemy import Date, cast, func, literal
+from sqlalchemy.sql import ColumnElement, Select
+from .indexes import field_expression
+from .model_schema import CompiledField
+from .models import ModelField, Record
+from .pagination import SortColumn
+
+BUILTIN_COLUMNS = {"created_at": Record.created_at, "updated_at": Record.updated_at}
+TEXT_TYPES = {"string", "text", "enum"}
+RANGE_OPERATORS = {"gt", "gte", "lt", "lte", "between"}
+OPERATORS = {"eq", "in", "contains"} | RANGE_OPERATORS
+GROUPABLE_TYPES = {"string", "enum", "boolean", "date", "datetime", "timestamp"}
+DATE_TYPES = {"date", "datetime", "timestamp"}
+BUCKETS = {"day", "week", "month"}
+METRICS = {"count", "sum", "avg", "min", "max"}
+
+
+@dataclass(frozen=True)
+class FilterSpec:
+    key: str
+    op: str
+    value: str
+
+
+def _invalid(field: str, error: str) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=[{"field": field, "error": error}]
+    )
+
+
+def field_types(fields: Iterable[ModelField | CompiledField]) -> dict[str, str]:
+    return {field.slug: field.data_type for field in fields}
+
+
+def parse_projection(fields: str | None, known: Iterable[str] | None) -> list[str] | None:
+    """Parse ``fields=slug1,slug2``; ``None`` means the whole document.
+
+    Slugs are checked against ``known`` unless it is ``None``.
+    """
+    slugs = list(dict.fromkeys(slug.strip() for slug in (fields or "").split(",") if slug.strip()))
+    if not slugs:
+        return None
+    if known is not None:
+        known = set(known)
+        for slug in slugs:
+            if slug not in known:
+                raise _invalid(slug, "Unknown field")
+    return slugs
+
+
+def parse_filter(raw: str) -> FilterSpec:
+    """Parse ``key:op:value`` (e.g. ``price:gte:10`` or ``status:in:open,closed``)."""
+    parts = raw.split(":", 2)
+    if len(parts) != 3 or not parts[0]:
+        raise _invalid(raw, "Filters must look like key:operator:value")
+    key, op, value = parts
+    if op not in OPERATORS:
+        raise _invalid(key, f"Unsupported operator '{op}'")
+    return FilterSpec(key=key, op=op, value=value)
+
+
+def _column(key: str, types: dict[str, str]) -> tuple[ColumnElement, str]:
+    if key in BUILTIN_COLUMNS:
+        return BUILTIN_COLUMNS[key], "timestamp"
+    data_type = types.get(key)
+    if data_type is None:
+        raise _invalid(key, "Unknown field")
+    return field_expression(key, data_type), data_type
+
+
+def _coerce(key: str, data_type: str, value: str) -> Any:
+    try:
+        if data_type in {"number", "relation"}:
+            return Decimal(value)
+        if data_type == "boolean":
+            if value not in {"true", "false"}:
+                raise ValueError(value)
+            return value == "true"
+        if data_type == "date":
+            return date.fromisoformat(value)
+        if data_type == "datetime":
+            parsed = datetime.fromisoformat(value)
+            return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+        if data_type == "timestamp":
+            parsed = datetime.fromisoformat(value)
+            return parsed.astimezone(timezone.utc).replace(tzinfo=None) if parsed.tzinfo else parsed
+    except (ValueError, InvalidOperation):
+        raise _invalid(key, f"Invalid {data_type} value '{value}'")
+    return value
+
+
+def escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def filter_clause(spec: FilterSpec, types: dict[str, str]) -> ColumnElement:
+    column, data_type = _column(spec.key, types)
+    if spec.op == "contains":
+        if data_type not in TEXT_TYPES:
+            raise _invalid(spec.key, "contains is only supported on text fields")
+        return column.ilike(f"%{escape_like(spec.value)}%", escape="\\")
+    if spec.op in RANGE_OPERATORS and data_type in TEXT_TYPES | {"boolean"}:
+        raise _invalid(spec.key, f"{spec.op} is not supported on {data_type} fields")
+
+    if spec.op == "in":
+        return column.in_([_coerce(spec.key, data_type, item) for item in spec.value.split(",")])
+    if spec.op == "between":
+        bounds = spec.value.split(",")
+        if len(bounds) != 2:
+            raise _invalid(spec.key, "between expects two comma separated values")
+        low, high = (_coerce(spec.key, data_type, bound) for bound in bounds)
+        return column.between(low, high)
+
+    value = _coerce(spec.key, data_type, spec.value)
+    if spec.op == "gt":
+        return column > value
+    if spec.op == "gte":
+        return column >= value
+    if spec.op == "lt":
+        return column < value
+    if spec.op == "lte":
+        return column <= value
+    return column == value
+
+
+def apply_filters(query: Select, specs: Iterable[FilterSpec], types: dict[str, str]) -> Select:
+    for spec in specs:
+        query = query.where(filter_clause(spec, types))
+    return query
+
+
+def sort_columns(sort_by: str | None, sort_order: str, types: dict[str, str]) -> list[SortColumn]:
+    """Resolve ``sort_by`` (comma separated, ``-key`` for descending) to typed columns."""
+    if not sort_by:
+        return [(Record.created_at, sort_order)]
+    columns: list[SortColumn] = []
+    for key in sort_by.split(","):
+        key = key.strip()
+        order = sort_order
+        if key.startswith("-"):
+            key, order = key[1:], "desc"
+        if not key:
+            continue
+        column, _ = _column(key, types)
+        columns.append((column, order))
+    return columns or [(Record.created_at, sort_order)]
+
+
+def group_expression(key: str, bucket: str, types: dict[str, str]) -> ColumnElement:
+    column, data_type = _column(key, types)
+    if data_type not in GROUPABLE_TYPES:
+        raise _invalid(key, f"Cannot group by {data_type} fields")
+    if data_type not in DATE_TYPES:
+        return column
+    if bucket not in BUCKETS:
+        raise _invalid(key, f"Unsupported bucket '{bucket}'")
+    # Inline the unit so the SELECT and GROUP BY expressions are identical.
+    unit = literal(bucket, literal_execute=True)
+    if data_type == "date":
+        return cast(func.date_trunc(unit, column), Date)
+    if data_type == "datetime":
+        return func.date_trunc(unit, column, literal("UTC", literal_execute=True))
+    return func.date_trunc(unit, column)
+
+
+def metric_expression(raw: str, types: dict[str, str]) -> ColumnElement:
+    """Compile ``count`` or ``<sum|avg|min|max>:<number field>``."""
+    name, _, key = raw.partition(":")
+    if name not in METRICS:
+        raise _invalid(raw, f"Unsupported metric '{name}'")
+    if name == "count":
+        return func.count()
+    column, data_type = _column(key, types) if key else (None, None)
+    if data_type != "number":
+        raise _invalid(key or raw, f"{name} requires a number field")
+    return getattr(func, name)(column)
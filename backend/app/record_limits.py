@@ -0,0 +1,61 @@
+from sqlalchemy import Insert, Update, case, func, literal, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from .core_config import settings
+from .models import RecordCounter, Workspace
+
+RECORD_LIMIT_DETAIL = "Record limit reached. Upgrade plan"
+
+
+def record_limit_expression(workspace_id: int):
+    """The per-model record limit of a workspace; NULL when unlimited.
+
+    A workspace's ``record_limit`` wins over its plan's limit, and plans
+    missing from ``PLAN_RECORD_LIMITS`` get the free tier's.
+    """
+    plan_limit = case(settings.plan_record_limits, value=Workspace.plan, else_=settings.free_record_limit)
+    return (
+        select(func.coalesce(Workspace.record_limit, plan_limit))
+        .where(Workspace.id == workspace_id)
+        .scalar_subquery()
+    )
+
+
+def reserve_statement(model_id: int, workspace_id: int, count: int) -> Insert:
+    """Add ``count`` to a model's counter unless that would pass its limit.
+
+    Returns a row only when the capacity was reserved. The counter row stays
+    locked until the transaction ends, so concurrent writers queue on it
+    instead of racing past the limit, and a rollback releases the reservation.
+    """
+    limit = record_limit_expression(workspace_id)
+    statement = insert(RecordCounter).from_select(
+        ["model_id", "workspace_id", "record_count"],
+        select(literal(model_id), literal(workspace_id), literal(count)).where(
+            func.coalesce(literal(count) <= limit, True)
+        ),
+    )
+    return statement.on_conflict_do_update(
+        index_elements=[RecordCounter.model_id],
+        set_={"record_count": RecordCounter.record_count + statement.excluded.record_count},
+        where=func.coalesce(RecordCounter.record_count + statement.excluded.record_count <= limit, True),
+    ).returning(RecordCounter.record_count)
+
+
+async def reserve_records(session: AsyncSession, model_id: int, workspace_id: int, count: int) -> bool:
+    if count <= 0:
+        return True
+    result = await session.execute(reserve_statement(model_id, workspace_id, count))
+    return result.first() is not None
+
+
+def release_statement(model_id: int, count: int) -> Update:
+    return (
+        update(RecordCounter)
+        .where(RecordCounter.model_id == model_id)
+        .values(record_count=func.greatest(RecordCounter.record_count - count, 0))
+    )
+
+
+async def release_records(session: AsyncSession, model_id: int, count: int = 1) -> None:
+    await session.execute(release_statement(model_id, count))
@@ -0,0 +1,123 @@
+from typing import Any
+from fastapi import HTTPException, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from .authz import ModelRef
+from .indexes import field_text, model_scope, unique_text
+from .instrumentation import timed
+from .model_schema import CompiledField, ModelSchema, get_model_schema
+from .models import Model, Record
+
+
+def _relation_error(field: CompiledField, related_record: Any) -> str | None:
+    if not related_record:
+        return "Related record not found"
+
+    if field.relation_workspace_id and related_record.workspace_id != field.relation_workspace_id:
+        return "Related record belongs to a different workspace"
+
+    if field.relation_model_id and related_record.model_id != field.relation_model_id:
+        return "Related record belongs to a different model"
+
+    return None
+
+
+async def _validate_relation_record(session: AsyncSession, field: CompiledField, value: int) -> str | None:
+    record_result = await session.execute(
+        select(Record.id, Record.workspace_id, Record.model_id).where(Record.id == value)
+    )
+    return _relation_error(field, record_result.first())
+
+
+async def _validate_uniqueness(
+    session: AsyncSession, model_id: int, field: CompiledField, value: Any, record_id: int | None
+) -> str | None:
+    query = select(Record.id).where(
+        model_scope(model_id), field_text(field.slug) == unique_text(value)
+    )
+    if record_id:
+        query = query.where(Record.id != record_id)
+    result = await session.execute(query.limit(1))
+    if result.first():
+        return "Value must be unique"
+    return None
+
+
+async def validate_record_payload(
+    session: AsyncSession, model: Model | ModelRef, data: dict, record_id: int | None = None
+) -> ModelSchema:
+    schema = await get_model_schema(session, model)
+    data = data or {}
+    with timed("validate"):
+        errors = schema.check(data)
+
+    for field in schema.relation_fields:
+        if field.slug in data and field.slug not in errors:
+            relation_error = await _validate_relation_record(session, field, data[field.slug])
+            if relation_error:
+                errors[field.slug] = relation_error
+
+    for field in schema.unique_fields:
+        if field.slug in data and field.slug not in errors:
+            unique_error = await _validate_uniqueness(session, model.id, field, data[field.slug], record_id)
+            if unique_error:
+                errors[field.slug] = unique_error
+
+    if errors:
+        # Report in field order, matching ModelSchema.check.
+        detail = [{"field": field.slug, "error": errors[field.slug]} for field in schema.fields if field.slug in errors]
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=detail)
+    return schema
+
+
+async def load_related(session: AsyncSession, schema: ModelSchema, documents: list[Any]) -> dict[int, Any]:
+    # One query resolves every relation target referenced by the documents.
+    related_ids = {
+        data.get(field.slug)
+        for data in documents
+        for field in schema.relation_fields
+        if isinstance(data, dict) and isinstance(data.get(field.slug), int)
+    }
+    if not related_ids:
+        return {}
+    related_result = await session.execute(
+        select(Record.id, Record.workspace_id, Record.model_id).where(Record.id.in_(related_ids))
+    )
+    return {row.id: row for row in related_result.all()}
+
+
+def document_errors(schema: ModelSchema, data: dict, related: dict[int, Any]) -> dict[str, str]:
+    errors = schema.check(data)
+    for field in schema.relation_fields:
+        if field.slug in data and field.slug not in errors:
+            error = _relation_error(field, related.get(data[field.slug]))
+            if error:
+                errors[field.slug] = error
+    return errors
+
+
+async def batch_errors(session: AsyncSession, schema: ModelSchema, documents: list[dict]) -> list[dict[str, str]]:
+    related = await load_related(session, schema, documents)
+    with timed("validate"):
+        errors = [document_errors(schema, data, related) for data in documents]
+
+    for field in schema.unique_fields:
+        first_seen: dict[str, int] = {}
+        for index, data in enumerate(documents):
+            if field.slug in data and field.slug not in errors[index]:
+                value = unique_text(data[field.slug])
+                if value in first_seen:
+                    errors[index][field.slug] = "Value is duplicated within the batch"
+                else:
+                    first_seen[value] = index
+        if not first_seen:
+            continue
+        # One probe per unique field, served by its partial unique index.
+        existing_result = await session.execute(
+            select(field_text(field.slug)).where(
+                model_scope(schema.model_id), field_text(field.slug).in_(list(first_seen))
+            )
+        )
+        for value in existing_result.scalars().all():
+            errors[first_seen[value]][field.slug] = "Value must be unique"
+    return errors
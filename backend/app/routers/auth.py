@@ -1,22 +1,36 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, update
+from ..core_config import settings
 from ..db import get_session
+from ..dependencies import get_current_user
 from ..models import User, Workspace, WorkspaceMember
-from ..schemas import UserCreate, UserRead, Token
+from ..principals import evict_principal, load_principal, principal_claims
+from ..schema_registry import notify_principal_changed
+from ..schemas import PasswordChange, UserCreate, UserRead, Token
 from ..security import verify_password, get_password_hash, create_access_token
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
 
+async def _revoke_tokens(session: AsyncSession, user_id: int, **values) -> None:
+    """Bump the user's token version so every outstanding token stops working."""
+    await session.execute(
+        update(User).where(User.id == user_id).values(token_version=User.token_version + 1, **values)
+    )
+    await notify_principal_changed(session, user_id)
+    await session.commit()
+    evict_principal(user_id)
+
+
 @router.post("/register", response_model=UserRead)
 async def register(payload: UserCreate, session: AsyncSession = Depends(get_session)):
     existing = await session.execute(select(User).where(User.email == payload.email))
     if existing.scalars().first():
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Email already registered")
 
-    user = User(email=payload.email, password_hash=get_password_hash(payload.password))
+    user = User(email=payload.email, password_hash=await get_password_hash(payload.password))
     session.add(user)
     await session.flush()
 
@@ -38,7 +52,38 @@ async def login_for_access_token(
 ):
     result = await session.execute(select(User).where(User.email == form_data.username))
     user = result.scalars().first()
-    if not user or not verify_password(form_data.password, user.password_hash):
+    valid, new_hash = await verify_password(form_data.password, user.password_hash) if user else (False, None)
+    if not valid:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Incorrect username or password")
-    access_token = create_access_token(subject=str(user.id))
+    if new_hash:
+        user.password_hash = new_hash
+        await session.commit()
+    claims = None
+    if settings.auth_embedded_claims:
+        principal = await load_principal(session, user.id)
+        claims = principal_claims(principal)
+    access_token = create_access_token(subject=str(user.id), version=user.token_version or 0, claims=claims)
     return Token(access_token=access_token)
+
+
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+async def logout(
+    session: AsyncSession = Depends(get_session),
+    current_user=Depends(get_current_user),
+):
+    await _revoke_tokens(session, current_user.id)
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+
+@router.post("/password", status_code=status.HTTP_204_NO_CONTENT)
+async def change_password(
+    payload: PasswordChange,
+    session: AsyncSession = Depends(get_session),
+    current_user=Depends(get_current_user),
+):
+    user = await session.get(User, current_user.id)
+    valid, _ = await verify_password(payload.current_password, user.password_hash) if user else (False, None)
+    if not valid:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Current password is incorrect")
+    await _revoke_tokens(session, user.id, password_hash=await get_password_hash(payload.new_password))
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
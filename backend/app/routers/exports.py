@@ -0,0 +1,117 @@
+import asyncio
+import csv
+import io
+import json
+import re
+from datetime import datetime
+from typing import Any, AsyncIterator, Sequence
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..authz import get_authorized_model
+from ..db import AsyncSessionLocal, get_session
+from ..dependencies import get_current_user
+from ..indexes import model_scope
+from ..models import ModelField, Record
+from ..query import parse_projection
+from ..serialization import record_data
+
+router = APIRouter(tags=["records"])
+
+EXPORT_FETCH_SIZE = 1000
+MEDIA_TYPES = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+
+
+def _csv_cell(value: Any) -> Any:
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (dict, list)):
+        return json.dumps(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def _encode_csv(rows: Sequence[Any], slugs: list[str]) -> str:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for record_id, data, created_at, updated_at in rows:
+        data = data if isinstance(data, dict) else {}
+        writer.writerow(
+            [record_id, *(_csv_cell(data.get(slug)) for slug in slugs), _csv_cell(created_at), _csv_cell(updated_at)]
+        )
+    return buffer.getvalue()
+
+
+def _encode_ndjson(rows: Sequence[Any], slugs: list[str]) -> str:
+    return "".join(
+        json.dumps(
+            {
+                "id": record_id,
+                "data": data,
+                "created_at": created_at.isoformat() if created_at else None,
+                "updated_at": updated_at.isoformat() if updated_at else None,
+            }
+        )
+        + "\n"
+        for record_id, data, created_at, updated_at in rows
+    )
+
+
+def _csv_header(slugs: list[str]) -> str:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerow(["id", *slugs, "created_at", "updated_at"])
+    return buffer.getvalue()
+
+
+async def stream_records(
+    model_id: int, slugs: list[str], fmt: str, projection: list[str] | None = None
+) -> AsyncIterator[str]:
+    """Yield encoded chunks of a model's records from a server-side cursor.
+
+    With ``projection`` only those keys of each document are read out of the
+    database.
+
+    Uses its own session: the request-scoped one is closed before a streaming
+    body is sent. Each fetched partition is encoded in a worker thread so large
+    exports do not monopolise the event loop.
+    """
+    encode = _encode_csv if fmt == "csv" else _encode_ndjson
+    if fmt == "csv":
+        yield _csv_header(slugs)
+    async with AsyncSessionLocal() as session:
+        result = await session.stream(
+            select(Record.id, record_data(projection), Record.created_at, Record.updated_at)
+            .where(model_scope(model_id))
+            .order_by(Record.id)
+            .execution_options(yield_per=EXPORT_FETCH_SIZE)
+        )
+        async for partition in result.partitions(EXPORT_FETCH_SIZE):
+            yield await asyncio.to_thread(encode, partition, slugs)
+
+
+@router.get("/models/{model_id}/records/export")
+async def export_records(
+    model_id: int,
+    format: str = Query("csv", pattern="^(csv|ndjson)$"),
+    fields: str | None = Query(None, description="Comma separated field slugs to export; defaults to all fields"),
+    session: AsyncSession = Depends(get_session),
+    current_user=Depends(get_current_user),
+):
+    model = await get_authorized_model(session, model_id, current_user.id)
+    fields_result = await session.execute(
+        select(ModelField.slug).where(ModelField.model_id == model_id).order_by(ModelField.position, ModelField.id)
+    )
+    slugs = list(fields_result.scalars().all())
+    projection = parse_projection(fields, slugs)
+    if projection is not None:
+        slugs = projection
+    filename = re.sub(r"[^A-Za-z0-9_.-]", "_", model.slug) or "records"
+    return StreamingResponse(
+        stream_records(model.id, slugs, format, projection),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{format}"'},
+    )
@@ -0,0 +1,235 @@
+import asyncio
+import csv
+import json
+import os
+import tempfile
+from datetime import datetime
+from functools import partial
+from itertools import islice
+from typing import Any, Iterator, TextIO
+from fastapi import APIRouter, BackgroundTasks, Depends, File, Form, HTTPException, UploadFile, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..authz import get_authorized_model
+from ..db import AsyncSessionLocal, get_session
+from ..dependencies import get_current_user
+from ..jobs import JobFailed, create_job, run_job, update_job
+from ..record_limits import RECORD_LIMIT_DETAIL, reserve_records
+from ..record_validation import batch_errors
+from ..model_schema import ModelSchema, coerce_text, get_model_schema
+from ..models import Model
+from ..schemas import JobRead
+
+router = APIRouter(tags=["records"])
+
+IMPORT_CHUNK_SIZE = 2000
+UPLOAD_BUFFER_SIZE = 1024 * 1024
+MAX_REPORTED_ERRORS = 1000
+COPY_COLUMNS = ["model_id", "workspace_id", "created_by", "updated_by", "data", "created_at", "updated_at"]
+
+# (line number, document, per-field parse errors)
+ParsedRow = tuple[int, dict, dict[str, str]]
+
+
+def _infer_format(filename: str | None) -> str:
+    if filename and filename.lower().endswith((".ndjson", ".jsonl")):
+        return "ndjson"
+    return "csv"
+
+
+def _parse_mapping(mapping: str | None) -> dict[str, str]:
+    if not mapping:
+        return {}
+    try:
+        parsed = json.loads(mapping)
+    except ValueError:
+        parsed = None
+    if not isinstance(parsed, dict) or not all(isinstance(v, str) for v in parsed.values()):
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="mapping must be a JSON object of column name to field slug",
+        )
+    return parsed
+
+
+def _csv_columns(header: list[str], schema: ModelSchema, mapping: dict[str, str]) -> dict[int, str]:
+    slugs = {field.slug.lower(): field.slug for field in schema.fields}
+    columns: dict[int, str] = {}
+    for index, name in enumerate(header):
+        slug = mapping.get(name) or slugs.get(name.strip().lower())
+        if slug and schema.field(slug):
+            columns[index] = slug
+    return columns
+
+
+def _read_csv(handle: TextIO, schema: ModelSchema, mapping: dict[str, str]) -> Iterator[ParsedRow]:
+    reader = csv.reader(handle)
+    header = next(reader, None)
+    if header is None:
+        return
+    columns = _csv_columns(header, schema, mapping)
+    for row in reader:
+        if not any(cell.strip() for cell in row):
+            continue
+        data: dict[str, Any] = {}
+        errors: dict[str, str] = {}
+        for index, slug in columns.items():
+            cell = row[index] if index < len(row) else ""
+            if cell == "":
+                continue
+            field = schema.field(slug)
+            try:
+                data[slug] = coerce_text(field, cell)
+            except ValueError:
+                errors[slug] = field.validate(cell) or "Invalid value"
+        yield reader.line_num, data, errors
+
+
+def _read_ndjson(handle: TextIO, schema: ModelSchema, mapping: dict[str, str]) -> Iterator[ParsedRow]:
+    for line_number, line in enumerate(handle, start=1):
+        if not line.strip():
+            continue
+        try:
+            document = json.loads(line)
+        except ValueError:
+            document = None
+        if not isinstance(document, dict):
+            yield line_number, {}, {"_line": "Line is not a JSON object"}
+            continue
+        yield line_number, {mapping.get(key, key): value for key, value in document.items()}, {}
+
+
+def _next_chunk(rows: Iterator[ParsedRow]) -> list[ParsedRow]:
+    return list(islice(rows, IMPORT_CHUNK_SIZE))
+
+
+async def _copy_records(session: AsyncSession, model: Model, user_id: int, documents: list[dict]) -> None:
+    connection = await session.connection()
+    raw_connection = await connection.get_raw_connection()
+    now = datetime.utcnow()
+    await raw_connection.driver_connection.copy_records_to_table(
+        "records",
+        columns=COPY_COLUMNS,
+        records=[
+            (model.id, model.workspace_id, user_id, user_id, json.dumps(data), now, now) for data in documents
+        ],
+    )
+
+
+async def import_records_from_file(
+    model_id: int, user_id: int, path: str, fmt: str, mapping: dict[str, str], atomic: bool, job_id: int
+) -> dict:
+    """Stream ``path`` into ``records`` chunk by chunk.
+
+    Only one chunk of parsed rows is held in memory at a time. Each chunk is
+    validated like a batch insert and written with COPY. With ``atomic`` the
+    whole file is one transaction; otherwise every chunk commits on its own
+    and invalid rows are skipped.
+    """
+    try:
+        size = os.path.getsize(path)
+        inserted = 0
+        errors: list[dict] = []
+        error_count = 0
+        lines_read = 0
+        bytes_read = 0
+
+        def progress() -> dict:
+            return {
+                "inserted": inserted,
+                "failed": error_count,
+                "bytes_read": bytes_read,
+                "bytes_total": size,
+                "errors": errors,
+                "truncated": error_count > len(errors),
+            }
+
+        async with AsyncSessionLocal() as session:
+            model = await session.get(Model, model_id)
+            if model is None:
+                raise ValueError("Model not found")
+            schema = await get_model_schema(session, model)
+
+            with open(path, newline="", encoding="utf-8-sig") as handle:
+                reader = _read_csv if fmt == "csv" else _read_ndjson
+                rows = reader(handle, schema, mapping)
+                while chunk := await asyncio.to_thread(_next_chunk, rows):
+                    documents = [data for _, data, _ in chunk]
+                    chunk_errors = await batch_errors(session, schema, documents)
+                    valid: list[dict] = []
+                    for (line_number, data, parse_errors), row_errors in zip(chunk, chunk_errors):
+                        row_errors = {**row_errors, **parse_errors}
+                        if not row_errors:
+                            valid.append(data)
+                            continue
+                        error_count += 1
+                        if len(errors) < MAX_REPORTED_ERRORS:
+                            errors.append(
+                                {
+                                    "line": line_number,
+                                    "errors": [{"field": slug, "error": error} for slug, error in row_errors.items()],
+                                }
+                            )
+                    lines_read = chunk[-1][0]
+                    # The text layer reads ahead, so this runs at most one
+                    # decoder block past the rows parsed so far.
+                    bytes_read = handle.buffer.tell()
+
+                    if atomic and error_count:
+                        await session.rollback()
+                        inserted = 0
+                        raise JobFailed("Import contains invalid rows; nothing was imported", progress())
+                    if not await reserve_records(session, model.id, model.workspace_id, len(valid)):
+                        await session.rollback()
+                        if atomic:
+                            inserted = 0
+                        raise JobFailed(RECORD_LIMIT_DETAIL, progress())
+
+                    if valid:
+                        await _copy_records(session, model, user_id, valid)
+                        inserted += len(valid)
+                    if not atomic:
+                        await session.commit()
+                    await update_job(job_id, processed=lines_read, result=progress())
+
+            await session.commit()
+        return progress()
+    finally:
+        os.unlink(path)
+
+
+@router.post("/models/{model_id}/records:import", response_model=JobRead, status_code=status.HTTP_202_ACCEPTED)
+async def import_records(
+    model_id: int,
+    background_tasks: BackgroundTasks,
+    file: UploadFile = File(...),
+    format: str | None = Form(None, pattern="^(csv|ndjson)$"),
+    mapping: str | None = Form(None, description="JSON object mapping column names to field slugs"),
+    atomic: bool = Form(False),
+    session: AsyncSession = Depends(get_session),
+    current_user=Depends(get_current_user),
+):
+    model = await get_authorized_model(session, model_id, current_user.id)
+    fmt = format or _infer_format(file.filename)
+    column_map = _parse_mapping(mapping)
+
+    # The upload is closed once the response is sent, so copy it to a file the
+    # job owns. Copying in fixed-size blocks keeps memory flat.
+    spool = tempfile.NamedTemporaryFile(prefix="atlas-import-", suffix=f".{fmt}", delete=False)
+    try:
+        while block := await file.read(UPLOAD_BUFFER_SIZE):
+            await asyncio.to_thread(spool.write, block)
+    except Exception:
+        spool.close()
+        os.unlink(spool.name)
+        raise
+    spool.close()
+
+    job = create_job(session, "import_records", model.workspace_id, model_id=model.id, user_id=current_user.id)
+    await session.commit()
+    await session.refresh(job)
+    background_tasks.add_task(
+        run_job,
+        job.id,
+        partial(import_records_from_file, model.id, current_user.id, spool.name, fmt, column_map, atomic),
+    )
+    return job
@@ -1,28 +1,57 @@
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from functools import partial
+from fastapi import APIRouter, BackgroundTasks, Depends, Header, HTTPException, Query, Response, status
+from fastapi.responses import JSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import delete, select
+from sqlalchemy import select
+from sqlalchemy.orm import selectinload
+from ..authz import ADMIN_ROLES, get_authorized_model, require_membership
 from ..dependencies import get_current_user
 from ..db import get_session
-from ..models import Model, ModelField, WorkspaceMember
-from ..schemas import ModelCreate, ModelRead, ModelUpdate
+from ..models import FieldIndex, Model, ModelField
+from ..data_migrations import migrate_records, migration_operations, schedule_migration
+from ..field_diff import diff_fields
+from ..jobs import run_job
+from ..core_config import settings
+from ..purge import has_more_records, purge_model, schedule_purge
+from ..unique_indexes import apply_unique_indexes, schedule_unique_indexes, unique_slugs
+from ..schemas import FieldIndexRead, JobRead, ModelCreate, ModelRead, ModelUpdate, ModelUpdateRead
+from ..schema_registry import (
+    SchemaEntry,
+    etag_matches,
+    invalidate_model,
+    lookup_by_slug,
+    notify_model_changed,
+    register_model,
+    schema_registry,
+)
+from ..indexes import (
+    drop_indexes,
+    index_statistics,
+    model_scope,
+    run_index_maintenance,
+    sync_field_indexes,
+    unique_index_errors,
+    unique_index_name,
+)
 
 router = APIRouter(prefix="/models", tags=["models"])
 
 
+async def _check_unique_values(session: AsyncSession, model_id: int, slugs: set[str]) -> None:
+    errors = await unique_index_errors(session, model_id, slugs)
+    if errors:
+        await session.rollback()
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=errors)
+
+
 @router.post("/", response_model=ModelRead)
 async def create_model(
     payload: ModelCreate,
+    background_tasks: BackgroundTasks,
     session: AsyncSession = Depends(get_session),
     current_user=Depends(get_current_user),
 ):
-    membership = await session.execute(
-        select(WorkspaceMember).where(
-            WorkspaceMember.user_id == current_user.id,
-            WorkspaceMember.workspace_id == payload.workspace_id,
-        )
-    )
-    if not membership.scalars().first():
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not a member of workspace")
+    await require_membership(session, current_user.id, payload.workspace_id)
 
     model = Model(
         workspace_id=payload.workspace_id,
@@ -47,94 +76,152 @@ async def create_model(
                 config=field.config,
             )
         )
+    await session.flush()
+    if await sync_field_indexes(session, model.id):
+        background_tasks.add_task(run_index_maintenance, model.id)
+    unique = {field.slug for field in payload.fields if field.is_unique}
+    unique_job = schedule_unique_indexes(session, model, current_user.id, unique, ()) if unique else None
     await session.commit()
+    if unique_job is not None:
+        background_tasks.add_task(run_job, unique_job.id, partial(apply_unique_indexes, model.id))
     await session.refresh(model)
     await session.refresh(model, attribute_names=["fields"])
     return model
 
 
-@router.put("/{model_id}", response_model=ModelRead)
-@router.patch("/{model_id}", response_model=ModelRead)
+@router.put("/{model_id}", response_model=ModelUpdateRead)
+@router.patch("/{model_id}", response_model=ModelUpdateRead)
 async def update_model(
     model_id: int,
     payload: ModelUpdate,
+    background_tasks: BackgroundTasks,
     session: AsyncSession = Depends(get_session),
     current_user=Depends(get_current_user),
 ):
-    model_result = await session.execute(select(Model).where(Model.id == model_id))
+    model_result = await session.execute(
+        select(Model)
+        .where(Model.id == model_id, Model.deleted_at.is_(None))
+        .options(selectinload(Model.fields))
+    )
     model = model_result.scalars().first()
     if not model:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Model not found")
 
-    membership = await session.execute(
-        select(WorkspaceMember).where(
-            WorkspaceMember.user_id == current_user.id,
-            WorkspaceMember.workspace_id == model.workspace_id,
-        )
-    )
-    if not membership.scalars().first():
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not a member of workspace")
+    await require_membership(session, current_user.id, model.workspace_id)
 
     update_data = payload.model_dump(exclude_unset=True)
+    attributes_changed = False
+    for attribute in ("name", "slug", "description"):
+        if attribute in update_data and getattr(model, attribute) != update_data[attribute]:
+            setattr(model, attribute, update_data[attribute])
+            attributes_changed = True
 
-    if "name" in update_data:
-        model.name = update_data["name"]
-    if "slug" in update_data:
-        model.slug = update_data["slug"]
-    if "description" in update_data:
-        model.description = update_data.get("description")
+    report: dict = {}
+    diff = diff_fields(model.fields, payload.fields or []) if "fields" in update_data else None
+    if diff is not None and diff.errors:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=diff.errors)
 
-    if "fields" in update_data:
-        new_fields = update_data.get("fields") or []
-        await session.execute(delete(ModelField).where(ModelField.model_id == model.id))
+    if diff is not None and diff.changed:
+        previous_unique = {field.slug for field in model.fields if field.is_unique}
+        for row in diff.deletes:
+            await session.delete(row)
+        for row, changes in diff.updates:
+            for attribute, value in changes.items():
+                setattr(row, attribute, value)
+        for values in diff.inserts:
+            session.add(ModelField(model_id=model.id, **values))
         await session.flush()
-        for field in new_fields:
-            if not field.name or not field.slug or not field.data_type:
-                raise HTTPException(
-                    status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
-                    detail="Fields must include name, slug, and data_type",
-                )
-            session.add(
-                ModelField(
-                    model_id=model.id,
-                    name=field.name,
-                    slug=field.slug,
-                    data_type=field.data_type,
-                    is_required=field.is_required if field.is_required is not None else False,
-                    is_unique=field.is_unique if field.is_unique is not None else False,
-                    position=field.position or 0,
-                    config=field.config,
-                )
+
+        current_unique = await unique_slugs(session, model.id)
+        await _check_unique_values(session, model.id, current_unique - previous_unique)
+        pending_indexes = await sync_field_indexes(session, model.id)
+        if pending_indexes:
+            background_tasks.add_task(run_index_maintenance, model.id)
+        unique_job = None
+        if current_unique != previous_unique:
+            unique_job = schedule_unique_indexes(
+                session, model, current_user.id, current_unique - previous_unique, previous_unique - current_unique
             )
+            await session.flush()
+            background_tasks.add_task(run_job, unique_job.id, partial(apply_unique_indexes, model.id))
+        operations = migration_operations(diff)
+        if operations:
+            migration = schedule_migration(session, model, current_user.id, operations)
+            await session.flush()
+            background_tasks.add_task(run_job, migration.id, partial(migrate_records, model.id))
+        report = {
+            "added": [values["slug"] for values in diff.inserts],
+            "updated": [changes.get("slug", row.slug) for row, changes in diff.updates],
+            "removed": [row.slug for row in diff.deletes],
+            "renamed": dict(diff.renamed),
+            "retyped": {slug: new_type for slug, _, new_type in diff.retyped},
+            "unique_indexes_created": sorted(current_unique - previous_unique),
+            "unique_indexes_dropped": sorted(previous_unique - current_unique),
+            "unique_index_job_id": unique_job.id if unique_job else None,
+            "field_indexes_pending": pending_indexes,
+            "migration_job_id": migration.id if operations else None,
+        }
 
+    # Only real changes bump the version, so unchanged saves keep ETags and
+    # compiled validators valid.
+    changed = attributes_changed or bool(report)
+    if changed:
+        model.schema_version = (model.schema_version or 0) + 1
+        await notify_model_changed(session, model.id)
     await session.commit()
+    if changed:
+        invalidate_model(model.id)
     await session.refresh(model)
     await session.refresh(model, attribute_names=["fields"])
-    return model
+    return ModelUpdateRead.model_validate(
+        {
+            **ModelRead.model_validate(model).model_dump(),
+            "changes": {**report, "schema_version": model.schema_version, "caches_invalidated": changed},
+        }
+    )
 
 
-@router.delete("/{model_id}", status_code=status.HTTP_204_NO_CONTENT)
+@router.delete(
+    "/{model_id}",
+    status_code=status.HTTP_204_NO_CONTENT,
+    responses={status.HTTP_202_ACCEPTED: {"model": JobRead, "description": "Large model queued for purge"}},
+)
 async def delete_model(
     model_id: int,
+    background_tasks: BackgroundTasks,
     session: AsyncSession = Depends(get_session),
     current_user=Depends(get_current_user),
 ):
-    model_result = await session.execute(select(Model).where(Model.id == model_id))
+    model_result = await session.execute(select(Model).where(Model.id == model_id, Model.deleted_at.is_(None)))
     model = model_result.scalars().first()
     if not model:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Model not found")
 
-    membership = await session.execute(
-        select(WorkspaceMember).where(
-            WorkspaceMember.user_id == current_user.id,
-            WorkspaceMember.workspace_id == model.workspace_id,
-        )
-    )
-    if not membership.scalars().first():
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not a member of workspace")
+    await require_membership(session, current_user.id, model.workspace_id)
 
-    await session.delete(model)
+    field_indexes = await session.execute(select(FieldIndex.index_name).where(FieldIndex.model_id == model.id))
+    index_names = [unique_index_name(model.id, slug) for slug in sorted(await unique_slugs(session, model.id))]
+    index_names += field_indexes.scalars().all()
+    # Expression indexes are not tied to rows, so they outlive the cascade.
+    background_tasks.add_task(drop_indexes, index_names)
+
+    job = None
+    if await has_more_records(session, model_scope(model.id), settings.purge_sync_threshold):
+        job = schedule_purge(session, model, current_user.id)
+    else:
+        # Fields, records and index bookkeeping go with ON DELETE CASCADE.
+        await session.delete(model)
+    await notify_model_changed(session, model_id)
     await session.commit()
+    invalidate_model(model_id)
+
+    if job is None:
+        return Response(status_code=status.HTTP_204_NO_CONTENT)
+    await session.refresh(job)
+    background_tasks.add_task(run_job, job.id, partial(purge_model, model_id))
+    return JSONResponse(
+        status_code=status.HTTP_202_ACCEPTED, content=JobRead.model_validate(job).model_dump(mode="json")
+    )
 
 
 @router.get("/", response_model=list[ModelRead])
@@ -143,70 +230,86 @@ async def list_models(
     session: AsyncSession = Depends(get_session),
     current_user=Depends(get_current_user),
 ):
-    membership = await session.execute(
-        select(WorkspaceMember).where(
-            WorkspaceMember.user_id == current_user.id, WorkspaceMember.workspace_id == workspace_id
-        )
-    )
-    if not membership.scalars().first():
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not a member of workspace")
+    await require_membership(session, current_user.id, workspace_id)
 
     result = await session.execute(
         select(Model)
-        .where(Model.workspace_id == workspace_id)
+        .where(Model.workspace_id == workspace_id, Model.deleted_at.is_(None))
+        .options(selectinload(Model.fields))
         .order_by(Model.created_at.desc())
     )
-    models = result.scalars().unique().all()
-    for model in models:
-        await session.refresh(model, attribute_names=["fields"])
-    return models
+    return result.scalars().all()
+
+
+def _schema_response(entry: SchemaEntry, if_none_match: str | None) -> Response:
+    headers = {"ETag": entry.etag, "Cache-Control": "private, no-cache"}
+    if etag_matches(if_none_match, entry.etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=entry.body, media_type="application/json", headers=headers)
 
 
 @router.get("/by-slug/{slug}", response_model=ModelRead)
 async def get_model_by_slug(
     slug: str,
     workspace_id: int = Query(..., description="Workspace to scope model lookup"),
+    if_none_match: str | None = Header(None),
     session: AsyncSession = Depends(get_session),
     current_user=Depends(get_current_user),
 ):
-    membership = await session.execute(
-        select(WorkspaceMember).where(
-            WorkspaceMember.user_id == current_user.id, WorkspaceMember.workspace_id == workspace_id
+    await require_membership(session, current_user.id, workspace_id)
+    entry = lookup_by_slug(workspace_id, slug)
+    if entry is None:
+        model_result = await session.execute(
+            select(Model)
+            .where(Model.workspace_id == workspace_id, Model.slug == slug, Model.deleted_at.is_(None))
+            .options(selectinload(Model.fields))
         )
-    )
-    if not membership.scalars().first():
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not a member of workspace")
-
-    model_result = await session.execute(
-        select(Model).where(Model.workspace_id == workspace_id, Model.slug == slug)
-    )
-    model = model_result.scalars().first()
-    if not model:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Model not found")
-
-    await session.refresh(model, attribute_names=["fields"])
-    return model
+        model = model_result.scalars().first()
+        if not model:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Model not found")
+        entry = register_model(model)
+    return _schema_response(entry, if_none_match)
 
 
 @router.get("/{model_id}", response_model=ModelRead)
 async def get_model(
     model_id: int,
+    if_none_match: str | None = Header(None),
     session: AsyncSession = Depends(get_session),
     current_user=Depends(get_current_user),
 ):
-    model_result = await session.execute(select(Model).where(Model.id == model_id))
-    model = model_result.scalars().first()
-    if not model:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Model not found")
-
-    membership = await session.execute(
-        select(WorkspaceMember).where(
-            WorkspaceMember.user_id == current_user.id,
-            WorkspaceMember.workspace_id == model.workspace_id,
+    # With warm caches (principal, role, schema) this answers without a query.
+    entry = schema_registry.get(model_id)
+    if entry is None:
+        model_result = await session.execute(
+            select(Model).where(Model.id == model_id, Model.deleted_at.is_(None)).options(selectinload(Model.fields))
         )
-    )
-    if not membership.scalars().first():
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not a member of workspace")
+        model = model_result.scalars().first()
+        if not model:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Model not found")
+        await require_membership(session, current_user.id, model.workspace_id)
+        entry = register_model(model)
+    else:
+        await require_membership(session, current_user.id, entry.workspace_id)
+    return _schema_response(entry, if_none_match)
 
-    await session.refresh(model, attribute_names=["fields"])
-    return model
+
+@router.get("/{model_id}/indexes", response_model=list[FieldIndexRead])
+async def list_model_indexes(
+    model_id: int,
+    session: AsyncSession = Depends(get_session),
+    current_user=Depends(get_current_user),
+):
+    await get_authorized_model(session, model_id, current_user.id, ADMIN_ROLES)
+
+    result = await session.execute(
+        select(FieldIndex).where(FieldIndex.model_id == model_id).order_by(FieldIndex.field_slug)
+    )
+    indexes = result.scalars().all()
+    stats = await index_statistics(session, [index.index_name for index in indexes])
+    return [
+        FieldIndexRead.model_validate(
+            {**FieldIndexRead.model_validate(index).model_dump(), **stats.get(index.index_name, {})}
+        )
+        for index in indexes
+    ]
@@ -1,169 +1,132 @@
-from datetime import datetime, date
-from typing import Any
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from decimal import Decimal
+from functools import partial
+from typing import Any, Iterable, Sequence
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Response, status
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, asc, desc
+from sqlalchemy import insert, select, func
 from sqlalchemy.sql import Select
+from ..authz import ModelRef, get_authorized_model, require_membership, resolve_model
 from ..dependencies import get_current_user
-from ..db import get_session
-from ..models import Record, Model, ModelField, WorkspaceMember
-from ..schemas import RecordCreate, RecordRead, RecordListResponse
-from ..core_config import settings
+from ..db import AsyncSessionLocal, get_session
+from ..models import Record, Model
+from ..schemas import (
+    JobRead,
+    RecordAggregateResponse,
+    RecordBatchCreate,
+    RecordBatchResult,
+    RecordCreate,
+    RecordListResponse,
+    RecordRead,
+)
+from ..instrumentation import timed
+from ..jobs import create_job, run_job, update_job
+from ..model_schema import ModelSchema, get_model_schema
+from ..indexes import field_text, model_scope, unique_text, unique_violation_field
+from ..record_limits import RECORD_LIMIT_DETAIL, release_records, reserve_records
+from ..record_validation import batch_errors, document_errors, load_related, validate_record_payload
+from ..expand import MAX_EXPAND_DEPTH, ExpandTree, expand_records, parse_expand
+from ..search import search_clause
+from ..serialization import record_columns, record_json, record_page_json
+from ..pagination import decode_cursor, encode_cursor, keyset_predicate, order_by_keyset
+from ..query import (
+    FilterSpec,
+    apply_filters,
+    field_types,
+    group_expression,
+    metric_expression,
+    parse_filter,
+    parse_projection,
+    sort_columns,
+)
 
 router = APIRouter(tags=["records"])
 
 
-async def ensure_membership(session: AsyncSession, user_id: int, workspace_id: int):
-    membership = await session.execute(
-        select(WorkspaceMember).where(
-            WorkspaceMember.user_id == user_id, WorkspaceMember.workspace_id == workspace_id
-        )
-    )
-    if not membership.scalars().first():
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not a member of workspace")
+VALIDATION_BATCH_SIZE = 500
+MAX_REPORTED_INVALID = 1000
 
 
-def _coerce_date(value: Any) -> date:
-    if isinstance(value, (datetime, date)):
-        return value.date() if isinstance(value, datetime) else value
-    if isinstance(value, str):
-        return datetime.fromisoformat(value).date()
-    raise ValueError("Invalid date")
+async def validate_model_records(model_id: int, job_id: int) -> dict:
+    """Check every stored record of a model against its current fields.
 
+    Records are read in id-ordered batches; relation targets are resolved with
+    one query per batch and duplicate unique values with one query per field.
+    """
+    async with AsyncSessionLocal() as session:
+        model = await session.get(Model, model_id)
+        if model is None:
+            raise ValueError("Model not found")
+        schema = await get_model_schema(session, model)
 
-def _validate_field(field: ModelField, value: Any) -> str | None:
-    if value is None:
-        return "Field cannot be null"
+        count_result = await session.execute(select(func.count()).select_from(Record).where(model_scope(model_id)))
+        await update_job(job_id, total=count_result.scalar_one())
 
-    try:
-        if field.data_type in {"string", "text"}:
-            if not isinstance(value, str):
-                return "Must be a string"
-        elif field.data_type == "number":
-            if isinstance(value, bool) or not isinstance(value, (int, float)):
-                return "Must be a number"
-        elif field.data_type == "boolean":
-            if not isinstance(value, bool):
-                return "Must be a boolean"
-        elif field.data_type == "date":
-            _coerce_date(value)
-        elif field.data_type == "datetime":
-            if isinstance(value, str):
-                datetime.fromisoformat(value)
-            elif not isinstance(value, datetime):
-                return "Must be a datetime string or object"
-        elif field.data_type == "enum":
-            options = []
-            if isinstance(field.config, dict):
-                options = field.config.get("values") or field.config.get("options") or []
-            if value not in options:
-                return "Value not permitted"
-        elif field.data_type == "relation":
-            if not isinstance(value, int):
-                return "Must reference related record id"
-        else:
-            return "Unsupported field type"
-    except Exception:
-        return "Invalid value"
-    return None
-
-
-async def _validate_relation_record(
-    session: AsyncSession, field: ModelField, value: int, default_workspace_id: int
-) -> str | None:
-    record_result = await session.execute(select(Record).where(Record.id == value))
-    related_record = record_result.scalars().first()
-    if not related_record:
-        return "Related record not found"
-
-    config = field.config if isinstance(field.config, dict) else {}
-    expected_workspace_id = config.get("workspace_id", default_workspace_id)
-    expected_model_id = config.get("model_id")
-
-    if expected_workspace_id and related_record.workspace_id != expected_workspace_id:
-        return "Related record belongs to a different workspace"
-
-    if expected_model_id and related_record.model_id != expected_model_id:
-        return "Related record belongs to a different model"
-
-    return None
-
-
-async def _validate_uniqueness(
-    session: AsyncSession, model: Model, field: ModelField, value: Any, record_id: int | None
-) -> str | None:
-    result = await session.execute(select(Record.id, Record.data).where(Record.model_id == model.id))
-    for existing_id, record_data in result.all():
-        if record_id and existing_id == record_id:
-            continue
-        if isinstance(record_data, dict) and record_data.get(field.slug) == value:
-            return "Value must be unique"
-    return None
-
-
-async def validate_record_payload(
-    session: AsyncSession, model: Model, data: dict, record_id: int | None = None
-) -> None:
-    await session.refresh(model, attribute_names=["fields"])
-    errors: list[dict[str, str]] = []
-    data = data or {}
-
-    for field in model.fields:
-        if field.is_required and field.slug not in data:
-            errors.append({"field": field.slug, "error": "Field is required"})
-            continue
-
-        if field.slug not in data:
-            continue
-
-        value = data.get(field.slug)
-        error = _validate_field(field, value)
-        if error:
-            errors.append({"field": field.slug, "error": error})
-            continue
-
-        if field.data_type == "relation":
-            relation_error = await _validate_relation_record(
-                session, field, value, default_workspace_id=model.workspace_id
+        duplicates: dict[str, set[str]] = {}
+        for field in schema.unique_fields:
+            value = field_text(field.slug)
+            duplicate_result = await session.execute(
+                select(value)
+                .where(model_scope(model_id), value.is_not(None))
+                .group_by(value)
+                .having(func.count() > 1)
             )
-            if relation_error:
-                errors.append({"field": field.slug, "error": relation_error})
-                continue
-
-        if field.is_unique:
-            unique_error = await _validate_uniqueness(session, model, field, value, record_id)
-            if unique_error:
-                errors.append({"field": field.slug, "error": unique_error})
-
-    if errors:
-        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=errors)
-
-
-async def get_model_with_membership(
-    session: AsyncSession, model_id: int, user_id: int
-) -> Model:
-    model_result = await session.execute(select(Model).where(Model.id == model_id))
-    model = model_result.scalars().first()
-    if not model:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Model not found")
-    await ensure_membership(session, user_id, model.workspace_id)
-    return model
-
-
-def _apply_sorting(query: Select, sort_by: str | None, sort_order: str) -> Select:
-    if not sort_by or sort_by in {"created_at", "updated_at"}:
-        column = Record.created_at if not sort_by or sort_by == "created_at" else Record.updated_at
-        return query.order_by(asc(column) if sort_order == "asc" else desc(column))
-
-    json_field = Record.data[sort_by].astext
-    sorter = asc(json_field) if sort_order == "asc" else desc(json_field)
-    return query.order_by(sorter)
-
-
-def _apply_filters(query: Select, filter_key: str | None, filter_value: str | None) -> Select:
-    if filter_key and filter_value is not None:
-        query = query.where(Record.data[filter_key].astext == str(filter_value))
-    return query
+            duplicates[field.slug] = set(duplicate_result.scalars().all())
+
+        invalid: list[dict] = []
+        invalid_count = 0
+        processed = 0
+        last_id = 0
+        while True:
+            batch_result = await session.execute(
+                select(Record.id, Record.data)
+                .where(model_scope(model_id), Record.id > last_id)
+                .order_by(Record.id)
+                .limit(VALIDATION_BATCH_SIZE)
+            )
+            batch = batch_result.all()
+            if not batch:
+                break
+
+            related = await load_related(session, schema, [data for _, data in batch])
+            for record_id, data in batch:
+                data = data if isinstance(data, dict) else {}
+                errors = document_errors(schema, data, related)
+                for field in schema.unique_fields:
+                    if field.slug in data and field.slug not in errors:
+                        if unique_text(data[field.slug]) in duplicates[field.slug]:
+                            errors[field.slug] = "Value must be unique"
+                if errors:
+                    invalid_count += 1
+                    if len(invalid) < MAX_REPORTED_INVALID:
+                        invalid.append(
+                            {
+                                "record_id": record_id,
+                                "errors": [{"field": slug, "error": error} for slug, error in errors.items()],
+                            }
+                        )
+
+            processed += len(batch)
+            last_id = batch[-1][0]
+            await update_job(job_id, processed=processed)
+
+    return {"invalid_count": invalid_count, "invalid": invalid, "truncated": invalid_count > len(invalid)}
+
+
+async def _commit_record(session: AsyncSession, schema: ModelSchema) -> None:
+    # The partial unique indexes catch concurrent writers that both passed
+    # the pre-check in validate_record_payload.
+    try:
+        await session.commit()
+    except IntegrityError as exc:
+        await session.rollback()
+        slug = unique_violation_field(exc, schema.model_id, schema.unique_slugs)
+        if slug is None:
+            raise
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=[{"field": slug, "error": "Value must be unique"}],
+        )
 
 
 @router.post("/models/{model_id}/records", response_model=RecordRead)
@@ -173,14 +136,12 @@ async def create_record(
     session: AsyncSession = Depends(get_session),
     current_user=Depends(get_current_user),
 ):
-    model = await get_model_with_membership(session, model_id, current_user.id)
+    model = await get_authorized_model(session, model_id, current_user.id)
 
-    await validate_record_payload(session, model, payload.data)
+    schema = await validate_record_payload(session, model, payload.data)
 
-    count_result = await session.execute(select(func.count()).select_from(Record).where(Record.model_id == model_id))
-    total_records = count_result.scalar_one()
-    if total_records >= settings.free_record_limit:
-        raise HTTPException(status_code=status.HTTP_402_PAYMENT_REQUIRED, detail="Record limit reached. Upgrade plan")
+    if not await reserve_records(session, model_id, model.workspace_id, 1):
+        raise HTTPException(status_code=status.HTTP_402_PAYMENT_REQUIRED, detail=RECORD_LIMIT_DETAIL)
 
     record = Record(
         model_id=model_id,
@@ -190,57 +151,262 @@ async def create_record(
         data=payload.data,
     )
     session.add(record)
-    await session.commit()
+    await _commit_record(session, schema)
     await session.refresh(record)
     return record
 
 
+@router.post(
+    "/models/{model_id}/records:validate", response_model=JobRead, status_code=status.HTTP_202_ACCEPTED
+)
+async def start_model_validation(
+    model_id: int,
+    background_tasks: BackgroundTasks,
+    session: AsyncSession = Depends(get_session),
+    current_user=Depends(get_current_user),
+):
+    model = await get_authorized_model(session, model_id, current_user.id)
+    job = create_job(session, "validate_records", model.workspace_id, model_id=model.id, user_id=current_user.id)
+    await session.commit()
+    await session.refresh(job)
+    background_tasks.add_task(run_job, job.id, partial(validate_model_records, model.id))
+    return job
+
+
+@router.post("/models/{model_id}/records:batch", response_model=RecordBatchResult)
+async def create_records_batch(
+    model_id: int,
+    payload: RecordBatchCreate,
+    session: AsyncSession = Depends(get_session),
+    current_user=Depends(get_current_user),
+):
+    model = await get_authorized_model(session, model_id, current_user.id)
+    schema = await get_model_schema(session, model)
+    documents = [item.data or {} for item in payload.records]
+    errors = await batch_errors(session, schema, documents)
+    failed = [
+        {"index": index, "errors": [{"field": slug, "error": error} for slug, error in row_errors.items()]}
+        for index, row_errors in enumerate(errors)
+        if row_errors
+    ]
+    if failed and payload.atomic:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=failed)
+
+    valid = [data for data, row_errors in zip(documents, errors) if not row_errors]
+    if not valid:
+        return {"inserted": 0, "ids": [], "errors": failed}
+
+    if not await reserve_records(session, model_id, model.workspace_id, len(valid)):
+        raise HTTPException(status_code=status.HTTP_402_PAYMENT_REQUIRED, detail=RECORD_LIMIT_DETAIL)
+
+    result = await session.execute(
+        insert(Record).returning(Record.id),
+        [
+            {
+                "model_id": model_id,
+                "workspace_id": model.workspace_id,
+                "created_by": current_user.id,
+                "updated_by": current_user.id,
+                "data": data,
+            }
+            for data in valid
+        ],
+    )
+    ids = list(result.scalars().all())
+    await _commit_record(session, schema)
+    return {"inserted": len(ids), "ids": ids, "errors": failed}
+
+
+async def _field_types(session: AsyncSession, model: ModelRef) -> dict[str, str]:
+    # Served from the compiled schema cache on warm requests.
+    schema = await get_model_schema(session, model)
+    return field_types(schema.fields)
+
+
+def _filter_specs(filters: list[str], filter_key: str | None, filter_value: str | None) -> list[FilterSpec]:
+    filter_specs = [parse_filter(raw) for raw in filters]
+    if filter_key and filter_value is not None:
+        filter_specs.append(FilterSpec(key=filter_key, op="eq", value=filter_value))
+    return filter_specs
+
+
+def _json_number(value: Any) -> Any:
+    if isinstance(value, Decimal):
+        return int(value) if value == value.to_integral_value() else float(value)
+    return value
+
+
+@router.get("/models/{model_id}/records/aggregate", response_model=RecordAggregateResponse)
+async def aggregate_records(
+    model_id: int,
+    group_by: list[str] = Query([], description="Repeatable field key (enum, boolean, string, date, datetime)"),
+    bucket: str = Query("day", pattern="^(day|week|month)$", description="Bucket for date/datetime groups"),
+    metrics: list[str] = Query(["count"], alias="metric", description="count or sum|avg|min|max:<number field>"),
+    filter_key: str | None = Query(None),
+    filter_value: str | None = Query(None),
+    filters: list[str] = Query([], alias="filter", description="Same filters as the record listing"),
+    limit: int = Query(1000, gt=0, le=10000),
+    session: AsyncSession = Depends(get_session),
+    current_user=Depends(get_current_user),
+):
+    model = await get_authorized_model(session, model_id, current_user.id)
+    types = await _field_types(session, model)
+
+    groups = [group_expression(key, bucket, types).label(f"g{index}") for index, key in enumerate(group_by)]
+    values = [metric_expression(raw, types).label(f"m{index}") for index, raw in enumerate(metrics)]
+    query = select(*groups, *values).select_from(Record).where(model_scope(model_id))
+    query = apply_filters(query, _filter_specs(filters, filter_key, filter_value), types)
+    if groups:
+        query = query.group_by(*groups).order_by(*groups).limit(limit)
+
+    result = await session.execute(query)
+    return {
+        "groups": [
+            {
+                "key": dict(zip(group_by, row[: len(groups)])),
+                "values": {raw: _json_number(value) for raw, value in zip(metrics, row[len(groups) :])},
+            }
+            for row in result.all()
+        ]
+    }
+
+
+FIELDS_DESCRIPTION = "Comma separated field slugs; data only contains these keys (null when unset)"
+EXPAND_DESCRIPTION = (
+    f"Comma separated relation field slugs to embed; nest with dots (customer.company) up to {MAX_EXPAND_DEPTH} levels"
+)
+
+
+def _projection(fields: str | None, known: Iterable[str] | None, expand_tree: ExpandTree) -> list[str] | None:
+    slugs = parse_projection(fields, known)
+    # Expanded relations need their ids, so they are always projected.
+    return None if slugs is None else list(dict.fromkeys([*slugs, *expand_tree]))
+
+
+async def _expanded_items(
+    session: AsyncSession, model: ModelRef, records: Sequence[Any], tree: ExpandTree, user_id: int
+) -> list[dict[str, Any]]:
+    schema = await get_model_schema(session, model)
+    expansions = await expand_records(session, schema, records, tree, user_id)
+    with timed("serialize"):
+        return [
+            {**RecordRead.model_validate(record).model_dump(), "expanded": expanded}
+            for record, expanded in zip(records, expansions)
+        ]
+
+
 @router.get("/models/{model_id}/records", response_model=RecordListResponse)
 async def list_records(
     model_id: int,
     skip: int = Query(0, ge=0),
     limit: int = Query(50, gt=0, le=100),
-    sort_by: str | None = Query(None, description="created_at, updated_at or field key"),
+    cursor: str | None = Query(None, description="Opaque next_cursor from a previous page; replaces skip"),
+    include_total: bool = Query(False, description="Count all matching records (extra query)"),
+    sort_by: str | None = Query(
+        None, description="Comma separated created_at, updated_at or field keys; prefix with - for descending"
+    ),
     sort_order: str = Query("asc", pattern="^(asc|desc)$"),
+    q: str | None = Query(
+        None, min_length=1, max_length=200, description="Search string/text values; ranks results unless sort_by is set"
+    ),
+    expand: str | None = Query(None, description=EXPAND_DESCRIPTION),
+    fields: str | None = Query(None, description=FIELDS_DESCRIPTION),
     filter_key: str | None = Query(None),
     filter_value: str | None = Query(None),
+    filters: list[str] = Query(
+        [], alias="filter", description="Repeatable key:operator:value with eq, gt, gte, lt, lte, in, between, contains"
+    ),
     session: AsyncSession = Depends(get_session),
     current_user=Depends(get_current_user),
 ):
-    await get_model_with_membership(session, model_id, current_user.id)
-
-    base_query: Select = select(Record).where(Record.model_id == model_id)
-    filtered_query = _apply_filters(base_query, filter_key, filter_value)
-
-    count_query = select(func.count()).select_from(Record).where(Record.model_id == model_id)
-    count_query = _apply_filters(count_query, filter_key, filter_value)
-
-    count_result = await session.execute(count_query)
-    total = count_result.scalar_one()
-
-    paginated_query = _apply_sorting(filtered_query, sort_by, sort_order)
-    paginated_query = paginated_query.offset(skip).limit(limit)
-
-    result = await session.execute(paginated_query)
-    items = result.scalars().all()
-
-    return {"items": items, "total": total, "has_more": skip + len(items) < total}
+    model = await get_authorized_model(session, model_id, current_user.id)
+    expand_tree = parse_expand(expand)
+
+    types = await _field_types(session, model)
+    filter_specs = _filter_specs(filters, filter_key, filter_value)
+    projection = _projection(fields, types, expand_tree)
+
+    # Without expansion the page is rendered straight from the JSON text.
+    entity = record_columns(projection, raw=not expand_tree)
+    base_query: Select = select(*entity).where(model_scope(model_id))
+    count_query = select(func.count()).select_from(Record).where(model_scope(model_id))
+    if q:
+        match, score = search_clause(q)
+        base_query = base_query.where(match)
+        count_query = count_query.where(match)
+    filtered_query = apply_filters(base_query, filter_specs, types)
+
+    total = None
+    if include_total:
+        count_query = apply_filters(count_query, filter_specs, types)
+        count_result = await session.execute(count_query)
+        total = count_result.scalar_one()
+
+    if q and not sort_by:
+        columns = [(score, "desc")]
+        signature = f"q={q}"
+    else:
+        columns = sort_columns(sort_by, sort_order, types)
+        signature = f"{sort_by or 'created_at'}:{sort_order}"
+    paginated_query = filtered_query.add_columns(*(column for column, _ in columns))
+    paginated_query = order_by_keyset(paginated_query, columns)
+    if cursor:
+        values, last_id = decode_cursor(cursor, signature, len(columns))
+        paginated_query = paginated_query.where(keyset_predicate(columns, values, last_id))
+    else:
+        paginated_query = paginated_query.offset(skip)
+
+    # One extra row tells us whether another page exists without a count.
+    result = await session.execute(paginated_query.limit(limit + 1))
+    rows = result.all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    next_cursor = None
+    if has_more:
+        last = rows[-1]
+        next_cursor = encode_cursor(signature, list(last[len(entity) :]), last[0])
+
+    if not expand_tree:
+        with timed("serialize"):
+            content = record_page_json([row[: len(entity)] for row in rows], total, has_more, next_cursor)
+        return Response(content=content, media_type="application/json")
+    items = await _expanded_items(session, model, rows, expand_tree, current_user.id)
+    return {"items": items, "total": total, "has_more": has_more, "next_cursor": next_cursor}
 
 
 @router.get("/records/{record_id}", response_model=RecordRead)
 async def view_record(
     record_id: int,
+    expand: str | None = Query(None, description=EXPAND_DESCRIPTION),
+    fields: str | None = Query(None, description=FIELDS_DESCRIPTION),
     session: AsyncSession = Depends(get_session),
     current_user=Depends(get_current_user),
 ):
-    record_result = await session.execute(select(Record).where(Record.id == record_id))
-    record = record_result.scalars().first()
+    expand_tree = parse_expand(expand)
+    # Slugs are checked once the record's model is known; the projection only
+    # reads keys, so it can be built before that.
+    slugs = _projection(fields, None, expand_tree)
+    record_result = await session.execute(
+        select(*record_columns(slugs, raw=not expand_tree)).where(Record.id == record_id)
+    )
+    record = record_result.first()
     if not record:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Record not found")
 
-    model = await get_model_with_membership(session, record.model_id, current_user.id)
-    await validate_record_payload(session, model, record.data, record_id=record.id)
-    return record
+    # Reads trust the stored document; integrity is checked at write time and
+    # by the validate-model job.
+    await require_membership(session, current_user.id, record.workspace_id)
+    if slugs is not None or expand_tree:
+        model = await resolve_model(session, record.model_id)
+    if slugs is not None:
+        schema = await get_model_schema(session, model)
+        parse_projection(fields, [field.slug for field in schema.fields])
+    if expand_tree:
+        return (await _expanded_items(session, model, [record], expand_tree, current_user.id))[0]
+    with timed("serialize"):
+        content = record_json(record)
+    return Response(content=content, media_type="application/json")
 
 
 @router.put("/records/{record_id}", response_model=RecordRead)
@@ -255,12 +421,12 @@ async def update_record(
     if not record:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Record not found")
 
-    model = await get_model_with_membership(session, record.model_id, current_user.id)
-    await validate_record_payload(session, model, payload.data, record_id=record.id)
+    model = await get_authorized_model(session, record.model_id, current_user.id)
+    schema = await validate_record_payload(session, model, payload.data, record_id=record.id)
 
     record.data = payload.data
     record.updated_by = current_user.id
-    await session.commit()
+    await _commit_record(session, schema)
     await session.refresh(record)
     return record
 
@@ -276,7 +442,8 @@ async def delete_record(
     if not record:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Record not found")
 
-    await ensure_membership(session, current_user.id, record.workspace_id)
+    await require_membership(session, current_user.id, record.workspace_id)
 
     await session.delete(record)
+    await release_records(session, record.model_id)
     await session.commit()
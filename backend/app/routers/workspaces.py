@@ -1,9 +1,15 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Response, status
 from sqlalchemy import select
+from sqlalchemy.orm import joinedload
 from sqlalchemy.ext.asyncio import AsyncSession
+from ..authz import invalidate_memberships, require_membership
 from ..dependencies import get_current_user
 from ..db import get_session
-from ..models import Workspace, WorkspaceMember
+from ..core_config import settings
+from ..indexes import drop_indexes, unique_index_name
+from ..models import FieldIndex, Model, ModelField, Record, Workspace, WorkspaceMember
+from ..purge import has_more_records
+from ..schema_registry import invalidate_model, notify_model_changed
 from ..schemas import WorkspaceCreate, WorkspaceRead, WorkspaceMembershipRead
 
 router = APIRouter(prefix="/workspaces", tags=["workspaces"])
@@ -17,12 +23,11 @@ async def list_memberships(
     current_user=Depends(get_current_user),
 ):
     result = await session.execute(
-        select(WorkspaceMember).where(WorkspaceMember.user_id == current_user.id)
+        select(WorkspaceMember)
+        .where(WorkspaceMember.user_id == current_user.id)
+        .options(joinedload(WorkspaceMember.workspace))
     )
-    memberships = result.scalars().all()
-    for membership in memberships:
-        await session.refresh(membership, attribute_names=["workspace"])
-    return memberships
+    return result.scalars().all()
 
 
 @router.post("/", response_model=WorkspaceRead, status_code=status.HTTP_201_CREATED)
@@ -42,5 +47,46 @@ async def create_workspace(
     membership = WorkspaceMember(user_id=current_user.id, workspace_id=workspace.id, role="owner")
     session.add(membership)
     await session.commit()
+    invalidate_memberships(user_id=current_user.id)
     await session.refresh(workspace)
     return workspace
+
+
+@router.delete("/{workspace_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_workspace(
+    workspace_id: int,
+    background_tasks: BackgroundTasks,
+    session: AsyncSession = Depends(get_session),
+    current_user=Depends(get_current_user),
+):
+    await require_membership(session, current_user.id, workspace_id, {"owner"})
+    workspace = await session.get(Workspace, workspace_id)
+    if not workspace:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Workspace not found")
+    # The cascade runs in this one transaction; large models go through the
+    # chunked purge (DELETE /models/{id}) first.
+    if await has_more_records(session, Record.workspace_id == workspace_id, settings.purge_sync_threshold):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Workspace has too many records to delete at once; delete its largest models first",
+        )
+
+    model_ids = (await session.execute(select(Model.id).where(Model.workspace_id == workspace_id))).scalars().all()
+    unique_fields = await session.execute(
+        select(ModelField.model_id, ModelField.slug).where(
+            ModelField.model_id.in_(model_ids), ModelField.is_unique.is_(True)
+        )
+    )
+    field_indexes = await session.execute(select(FieldIndex.index_name).where(FieldIndex.model_id.in_(model_ids)))
+    index_names = [unique_index_name(model_id, slug) for model_id, slug in unique_fields.all()]
+    index_names += field_indexes.scalars().all()
+    await session.delete(workspace)
+    for model_id in model_ids:
+        await notify_model_changed(session, model_id)
+    await session.commit()
+    invalidate_memberships(workspace_id=workspace_id)
+    for model_id in model_ids:
+        invalidate_model(model_id)
+    # Expression indexes are not tied to rows, so they outlive the cascade.
+    background_tasks.add_task(drop_indexes, index_names)
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
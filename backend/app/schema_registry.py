@@ -0,0 +1,146 @@
+import asyncio
+import logging
+from dataclasses import dataclass
+import asyncpg
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from .authz import forget_model, model_registry
+from .cache import TTLCache, register_cache
+from .core_config import settings
+from .db import engine
+from .instrumentation import timed
+from .model_schema import schema_cache
+from .principals import evict_principal, principal_cache
+from .models import Model
+from .schemas import ModelRead
+
+logger = logging.getLogger(__name__)
+
+MODEL_CHANGES_CHANNEL = "model_changes"
+# Payloads are model ids; "principal:<user id>" evicts a cached principal.
+PRINCIPAL_PAYLOAD_PREFIX = "principal:"
+LISTENER_RETRY_SECONDS = 5
+
+
+@dataclass(frozen=True)
+class SchemaEntry:
+    """A serialized ``ModelRead`` for one ``schema_version`` of a model."""
+
+    model_id: int
+    workspace_id: int
+    slug: str
+    version: int
+    etag: str
+    body: bytes
+
+
+# Entries are dropped by update/delete notifications; the TTL only bounds how
+# long a missed notification (e.g. while the listener reconnects) can linger.
+schema_registry: TTLCache[SchemaEntry] = register_cache(
+    "model_schemas", TTLCache(settings.schema_cache_size, settings.schema_registry_ttl)
+)
+# (workspace_id, slug) -> model id; verified against the entry on lookup.
+slug_registry: TTLCache[int] = register_cache(
+    "model_slugs", TTLCache(settings.schema_cache_size, settings.schema_registry_ttl)
+)
+
+
+def model_etag(model_id: int, version: int) -> str:
+    return f'"model-{model_id}-v{version}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return "*" in candidates or etag in candidates
+
+
+def register_model(model: Model) -> SchemaEntry:
+    version = model.schema_version or 0
+    with timed("serialize"):
+        body = ModelRead.model_validate(model).model_dump_json().encode()
+    entry = SchemaEntry(
+        model_id=model.id,
+        workspace_id=model.workspace_id,
+        slug=model.slug,
+        version=version,
+        etag=model_etag(model.id, version),
+        body=body,
+    )
+    schema_registry.set(model.id, entry)
+    slug_registry.set((model.workspace_id, model.slug), model.id)
+    return entry
+
+
+def lookup_by_slug(workspace_id: int, slug: str) -> SchemaEntry | None:
+    model_id = slug_registry.get((workspace_id, slug))
+    entry = schema_registry.get(model_id) if model_id is not None else None
+    if entry is None or entry.workspace_id != workspace_id or entry.slug != slug:
+        return None
+    return entry
+
+
+def invalidate_model(model_id: int) -> None:
+    """Drop every per-process cache that holds a model's definition."""
+    entry = schema_registry.get(model_id)
+    schema_registry.pop(model_id)
+    if entry is not None:
+        slug_registry.pop((entry.workspace_id, entry.slug))
+    schema_cache.invalidate(model_id)
+    forget_model(model_id)
+
+
+async def notify_model_changed(session: AsyncSession, model_id: int) -> None:
+    """Queue a notification for other workers; Postgres delivers it on commit."""
+    await session.execute(select(func.pg_notify(MODEL_CHANGES_CHANNEL, str(model_id))))
+
+
+async def notify_principal_changed(session: AsyncSession, user_id: int) -> None:
+    """Queue a principal eviction for other workers; delivered on commit."""
+    await session.execute(select(func.pg_notify(MODEL_CHANGES_CHANNEL, f"{PRINCIPAL_PAYLOAD_PREFIX}{user_id}")))
+
+
+def _on_model_changed(connection, pid, channel, payload: str) -> None:
+    try:
+        if payload.startswith(PRINCIPAL_PAYLOAD_PREFIX):
+            evict_principal(int(payload.removeprefix(PRINCIPAL_PAYLOAD_PREFIX)))
+        else:
+            invalidate_model(int(payload))
+    except ValueError:
+        logger.warning("Ignoring malformed %s payload %r", channel, payload)
+
+
+def _clear_registry() -> None:
+    schema_registry.clear()
+    slug_registry.clear()
+    schema_cache.clear()
+    model_registry.clear()
+    principal_cache.clear()
+
+
+async def listen_for_model_changes() -> None:
+    """Keep a dedicated connection LISTENing for model changes from other workers.
+
+    Notifications sent while the connection is down are lost, so local caches
+    are cleared whenever it (re)connects.
+    """
+    dsn = engine.url.set(drivername="postgresql").render_as_string(hide_password=False)
+    while True:
+        closed = asyncio.Event()
+        connection = None
+        try:
+            connection = await asyncpg.connect(dsn)
+            connection.add_termination_listener(lambda _: closed.set())
+            await connection.add_listener(MODEL_CHANGES_CHANNEL, _on_model_changed)
+            _clear_registry()
+            await closed.wait()
+            logger.warning("Lost %s listener connection; reconnecting", MODEL_CHANGES_CHANNEL)
+        except asyncio.CancelledError:
+            if connection is not None and not connection.is_closed():
+                await connection.close()
+            raise
+        except Exception:
+            logger.exception("Could not listen for %s", MODEL_CHANGES_CHANNEL)
+        _clear_registry()
+        await asyncio.sleep(LISTENER_RETRY_SECONDS)
@@ -1,6 +1,7 @@
 from datetime import datetime
-from typing import List, Optional
-from pydantic import BaseModel, EmailStr, field_validator
+from typing import Dict, List, Optional
+from pydantic import BaseModel, EmailStr, Field, field_validator
+from .core_config import settings
 
 
 class Token(BaseModel):
@@ -14,6 +15,11 @@ class UserCreate(BaseModel):
     name: str | None = None
 
 
+class PasswordChange(BaseModel):
+    current_password: str
+    new_password: str
+
+
 class UserRead(BaseModel):
     id: int
     email: EmailStr
@@ -32,6 +38,8 @@ class WorkspaceRead(BaseModel):
     id: int
     name: str
     created_at: datetime
+    plan: str = "free"
+    record_limit: Optional[int] = None
 
     class Config:
         from_attributes = True
@@ -71,6 +79,7 @@ class FieldRead(FieldCreate):
 
 
 class FieldUpdate(BaseModel):
+    id: Optional[int] = None
     name: Optional[str] = None
     slug: Optional[str] = None
     data_type: Optional[str] = None
@@ -117,10 +126,58 @@ class ModelRead(BaseModel):
         from_attributes = True
 
 
+class ModelChangeReport(BaseModel):
+    """What an update changed and which derived structures were rebuilt."""
+
+    schema_version: int
+    added: List[str] = []
+    updated: List[str] = []
+    removed: List[str] = []
+    renamed: Dict[str, str] = {}
+    retyped: Dict[str, str] = {}
+    unique_indexes_created: List[str] = []
+    unique_indexes_dropped: List[str] = []
+    # Unique index changes are applied by this job; a field whose index
+    # fails to build is made non-unique again.
+    unique_index_job_id: Optional[int] = None
+    field_indexes_pending: List[str] = []
+    caches_invalidated: bool = False
+    migration_job_id: Optional[int] = None
+
+
+class ModelUpdateRead(ModelRead):
+    changes: ModelChangeReport
+
+
 class RecordCreate(BaseModel):
     data: dict
 
 
+class RecordBatchCreate(BaseModel):
+    records: List[RecordCreate] = Field(..., min_length=1, max_length=settings.record_batch_max)
+    # atomic: reject the whole batch on any invalid row; otherwise insert the
+    # valid rows and report the rest.
+    atomic: bool = True
+
+
+class RecordBatchError(BaseModel):
+    index: int
+    errors: List[dict]
+
+
+class RecordBatchResult(BaseModel):
+    inserted: int
+    ids: List[int]
+    errors: List[RecordBatchError]
+
+
+class RelatedRecordRead(BaseModel):
+    id: int
+    model_id: int
+    data: dict
+    expanded: Optional[Dict[str, Optional["RelatedRecordRead"]]] = None
+
+
 class RecordRead(BaseModel):
     id: int
     model_id: int
@@ -130,6 +187,8 @@ class RecordRead(BaseModel):
     data: dict
     created_at: datetime
     updated_at: datetime
+    # Only present for relation fields listed in ``expand``.
+    expanded: Optional[Dict[str, Optional[RelatedRecordRead]]] = None
 
     class Config:
         from_attributes = True
@@ -137,5 +196,55 @@ class RecordRead(BaseModel):
 
 class RecordListResponse(BaseModel):
     items: list[RecordRead]
-    total: int
+    total: Optional[int] = None
     has_more: bool
+    next_cursor: Optional[str] = None
+
+
+class IndexBuildProgress(BaseModel):
+    phase: str
+    blocks_done: int
+    blocks_total: int
+    tuples_done: int
+    tuples_total: int
+
+
+class FieldIndexRead(BaseModel):
+    id: int
+    field_slug: str
+    data_type: str
+    index_name: str
+    status: str
+    error: Optional[str] = None
+    size_bytes: Optional[int] = None
+    progress: Optional[IndexBuildProgress] = None
+    updated_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class JobRead(BaseModel):
+    id: int
+    kind: str
+    status: str
+    workspace_id: int
+    model_id: Optional[int] = None
+    processed: int
+    total: Optional[int] = None
+    result: Optional[dict] = None
+    error: Optional[str] = None
+    created_at: datetime
+    updated_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class RecordAggregateGroup(BaseModel):
+    key: dict
+    values: dict
+
+
+class RecordAggregateResponse(BaseModel):
+    groups: list[RecordAggregateGroup]
@@ -0,0 +1,46 @@
+import re
+from sqlalchemy import Float, Text, func, literal, or_
+from sqlalchemy.dialects.postgresql import REGCONFIG
+from sqlalchemy.sql import ColumnElement
+from .models import Record
+from .query import escape_like
+
+SEARCH_CONFIG = "simple"
+MAX_SEARCH_TERMS = 8
+
+
+def search_text() -> ColumnElement:
+    """All top-level string values of a record, as indexed by ``ix_records_search_trgm``."""
+    return func.records_search_text(Record.data, type_=Text)
+
+
+def search_vector() -> ColumnElement:
+    # The configuration is rendered inline so the expression matches
+    # ``ix_records_search`` exactly.
+    config = literal(SEARCH_CONFIG, literal_execute=True).cast(REGCONFIG)
+    return func.to_tsvector(config, search_text())
+
+
+def prefix_query(q: str) -> str | None:
+    """``q`` as a tsquery matching every word as a prefix, e.g. ``ada:* & love:*``."""
+    terms = re.findall(r"\w+", q.lower())[:MAX_SEARCH_TERMS]
+    return " & ".join(f"{term}:*" for term in terms) or None
+
+
+def search_clause(q: str) -> tuple[ColumnElement, ColumnElement]:
+    """Match condition and relevance score for a search over string values.
+
+    A record matches when every word of ``q`` prefixes a word in it (GIN on
+    the tsvector), when it contains ``q`` as a substring, or when ``q`` is
+    close to one of its words (both via the trigram index). The score adds
+    the text-search rank to the trigram word similarity, so typos still rank.
+    """
+    text = search_text()
+    conditions = [text.ilike(f"%{escape_like(q)}%", escape="\\"), text.op("%>")(q)]
+    score = func.word_similarity(q, text, type_=Float)
+    tsquery = prefix_query(q)
+    if tsquery is not None:
+        query = func.to_tsquery(literal(SEARCH_CONFIG).cast(REGCONFIG), tsquery)
+        conditions.insert(0, search_vector().op("@@")(query))
+        score = func.ts_rank(search_vector(), query, type_=Float) + score
+    return or_(*conditions), score
@@ -1,21 +1,59 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
+from typing import Any, Callable, TypeVar
 from jose import jwt
 from passlib.context import CryptContext
 from .core_config import settings
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+T = TypeVar("T")
 
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.bcrypt_rounds)
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+# bcrypt releases the GIL, so a small thread pool gives real parallelism while
+# keeping the event loop free. The semaphore bounds how many hashes run at
+# once; callers beyond that wait in line and show up as ``queued``.
+_password_executor = ThreadPoolExecutor(
+    max_workers=settings.password_hash_concurrency, thread_name_prefix="password-hash"
+)
+_password_slots = asyncio.Semaphore(settings.password_hash_concurrency)
+_password_stats = {"queued": 0, "running": 0, "completed": 0}
 
 
-def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
+async def _run_password_work(func: Callable[..., T], *args: Any) -> T:
+    _password_stats["queued"] += 1
+    try:
+        await _password_slots.acquire()
+    finally:
+        _password_stats["queued"] -= 1
+    _password_stats["running"] += 1
+    try:
+        return await asyncio.get_running_loop().run_in_executor(_password_executor, func, *args)
+    finally:
+        _password_stats["running"] -= 1
+        _password_stats["completed"] += 1
+        _password_slots.release()
 
 
-def create_access_token(subject: str) -> str:
+def password_hashing_stats() -> dict[str, int]:
+    return {**_password_stats, "concurrency": settings.password_hash_concurrency}
+
+
+async def get_password_hash(password: str) -> str:
+    return await _run_password_work(pwd_context.hash, password)
+
+
+async def verify_password(plain_password: str, hashed_password: str) -> tuple[bool, str | None]:
+    """Check a password; returns ``(valid, new_hash)``.
+
+    ``new_hash`` is set when the stored hash was made with a different work
+    factor and should replace it.
+    """
+    return await _run_password_work(pwd_context.verify_and_update, plain_password, hashed_password)
+
+
+def create_access_token(subject: str, version: int = 0, claims: dict[str, Any] | None = None) -> str:
     expire = datetime.utcnow() + timedelta(minutes=settings.access_token_expires_minutes)
-    to_encode = {"sub": subject, "exp": expire}
+    to_encode = {**(claims or {}), "sub": subject, "ver": version, "exp": expire}
     encoded_jwt = jwt.encode(to_encode, settings.jwt_secret, algorithm=settings.jwt_algorithm)
     return encoded_jwt
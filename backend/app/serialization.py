@@ -0,0 +1,66 @@
+import json
+from datetime import datetime
+from typing import Any, Sequence
+from sqlalchemy import Text, func, literal
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.sql import ColumnElement
+from .models import Record
+
+
+def record_data(slugs: Sequence[str] | None = None) -> ColumnElement:
+    """``data``, or a ``jsonb_build_object`` of only ``slugs`` (absent keys become null)."""
+    if slugs is None:
+        return Record.data
+    pairs = [part for slug in slugs for part in (literal(slug), Record.data[slug])]
+    return func.jsonb_build_object(*pairs, type_=JSONB)
+
+
+def record_columns(slugs: Sequence[str] | None = None, raw: bool = True) -> tuple[ColumnElement, ...]:
+    """RecordRead's fields in its order; ``data`` as JSON text unless ``raw`` is off."""
+    data = record_data(slugs)
+    return (
+        Record.id,
+        Record.model_id,
+        Record.workspace_id,
+        Record.created_by,
+        Record.updated_by,
+        (data.cast(Text) if raw else data).label("data"),
+        Record.created_at,
+        Record.updated_at,
+    )
+
+
+RECORD_COLUMNS = record_columns()
+_KEYS = [f'"{column.key}":' for column in RECORD_COLUMNS]
+_DATA_POSITION = 5
+
+
+def _scalar(value: Any) -> str:
+    if value is None:
+        return "null"
+    if isinstance(value, datetime):
+        return f'"{value.isoformat()}"'
+    return str(value)
+
+
+def record_json(row: Sequence[Any]) -> str:
+    """Render a ``record_columns()`` row as ``RecordRead`` JSON.
+
+    The document text from Postgres is spliced in as is: it is already valid
+    JSON, so it is never parsed into Python objects or encoded again. Rows
+    rendered here are never expanded, so ``expanded`` is always null.
+    """
+    parts = [
+        key + (row[position] if position == _DATA_POSITION else _scalar(row[position]))
+        for position, key in enumerate(_KEYS)
+    ]
+    return "{" + ",".join(parts) + ',"expanded":null}'
+
+
+def record_page_json(
+    rows: Sequence[Sequence[Any]], total: int | None, has_more: bool, next_cursor: str | None
+) -> bytes:
+    """A ``RecordListResponse`` body for rows selected with ``record_columns()``."""
+    items = ",".join(record_json(row) for row in rows)
+    tail = json.dumps({"total": total, "has_more": has_more, "next_cursor": next_cursor})
+    return ('{"items":[' + items + "]," + tail[1:]).encode()
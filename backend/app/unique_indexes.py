@@ -0,0 +1,77 @@
+import asyncio
+import logging
+from functools import partial
+from typing import Iterable
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from .db import AsyncSessionLocal
+from .indexes import build_unique_indexes, drop_indexes, unique_index_name
+from .jobs import JobFailed, claim_stale_jobs, create_job, run_job
+from .models import Job, Model, ModelField
+from .schema_registry import invalidate_model, notify_model_changed
+
+logger = logging.getLogger(__name__)
+
+UNIQUE_INDEX_JOB_KIND = "unique_indexes"
+
+
+def schedule_unique_indexes(
+    session: AsyncSession, model: Model, user_id: int, create: Iterable[str], drop: Iterable[str]
+) -> Job:
+    """Queue a job that builds and drops a model's unique indexes.
+
+    Until an index is valid, the pre-check in record validation is what
+    enforces uniqueness.
+    """
+    job = create_job(session, UNIQUE_INDEX_JOB_KIND, model.workspace_id, model_id=model.id, user_id=user_id)
+    job.result = {"create": sorted(create), "drop": sorted(drop)}
+    return job
+
+
+async def unique_slugs(session: AsyncSession, model_id: int) -> set[str]:
+    result = await session.execute(
+        select(ModelField.slug).where(ModelField.model_id == model_id, ModelField.is_unique.is_(True))
+    )
+    return set(result.scalars().all())
+
+
+async def apply_unique_indexes(model_id: int, job_id: int) -> dict:
+    """Build and drop the job's unique indexes outside any request transaction.
+
+    Slugs are checked against the current fields first, so a later schema
+    change that already undid this one wins. Fields whose index could not be
+    built because of duplicates are made non-unique again.
+    """
+    async with AsyncSessionLocal() as session:
+        job = await session.get(Job, job_id)
+        plan = dict(job.result or {})
+        unique = await unique_slugs(session, model_id)
+    create = [slug for slug in plan.get("create", []) if slug in unique]
+    drop = [slug for slug in plan.get("drop", []) if slug not in unique]
+
+    await drop_indexes([unique_index_name(model_id, slug) for slug in drop])
+    errors = await build_unique_indexes(model_id, create)
+    result = {"create": create, "drop": drop, "errors": errors}
+    if not errors:
+        return result
+
+    async with AsyncSessionLocal() as session:
+        await session.execute(
+            update(ModelField)
+            .where(ModelField.model_id == model_id, ModelField.slug.in_([error["field"] for error in errors]))
+            .values(is_unique=False)
+        )
+        await session.execute(
+            update(Model).where(Model.id == model_id).values(schema_version=Model.schema_version + 1)
+        )
+        await notify_model_changed(session, model_id)
+        await session.commit()
+    invalidate_model(model_id)
+    raise JobFailed("Existing records contain duplicate values", result)
+
+
+async def resume_unique_indexes() -> None:
+    jobs = await claim_stale_jobs(UNIQUE_INDEX_JOB_KIND)
+    if jobs:
+        logger.info("Resuming unique index jobs %s", [job.id for job in jobs])
+    await asyncio.gather(*(run_job(job.id, partial(apply_unique_indexes, job.model_id)) for job in jobs))
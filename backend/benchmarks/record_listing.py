@@ -0,0 +1,57 @@
+"""CPU cost of rendering one page of records, ORM/pydantic path vs. raw JSON splice.
+
+Run from backend/: ``python -m benchmarks.record_listing [rows] [fields]``.
+No database is needed; rows are built the way the driver returns them
+(``data`` as JSON text).
+"""
+import json
+import sys
+import timeit
+from datetime import datetime
+from types import SimpleNamespace
+
+from fastapi.encoders import jsonable_encoder
+
+from app.schemas import RecordListResponse
+from app.serialization import record_page_json
+
+
+def make_rows(count: int, fields: int) -> list[tuple]:
+    now = datetime(2024, 5, 1, 12, 30, 15, 123456)
+    document = {f"field_{n}": (f"value {n} " * 4 if n % 3 else n * 1.5) for n in range(fields)}
+    return [(i, 3, 1, 9, 9, json.dumps(document), now, now) for i in range(count)]
+
+
+def orm_path(rows: list[tuple]) -> bytes:
+    # What list_records did before: the JSONB type parses every document, the
+    # response model validates the ORM objects, and the result is encoded again.
+    items = [
+        SimpleNamespace(
+            id=r[0], model_id=r[1], workspace_id=r[2], created_by=r[3], updated_by=r[4],
+            data=json.loads(r[5]), created_at=r[6], updated_at=r[7],
+        )
+        for r in rows
+    ]
+    page = RecordListResponse.model_validate(
+        {"items": items, "total": None, "has_more": True, "next_cursor": "x"}, from_attributes=True
+    )
+    return json.dumps(jsonable_encoder(page), separators=(",", ":")).encode()
+
+
+def splice_path(rows: list[tuple]) -> bytes:
+    return record_page_json(rows, None, True, "x")
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    fields = int(sys.argv[2]) if len(sys.argv) > 2 else 40
+    rows = make_rows(count, fields)
+    assert json.loads(orm_path(rows))["items"][0]["data"] == json.loads(splice_path(rows))["items"][0]["data"]
+    for name, path in (("orm + pydantic", orm_path), ("raw json splice", splice_path)):
+        runs = 200
+        seconds = min(timeit.repeat(lambda: path(rows), number=runs, repeat=5)) / runs
+        print(f"{name:>16}: {seconds * 1000:8.3f} ms/page ({count} rows x {fields} fields)")
+
+
+if __name__ == "__main__":
+    main()
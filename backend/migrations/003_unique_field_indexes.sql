@@ -0,0 +1,21 @@
+BEGIN;
+
+-- Uniqueness for `is_unique` model fields is enforced by one partial expression
+-- index per field. The API creates and drops these as fields change; this
+-- backfills them for fields that existed before index-backed enforcement.
+-- Index names must match app.indexes.unique_index_name.
+DO $$
+DECLARE
+    f RECORD;
+BEGIN
+    FOR f IN SELECT model_id, slug FROM model_fields WHERE is_unique LOOP
+        EXECUTE format(
+            'CREATE UNIQUE INDEX IF NOT EXISTS %I ON records ((data ->> %L)) WHERE model_id = %s',
+            'uq_records_' || f.model_id || '_' || substr(md5(f.slug), 1, 12),
+            f.slug,
+            f.model_id
+        );
+    END LOOP;
+END$$;
+
+COMMIT;
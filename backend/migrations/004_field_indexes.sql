@@ -0,0 +1,22 @@
+BEGIN;
+
+-- Bookkeeping for the managed per-field expression indexes. Fields opt in with
+-- `"indexed": true` in model_fields.config; the API builds the matching
+-- `ix_records_*` indexes concurrently in the background and tracks them here.
+-- The records_numeric/records_boolean/records_date/records_timestamptz cast
+-- functions used by those indexes are installed by the API on startup.
+CREATE TABLE IF NOT EXISTS field_indexes (
+    id SERIAL PRIMARY KEY,
+    model_id INTEGER NOT NULL REFERENCES models(id) ON DELETE CASCADE,
+    field_slug VARCHAR(255) NOT NULL,
+    data_type VARCHAR(32) NOT NULL,
+    index_name VARCHAR(63) NOT NULL UNIQUE,
+    status VARCHAR(32) NOT NULL DEFAULT 'pending',
+    error TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    CONSTRAINT uq_field_index UNIQUE (model_id, field_slug, data_type)
+);
+CREATE INDEX IF NOT EXISTS ix_field_indexes_model_id ON field_indexes (model_id);
+
+COMMIT;
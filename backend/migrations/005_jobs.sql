@@ -0,0 +1,21 @@
+BEGIN;
+
+-- Background jobs (record validation and other long-running model work).
+-- Progress is polled through GET /api/jobs/{id}.
+CREATE TABLE IF NOT EXISTS jobs (
+    id SERIAL PRIMARY KEY,
+    kind VARCHAR(64) NOT NULL,
+    status VARCHAR(32) NOT NULL DEFAULT 'queued',
+    workspace_id INTEGER NOT NULL REFERENCES workspaces(id) ON DELETE CASCADE,
+    model_id INTEGER REFERENCES models(id) ON DELETE CASCADE,
+    created_by INTEGER REFERENCES users(id) ON DELETE SET NULL,
+    processed INTEGER NOT NULL DEFAULT 0,
+    total INTEGER,
+    result JSONB,
+    error TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS ix_jobs_workspace_id ON jobs (workspace_id);
+
+COMMIT;
@@ -0,0 +1,7 @@
+BEGIN;
+
+-- Bumped by every model update; compiled validators are cached per
+-- (model id, schema_version) so other workers pick up changes on next use.
+ALTER TABLE IF EXISTS models ADD COLUMN IF NOT EXISTS schema_version INTEGER NOT NULL DEFAULT 1;
+
+COMMIT;
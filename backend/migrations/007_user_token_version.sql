@@ -0,0 +1,7 @@
+BEGIN;
+
+-- Bumped on logout and password change. Access tokens carry the version they
+-- were issued with and are rejected once it no longer matches.
+ALTER TABLE IF EXISTS users ADD COLUMN IF NOT EXISTS token_version INTEGER NOT NULL DEFAULT 0;
+
+COMMIT;
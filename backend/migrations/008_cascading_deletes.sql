@@ -0,0 +1,29 @@
+BEGIN;
+
+-- Deleting a model or workspace relies on ON DELETE CASCADE instead of the
+-- ORM loading every child row. Columns added by 002 were created without
+-- delete actions, so recreate those foreign keys.
+ALTER TABLE IF EXISTS records DROP CONSTRAINT IF EXISTS records_workspace_id_fkey;
+ALTER TABLE IF EXISTS records
+    ADD CONSTRAINT records_workspace_id_fkey FOREIGN KEY (workspace_id) REFERENCES workspaces(id) ON DELETE CASCADE;
+
+ALTER TABLE IF EXISTS records DROP CONSTRAINT IF EXISTS records_updated_by_fkey;
+ALTER TABLE IF EXISTS records
+    ADD CONSTRAINT records_updated_by_fkey FOREIGN KEY (updated_by) REFERENCES users(id) ON DELETE SET NULL;
+
+ALTER TABLE IF EXISTS models DROP CONSTRAINT IF EXISTS models_created_by_fkey;
+ALTER TABLE IF EXISTS models
+    ADD CONSTRAINT models_created_by_fkey FOREIGN KEY (created_by) REFERENCES users(id) ON DELETE SET NULL;
+
+ALTER TABLE IF EXISTS workspaces DROP CONSTRAINT IF EXISTS workspaces_created_by_fkey;
+ALTER TABLE IF EXISTS workspaces
+    ADD CONSTRAINT workspaces_created_by_fkey FOREIGN KEY (created_by) REFERENCES users(id) ON DELETE SET NULL;
+
+-- Without these every cascaded delete scans records.
+CREATE INDEX IF NOT EXISTS ix_records_model_id_id ON records (model_id, id);
+CREATE INDEX IF NOT EXISTS ix_records_workspace_id ON records (workspace_id);
+
+-- Large models are hidden while a purge job deletes their records in chunks.
+ALTER TABLE IF EXISTS models ADD COLUMN IF NOT EXISTS deleted_at TIMESTAMP;
+
+COMMIT;
@@ -0,0 +1,23 @@
+BEGIN;
+
+-- Record limits are checked against maintained counters instead of
+-- count(*) over records on every insert.
+ALTER TABLE IF EXISTS workspaces ADD COLUMN IF NOT EXISTS plan VARCHAR(50) NOT NULL DEFAULT 'free';
+ALTER TABLE IF EXISTS workspaces ADD COLUMN IF NOT EXISTS record_limit INTEGER;
+
+CREATE TABLE IF NOT EXISTS record_counters (
+    model_id INTEGER PRIMARY KEY REFERENCES models(id) ON DELETE CASCADE,
+    workspace_id INTEGER NOT NULL REFERENCES workspaces(id) ON DELETE CASCADE,
+    record_count BIGINT NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS ix_record_counters_workspace_id ON record_counters (workspace_id);
+
+-- Block writers while backfilling so no insert lands between count and upsert.
+LOCK TABLE records IN SHARE MODE;
+INSERT INTO record_counters (model_id, workspace_id, record_count)
+SELECT models.id, models.workspace_id, count(*)
+FROM records JOIN models ON models.id = records.model_id
+GROUP BY models.id, models.workspace_id
+ON CONFLICT (model_id) DO UPDATE SET record_count = EXCLUDED.record_count;
+
+COMMIT;
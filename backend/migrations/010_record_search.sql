@@ -0,0 +1,18 @@
+-- Full-text and trigram search over the string values of records
+-- (`GET /api/models/{model_id}/records?q=`). The API installs the same
+-- extension and records_search_text function on startup.
+--
+-- Run outside a transaction: CREATE INDEX CONCURRENTLY keeps records writable
+-- while the indexes build.
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+CREATE OR REPLACE FUNCTION records_search_text(data jsonb) RETURNS text
+LANGUAGE sql IMMUTABLE PARALLEL SAFE AS $$
+    SELECT coalesce(string_agg(value #>> '{}', ' ' ORDER BY key), '')
+    FROM jsonb_each(data) WHERE jsonb_typeof(value) = 'string'
+$$;
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_records_search
+    ON records USING gin (to_tsvector('simple'::regconfig, records_search_text(data)));
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_records_search_trgm
+    ON records USING gin (records_search_text(data) gin_trgm_ops);
@@ -0,0 +1,13 @@
+-- Keyset pagination over the default sort (`created_at`, then `id`) compares
+-- (created_at, id) as a row value, which this index serves directly. The
+-- row comparison skips NULLs, so the timestamps become NOT NULL first; the
+-- API has always filled them in.
+--
+-- Run outside a transaction: CREATE INDEX CONCURRENTLY keeps records writable
+-- while the index builds.
+UPDATE records SET created_at = CURRENT_TIMESTAMP WHERE created_at IS NULL;
+UPDATE records SET updated_at = created_at WHERE updated_at IS NULL;
+ALTER TABLE records ALTER COLUMN created_at SET NOT NULL, ALTER COLUMN updated_at SET NOT NULL;
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_records_model_id_created_at_id
+    ON records (model_id, created_at, id);
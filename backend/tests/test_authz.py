@@ -0,0 +1,100 @@
+import unittest
+
+from fastapi import HTTPException
+from sqlalchemy import JSON, String, create_engine
+from sqlalchemy.dialects.postgresql import ENUM, JSONB
+from sqlalchemy.orm import sessionmaker
+
+from app.authz import (
+    ADMIN_ROLES,
+    forget_model,
+    get_authorized_model,
+    invalidate_memberships,
+    model_registry,
+    require_membership,
+    role_cache,
+)
+from app.models import Base, Model, User, Workspace, WorkspaceMember
+
+
+class CountingSession:
+    def __init__(self, session):
+        self._session = session
+        self.queries = 0
+
+    async def execute(self, statement):
+        self.queries += 1
+        return self._session.execute(statement)
+
+
+class AuthorizationTests(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.engine = create_engine("sqlite:///:memory:", future=True)
+        for table in Base.metadata.tables.values():
+            for column in table.columns:
+                if isinstance(column.type, JSONB):
+                    column.type = JSON()
+                if isinstance(column.type, ENUM):
+                    column.type = String()
+        Base.metadata.create_all(self.engine)
+        self.db = sessionmaker(self.engine, expire_on_commit=False)()
+        user = User(email="ada@example.com", password_hash="x")
+        workspace = Workspace(name="Main")
+        self.db.add_all([user, workspace])
+        self.db.flush()
+        model = Model(workspace_id=workspace.id, name="Contacts", slug="contacts")
+        self.db.add_all([model, WorkspaceMember(user_id=user.id, workspace_id=workspace.id, role="member")])
+        self.db.commit()
+        self.user_id, self.workspace_id, self.model_id = user.id, workspace.id, model.id
+        role_cache.clear()
+        model_registry.clear()
+        self.session = CountingSession(self.db)
+
+    async def asyncTearDown(self):
+        self.db.close()
+        self.engine.dispose()
+
+    async def test_warm_model_request_needs_no_queries(self):
+        ref = await get_authorized_model(self.session, self.model_id, self.user_id)
+        self.assertEqual(self.session.queries, 2)
+
+        again = await get_authorized_model(self.session, self.model_id, self.user_id)
+        self.assertEqual(again, ref)
+        self.assertEqual(self.session.queries, 2)
+        self.assertEqual(ref.workspace_id, self.workspace_id)
+
+    async def test_non_members_are_rechecked(self):
+        for _ in range(2):
+            with self.assertRaises(HTTPException) as excinfo:
+                await require_membership(self.session, self.user_id + 1, self.workspace_id)
+            self.assertEqual(excinfo.exception.status_code, 403)
+        self.assertEqual(self.session.queries, 2)
+
+    async def test_role_requirement(self):
+        with self.assertRaises(HTTPException) as excinfo:
+            await require_membership(self.session, self.user_id, self.workspace_id, ADMIN_ROLES)
+        self.assertEqual(excinfo.exception.detail, "Workspace admin role required")
+
+    async def test_membership_change_invalidates_cached_role(self):
+        await require_membership(self.session, self.user_id, self.workspace_id)
+        self.db.query(WorkspaceMember).update({WorkspaceMember.role: "admin"})
+        self.db.commit()
+        invalidate_memberships(workspace_id=self.workspace_id)
+
+        role = await require_membership(self.session, self.user_id, self.workspace_id, ADMIN_ROLES)
+        self.assertEqual(role, "admin")
+
+    async def test_unknown_and_forgotten_models(self):
+        with self.assertRaises(HTTPException) as excinfo:
+            await get_authorized_model(self.session, self.model_id + 1, self.user_id)
+        self.assertEqual(excinfo.exception.status_code, 404)
+
+        await get_authorized_model(self.session, self.model_id, self.user_id)
+        forget_model(self.model_id)
+        queries = self.session.queries
+        await get_authorized_model(self.session, self.model_id, self.user_id)
+        self.assertEqual(self.session.queries, queries + 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,91 @@
+import unittest
+
+from sqlalchemy.dialects import postgresql
+
+from app.data_migrations import _next_batch, migration_operations, operation_statement
+from app.field_diff import diff_fields
+from app.models import ModelField
+from app.schemas import FieldUpdate
+
+
+def _sql(statement) -> str:
+    return str(statement.compile(dialect=postgresql.dialect(), compile_kwargs={"render_postcompile": True}))
+
+
+class MigrationOperationTests(unittest.TestCase):
+    def test_renames_run_before_type_changes(self):
+        existing = [ModelField(id=1, name="Price", slug="price", data_type="string", is_required=False,
+                               is_unique=False, position=0, config=None)]
+        diff = diff_fields(existing, [FieldUpdate(id=1, slug="amount", data_type="number")])
+
+        self.assertEqual(
+            migration_operations(diff),
+            [
+                {"op": "rename", "fields": {"price": "amount"}},
+                {"op": "retype", "field": "amount", "from": "string", "to": "number"},
+            ],
+        )
+
+    def test_rename_moves_key_within_id_range(self):
+        sql = _sql(operation_statement(3, {"op": "rename", "fields": {"price": "amount"}}, 100, 200))
+
+        self.assertIn("(records.data - ARRAY[%(param_1)s]) || CASE WHEN ((records.data ? %(data_1)s)) "
+                      "THEN jsonb_build_object(", sql)
+        self.assertIn("records.model_id = 3", sql)
+        self.assertIn("records.id >= %(id_1)s AND records.id < %(id_2)s", sql)
+        self.assertIn("records.data ?| ARRAY[", sql)
+
+    def test_queued_single_rename_still_applies(self):
+        statement = operation_statement(3, {"op": "rename", "from": "price", "to": "amount"}, 1, 2)
+
+        self.assertEqual(statement.compile().params["param_1"], "price")
+
+    def _rename_operations(self, renames):
+        existing = [
+            ModelField(id=n, name=slug, slug=slug, data_type="string", is_required=False, is_unique=False,
+                       position=n, config=None)
+            for n, slug in enumerate("abc")
+        ]
+        incoming = [FieldUpdate(id=row.id, slug=renames.get(row.slug, row.slug)) for row in existing]
+        return migration_operations(diff_fields(existing, incoming))
+
+    def test_chained_renames_are_one_operation_over_the_original_document(self):
+        operations = self._rename_operations({"a": "b", "b": "c", "c": "d"})
+
+        self.assertEqual(operations, [{"op": "rename", "fields": {"a": "b", "b": "c", "c": "d"}}])
+        sql = _sql(operation_statement(3, operations[0], 1, 2))
+        # Each new key reads records.data, never a partly renamed document.
+        self.assertIn("(records.data - ARRAY[%(param_1)s, %(param_2)s, %(param_3)s])", sql)
+        self.assertEqual(sql.count("records.data -> %(data_"), 3)
+
+    def test_swapped_renames_are_one_operation(self):
+        operations = self._rename_operations({"a": "b", "b": "a"})
+
+        self.assertEqual(operations, [{"op": "rename", "fields": {"a": "b", "b": "a"}}])
+        sql = _sql(operation_statement(3, operations[0], 1, 2))
+        self.assertEqual(sql.count("jsonb_build_object(%(jsonb_build_object_"), 2)
+        self.assertEqual(sql.count("records.data -> %(data_"), 2)
+
+    def test_retype_converts_with_cast_function_and_keeps_failures(self):
+        statement = operation_statement(3, {"op": "retype", "field": "amount", "from": "string", "to": "number"}, 1, 2)
+        sql = _sql(statement)
+
+        self.assertIn("jsonb_set(records.data, ARRAY[", sql)
+        self.assertIn("coalesce(to_jsonb(records_numeric(records.data ->> 'amount'))", sql)
+
+    def test_conversion_to_text_uses_raw_text(self):
+        sql = _sql(operation_statement(3, {"op": "retype", "field": "n", "from": "number", "to": "string"}, 1, 2))
+
+        self.assertIn("to_jsonb(records.data ->> 'n')", sql)
+
+
+    def test_batches_walk_the_model_ids_by_keyset(self):
+        sql = _sql(_next_batch(3, 500, 9000))
+
+        self.assertTrue(sql.startswith("SELECT max(anon_1.id) AS max_1, count(*) AS count_1"))
+        self.assertIn("records.model_id = 3 AND records.id > %(id_1)s AND records.id <= %(id_2)s", sql)
+        self.assertIn("ORDER BY records.id", sql)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,34 @@
+import unittest
+
+from sqlalchemy.pool import NullPool
+
+from app.core_config import Settings
+from app.db import InstrumentedQueuePool, engine_options, pool_stats
+
+
+class EngineOptionsTests(unittest.TestCase):
+    def test_pool_is_sized_from_settings(self):
+        options = engine_options(Settings(db_pool_size=3, db_max_overflow=1, db_statement_cache_size=50))
+
+        self.assertIs(options["poolclass"], InstrumentedQueuePool)
+        self.assertEqual((options["pool_size"], options["max_overflow"]), (3, 1))
+        self.assertEqual(options["connect_args"]["statement_cache_size"], 50)
+
+    def test_pgbouncer_mode_disables_pool_and_statement_caches(self):
+        options = engine_options(Settings(db_pgbouncer=True))
+
+        self.assertIs(options["poolclass"], NullPool)
+        self.assertEqual(options["connect_args"]["statement_cache_size"], 0)
+        self.assertEqual(options["connect_args"]["prepared_statement_cache_size"], 0)
+        names = {options["connect_args"]["prepared_statement_name_func"]() for _ in range(2)}
+        self.assertEqual(len(names), 2)
+
+    def test_pool_stats_report_usage(self):
+        stats = pool_stats()
+
+        self.assertEqual(stats["in_use"], 0)
+        self.assertIn("wait_seconds_max", stats)
+
+
+if __name__ == "__main__":
+    unittest.main()
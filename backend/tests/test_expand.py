@@ -0,0 +1,96 @@
+import unittest
+
+from fastapi import HTTPException
+from sqlalchemy.dialects import postgresql
+
+from app.authz import role_cache
+from app.expand import expand_records, parse_expand
+from app.model_schema import CompiledField, ModelSchema
+from app.models import Record
+
+
+def _relation(slug: str, model_id: int | None) -> CompiledField:
+    return CompiledField(slug=slug, data_type="relation", is_required=False, is_unique=False,
+                         check=lambda value: None, relation_workspace_id=1, relation_model_id=model_id)
+
+
+class StubResult:
+    def __init__(self, rows):
+        self._rows = rows
+
+    def scalars(self):
+        return self
+
+    def all(self):
+        return self._rows
+
+    def first(self):
+        return self._rows[0] if self._rows else None
+
+
+class StubSession:
+    """Answers ``id = ANY(...)`` queries from ``rows`` and finds no memberships."""
+
+    def __init__(self, rows):
+        self.rows = {row.id: row for row in rows}
+        self.statements = []
+
+    async def execute(self, statement):
+        self.statements.append(statement)
+        params = statement.compile(dialect=postgresql.dialect()).params.values()
+        ids = next((value for value in params if isinstance(value, list)), None)
+        if ids is None:
+            return StubResult([])  # membership lookups: no role
+        return StubResult([self.rows[i] for i in ids if i in self.rows])
+
+
+class ParseExpandTests(unittest.TestCase):
+    def test_paths_merge_into_a_tree(self):
+        self.assertEqual(parse_expand("customer, customer.company,owner"), {"customer": {"company": {}}, "owner": {}})
+        self.assertEqual(parse_expand(None), {})
+
+    def test_depth_is_bounded(self):
+        with self.assertRaises(HTTPException) as ctx:
+            parse_expand("a.b.c")
+        self.assertEqual(ctx.exception.status_code, 422)
+
+
+class ExpandRecordsTests(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        role_cache.clear()
+        role_cache.set((7, 1), "viewer")
+        self.schema = ModelSchema(
+            model_id=3, workspace_id=1, version=1,
+            fields=(_relation("customer", 5), _relation("owner", 5)),
+            required=frozenset(), unique_fields=(), relation_fields=(),
+        )
+
+    async def test_one_query_per_target_model_for_the_whole_page(self):
+        session = StubSession([
+            Record(id=10, model_id=5, workspace_id=1, data={"name": "Ada"}),
+            Record(id=11, model_id=5, workspace_id=1, data={"name": "Grace"}),
+        ])
+        records = [Record(id=n, model_id=3, workspace_id=1, data={"customer": 10 + n % 2, "owner": 10})
+                   for n in range(20)]
+
+        expanded = await expand_records(session, self.schema, records, {"customer": {}, "owner": {}}, 7)
+
+        self.assertEqual(len(session.statements), 1)
+        self.assertEqual(expanded[1]["customer"], {"id": 11, "model_id": 5, "data": {"name": "Grace"}})
+        self.assertEqual(expanded[1]["owner"]["id"], 10)
+
+    async def test_targets_outside_the_users_workspaces_are_hidden(self):
+        session = StubSession([Record(id=10, model_id=5, workspace_id=2, data={"name": "Ada"})])
+        records = [Record(id=1, model_id=3, workspace_id=1, data={"customer": 10})]
+
+        expanded = await expand_records(session, self.schema, records, {"customer": {}}, 7)
+
+        self.assertEqual(expanded, [{"customer": None}])
+
+    async def test_only_relation_fields_expand(self):
+        with self.assertRaises(HTTPException):
+            await expand_records(StubSession([]), self.schema, [], {"name": {}}, 7)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,39 @@
+import csv
+import io
+import json
+import unittest
+from datetime import datetime
+
+from app.routers.exports import _csv_header, _encode_csv, _encode_ndjson
+
+CREATED = datetime(2024, 5, 1, 12, 30)
+ROWS = [
+    (1, {"title": "Ship, it", "done": True, "tags": ["a"]}, CREATED, CREATED),
+    (2, {"title": "Plan"}, CREATED, CREATED),
+]
+
+
+class EncodeTests(unittest.TestCase):
+    def test_csv_columns_follow_slug_order(self):
+        text = _csv_header(["title", "done", "tags"]) + _encode_csv(ROWS, ["title", "done", "tags"])
+
+        rows = list(csv.reader(io.StringIO(text)))
+
+        self.assertEqual(rows[0], ["id", "title", "done", "tags", "created_at", "updated_at"])
+        self.assertEqual(rows[1], ["1", "Ship, it", "true", '["a"]', CREATED.isoformat(), CREATED.isoformat()])
+        self.assertEqual(rows[2], ["2", "Plan", "", "", CREATED.isoformat(), CREATED.isoformat()])
+
+    def test_ndjson_emits_one_object_per_line(self):
+        lines = _encode_ndjson(ROWS, []).splitlines()
+
+        self.assertEqual(len(lines), 2)
+        self.assertEqual(json.loads(lines[1]), {
+            "id": 2,
+            "data": {"title": "Plan"},
+            "created_at": CREATED.isoformat(),
+            "updated_at": CREATED.isoformat(),
+        })
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+import unittest
+
+from app.field_diff import diff_fields
+from app.models import ModelField
+from app.schemas import FieldUpdate
+
+
+def _fields(count):
+    return [
+        ModelField(id=n + 1, name=f"F{n}", slug=f"f{n}", data_type="string", is_required=False, is_unique=False,
+                   position=n, config=None)
+        for n in range(count)
+    ]
+
+
+def _payload(rows):
+    return [
+        FieldUpdate(id=row.id, name=row.name, slug=row.slug, data_type=row.data_type, is_required=row.is_required,
+                    is_unique=row.is_unique, position=row.position, config=row.config)
+        for row in rows
+    ]
+
+
+class DiffFieldsTests(unittest.TestCase):
+    def test_single_edit_is_a_single_update(self):
+        existing = _fields(60)
+        payload = _payload(existing)
+        payload[10] = payload[10].model_copy(update={"name": "Renamed"})
+
+        diff = diff_fields(existing, payload)
+
+        self.assertEqual(diff.inserts, [])
+        self.assertEqual(diff.deletes, [])
+        self.assertEqual(diff.updates, [(existing[10], {"name": "Renamed"})])
+
+    def test_unchanged_payload_is_a_no_op(self):
+        existing = _fields(3)
+        self.assertFalse(diff_fields(existing, _payload(existing)).changed)
+
+    def test_matches_by_slug_and_reports_renames_and_type_changes(self):
+        existing = _fields(3)
+        payload = [
+            FieldUpdate(slug="f0", data_type="number"),
+            FieldUpdate(id=2, slug="second"),
+            FieldUpdate(name="New", slug="new", data_type="boolean"),
+        ]
+
+        diff = diff_fields(existing, payload)
+
+        self.assertEqual(diff.renamed, [("f1", "second")])
+        self.assertEqual(diff.retyped, [("f0", "string", "number")])
+        self.assertEqual([row.slug for row in diff.deletes], ["f2"])
+        self.assertEqual(diff.inserts[0]["slug"], "new")
+        self.assertFalse(diff.inserts[0]["is_required"])
+
+    def test_rejects_duplicates_unknown_ids_and_incomplete_fields(self):
+        existing = _fields(2)
+        payload = [
+            FieldUpdate(id=1, slug="f1"),
+            FieldUpdate(id=2),
+            FieldUpdate(id=99, slug="ghost"),
+            FieldUpdate(slug="partial"),
+        ]
+
+        errors = diff_fields(existing, payload).errors
+
+        self.assertEqual(
+            [error["error"] for error in errors],
+            ["Duplicate field slug", "Unknown field id", "Fields must include name, slug, and data_type"],
+        )
+
+    def test_rejects_rename_onto_a_slug_kept_by_another_field(self):
+        existing = _fields(2)
+        payload = _payload(existing)
+        payload[0] = payload[0].model_copy(update={"slug": "f1"})
+
+        diff = diff_fields(existing, payload)
+
+        self.assertEqual(diff.errors, [{"field": "f1", "error": "Duplicate field slug"}])
+
+
+if __name__ == "__main__":
+    unittest.main()
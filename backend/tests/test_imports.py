@@ -0,0 +1,56 @@
+import io
+import unittest
+
+from app.model_schema import compile_model_schema
+from app.models import Model, ModelField
+from app.routers.imports import _read_csv, _read_ndjson
+
+SCHEMA = compile_model_schema(
+    Model(id=1, workspace_id=1, schema_version=1),
+    [
+        ModelField(slug="title", data_type="string", is_required=True, is_unique=False, position=0),
+        ModelField(slug="points", data_type="number", is_required=False, is_unique=False, position=1),
+        ModelField(slug="done", data_type="boolean", is_required=False, is_unique=False, position=2),
+    ],
+)
+
+
+class ReadCsvTests(unittest.TestCase):
+    def test_coerces_cells_by_field_type(self):
+        handle = io.StringIO("Title,points,done,notes\nShip it,3,yes,ignored\nPlan,2.5,false,\n")
+
+        rows = list(_read_csv(handle, SCHEMA, {}))
+
+        self.assertEqual(
+            rows,
+            [
+                (2, {"title": "Ship it", "points": 3, "done": True}, {}),
+                (3, {"title": "Plan", "points": 2.5, "done": False}, {}),
+            ],
+        )
+
+    def test_mapping_and_bad_cells(self):
+        handle = io.StringIO("Name,Score\nShip it,lots\n,\n")
+
+        rows = list(_read_csv(handle, SCHEMA, {"Name": "title", "Score": "points"}))
+
+        self.assertEqual(rows, [(2, {"title": "Ship it"}, {"points": "Must be a number"})])
+
+
+class ReadNdjsonTests(unittest.TestCase):
+    def test_maps_keys_and_reports_bad_lines(self):
+        handle = io.StringIO('{"Name": "Ship it", "points": 3}\n\n[1, 2]\n')
+
+        rows = list(_read_ndjson(handle, SCHEMA, {"Name": "title"}))
+
+        self.assertEqual(
+            rows,
+            [
+                (1, {"title": "Ship it", "points": 3}, {}),
+                (3, {}, {"_line": "Line is not a JSON object"}),
+            ],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
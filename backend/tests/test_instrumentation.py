@@ -0,0 +1,149 @@
+import unittest
+from types import SimpleNamespace
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+
+from app.instrumentation import (
+    Histogram,
+    InstrumentationMiddleware,
+    RequestTimings,
+    current_timings,
+    instrument_engine,
+    request_duration,
+    request_queries,
+    server_timing,
+    timed,
+)
+
+
+class RequestTimingsTests(unittest.TestCase):
+    def test_keeps_only_the_slowest_statements(self):
+        timings = RequestTimings()
+        for n, seconds in enumerate([0.1, 0.5, 0.2, 0.05, 0.3]):
+            timings.record_query(seconds, f"SELECT {n}", ())
+        timings.record_query(9.0, "INSERT many", [(), ()], executemany=True)
+
+        self.assertEqual(timings.queries, 6)
+        self.assertEqual([statement for _, statement, _ in timings.slowest], ["SELECT 1", "SELECT 4", "SELECT 2"])
+
+    def test_engine_events_count_statements_of_the_current_request(self):
+        engine = create_engine("sqlite://")
+        instrument_engine(engine)
+        timings = RequestTimings()
+        token = current_timings.set(timings)
+        try:
+            with engine.connect() as connection:
+                connection.execute(text("SELECT 1"))
+                connection.execute(text("SELECT 2"))
+        finally:
+            current_timings.reset(token)
+
+        self.assertEqual(timings.queries, 2)
+        self.assertGreater(timings.db_seconds, 0)
+
+    def test_failed_statements_are_counted_and_release_their_start_time(self):
+        engine = create_engine("sqlite://")
+        instrument_engine(engine)
+        timings = RequestTimings()
+        token = current_timings.set(timings)
+        try:
+            with engine.connect() as connection:
+                with self.assertRaises(OperationalError):
+                    connection.execute(text("SELECT * FROM missing"))
+                connection.execute(text("SELECT 1"))
+                starts = connection.info["query_start"]
+        finally:
+            current_timings.reset(token)
+
+        self.assertEqual(starts, [])
+        self.assertEqual(timings.queries, 2)
+        self.assertIn("SELECT * FROM missing", [statement for _, statement, _ in timings.slowest])
+
+    def test_server_timing_header(self):
+        timings = RequestTimings(queries=3, db_seconds=0.0125)
+        token = current_timings.set(timings)
+        try:
+            with timed("serialize"):
+                pass
+        finally:
+            current_timings.reset(token)
+
+        header = server_timing(timings, 0.05)
+        self.assertTrue(header.startswith('db;dur=12.5;desc="3 queries", serialize;dur='))
+        self.assertTrue(header.endswith("total;dur=50.0"))
+
+
+class HistogramTests(unittest.TestCase):
+    def test_buckets_are_cumulative(self):
+        histogram = Histogram(buckets=(0.1, 1.0))
+        for value in (0.05, 0.5, 3.0):
+            histogram.observe(("GET", "/x"), value)
+
+        lines = histogram.render("latency", ("method", "route"))
+
+        self.assertIn('latency_bucket{method="GET",route="/x",le="0.1"} 1', lines)
+        self.assertIn('latency_bucket{method="GET",route="/x",le="1.0"} 2', lines)
+        self.assertIn('latency_bucket{method="GET",route="/x",le="+Inf"} 3', lines)
+        self.assertIn('latency_count{method="GET",route="/x"} 3', lines)
+
+
+class MiddlewareTests(unittest.IsolatedAsyncioTestCase):
+    async def test_adds_server_timing_and_records_route(self):
+        async def app(scope, receive, send):
+            scope["route"] = SimpleNamespace(path="/api/things/{thing_id}")
+            current_timings.get().record_query(0.002, "SELECT 1", ())
+            await send({"type": "http.response.start", "status": 200, "headers": []})
+            await send({"type": "http.response.body", "body": b"{}"})
+
+        sent = []
+
+        async def send(message):
+            sent.append(message)
+
+        middleware = InstrumentationMiddleware(app, connect=None)
+        await middleware({"type": "http", "method": "GET", "path": "/api/things/1"}, None, send)
+
+        headers = dict(sent[0]["headers"])
+        self.assertIn(b'db;dur=2.0;desc="1 queries"', headers[b"server-timing"])
+        self.assertGreaterEqual(request_queries[("GET", "/api/things/{thing_id}")], 1)
+
+    async def test_background_tasks_are_not_charged_to_the_request(self):
+        from fastapi import BackgroundTasks, FastAPI
+
+        app = FastAPI()
+        background = {}
+
+        async def job():
+            timings = current_timings.get()
+            timings.record_query(5.0, "UPDATE jobs SET status = 'done'", ())
+            background["queries"] = timings.queries
+
+        @app.post("/jobs")
+        async def start_job(tasks: BackgroundTasks):
+            current_timings.get().record_query(0.001, "INSERT INTO jobs DEFAULT VALUES", ())
+            tasks.add_task(job)
+            return {}
+
+        messages = []
+
+        async def receive():
+            return {"type": "http.request", "body": b"", "more_body": False}
+
+        async def send(message):
+            messages.append(message)
+
+        scope = {
+            "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "POST", "scheme": "http",
+            "path": "/jobs", "raw_path": b"/jobs", "root_path": "", "query_string": b"", "headers": [],
+            "client": ("test", 1), "server": ("test", 80),
+        }
+        await InstrumentationMiddleware(app, connect=None)(scope, receive, send)
+
+        self.assertEqual(background, {"queries": 1})
+        self.assertEqual(request_queries[("POST", "/jobs")], 1)
+        self.assertLess(request_duration._series[("POST", "/jobs", "200")][-2], 1.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
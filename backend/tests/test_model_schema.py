@@ -0,0 +1,92 @@
+import unittest
+
+from app.model_schema import SchemaCache, compile_model_schema
+from app.models import Model, ModelField
+
+
+def _model(version: int = 1) -> Model:
+    return Model(id=7, workspace_id=3, name="Tasks", slug="tasks", schema_version=version)
+
+
+def _fields() -> list[ModelField]:
+    return [
+        ModelField(slug="title", data_type="string", is_required=True, is_unique=False, position=0),
+        ModelField(
+            slug="status",
+            data_type="enum",
+            is_required=False,
+            is_unique=False,
+            position=1,
+            config={"options": ["open", "closed"]},
+        ),
+        ModelField(slug="points", data_type="number", is_required=False, is_unique=True, position=2),
+        ModelField(
+            slug="owner",
+            data_type="relation",
+            is_required=False,
+            is_unique=False,
+            position=3,
+            config={"model_id": 9},
+        ),
+    ]
+
+
+class CompileModelSchemaTests(unittest.TestCase):
+    def test_collects_field_metadata(self):
+        schema = compile_model_schema(_model(), _fields())
+
+        self.assertEqual(schema.required, frozenset({"title"}))
+        self.assertEqual(schema.unique_slugs, ["points"])
+        owner = schema.relation_fields[0]
+        self.assertEqual((owner.relation_workspace_id, owner.relation_model_id), (3, 9))
+
+    def test_check_reports_errors_in_field_order(self):
+        schema = compile_model_schema(_model(), _fields())
+
+        errors = schema.check({"status": "archived", "points": True, "owner": None})
+
+        self.assertEqual(
+            list(errors.items()),
+            [
+                ("title", "Field is required"),
+                ("status", "Value not permitted"),
+                ("points", "Must be a number"),
+                ("owner", "Field cannot be null"),
+            ],
+        )
+
+    def test_enum_rejects_unhashable_values(self):
+        schema = compile_model_schema(_model(), _fields())
+
+        self.assertEqual(schema.check({"title": "x", "status": ["open"]}), {"status": "Value not permitted"})
+
+
+class SchemaCacheTests(unittest.TestCase):
+    def test_lookup_is_keyed_by_version(self):
+        cache = SchemaCache(maxsize=4)
+        cache.put(compile_model_schema(_model(1), _fields()))
+
+        self.assertIsNotNone(cache.get(7, 1))
+        self.assertIsNone(cache.get(7, 2))
+
+    def test_newer_version_replaces_older(self):
+        cache = SchemaCache(maxsize=4)
+        cache.put(compile_model_schema(_model(1), _fields()))
+        cache.put(compile_model_schema(_model(2), _fields()))
+
+        self.assertIsNone(cache.get(7, 1))
+        self.assertIsNotNone(cache.get(7, 2))
+
+    def test_evicts_least_recently_used(self):
+        cache = SchemaCache(maxsize=1)
+        first = compile_model_schema(Model(id=1, workspace_id=1, schema_version=1), [])
+        second = compile_model_schema(Model(id=2, workspace_id=1, schema_version=1), [])
+        cache.put(first)
+        cache.put(second)
+
+        self.assertIsNone(cache.get(1, 1))
+        self.assertIs(cache.get(2, 1), second)
+
+
+if __name__ == "__main__":
+    unittest.main()
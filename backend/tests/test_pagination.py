@@ -0,0 +1,136 @@
+import base64
+import json
+import unittest
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from fastapi import HTTPException
+from sqlalchemy import JSON, String, create_engine, select
+from sqlalchemy.dialects.postgresql import ENUM, JSONB
+from sqlalchemy.orm import sessionmaker
+
+from app.indexes import field_expression
+from app.models import Base, Workspace, Model, Record
+from app.pagination import decode_cursor, encode_cursor, keyset_predicate, order_by_keyset
+
+
+class CursorTests(unittest.TestCase):
+    def test_round_trip_preserves_types(self):
+        values = [datetime(2024, 1, 2, 3, 4, 5), Decimal("10.50"), "abc", None]
+        cursor = encode_cursor("created_at:asc", values, 42)
+
+        decoded, record_id = decode_cursor(cursor, "created_at:asc", len(values))
+
+        self.assertEqual(decoded, values)
+        self.assertEqual(record_id, 42)
+
+    def test_rejects_cursor_for_other_sort(self):
+        cursor = encode_cursor("created_at:asc", [datetime(2024, 1, 1)], 1)
+
+        with self.assertRaises(HTTPException) as excinfo:
+            decode_cursor(cursor, "created_at:desc", 1)
+
+        self.assertEqual(excinfo.exception.status_code, 400)
+
+    def test_rejects_garbage(self):
+        with self.assertRaises(HTTPException) as excinfo:
+            decode_cursor("not-a-cursor", "created_at:asc", 1)
+
+        self.assertEqual(excinfo.exception.status_code, 400)
+
+    def test_rejects_tampered_cursors(self):
+        payloads = [
+            {"s": "created_at:asc", "k": [{"$n": "abc"}], "id": 1},
+            {"s": "created_at:asc", "k": [{"$d": "yesterday"}], "id": 1},
+            {"s": "created_at:asc", "k": ["2024-01-01"], "id": 1.5},
+            {"s": "created_at:asc", "k": ["2024-01-01"], "id": True},
+            {"s": "created_at:asc", "k": [[1]], "id": 1},
+            {"s": "created_at:asc", "k": [{"other": 1}], "id": 1},
+            ["not", "an", "object"],
+        ]
+        for payload in payloads:
+            cursor = base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+            with self.subTest(payload=payload), self.assertRaises(HTTPException) as excinfo:
+                decode_cursor(cursor, "created_at:asc", 1)
+            self.assertEqual(excinfo.exception.status_code, 400)
+
+
+class KeysetPredicateTests(unittest.TestCase):
+    def _sql(self, predicate) -> str:
+        return str(predicate.compile(compile_kwargs={"literal_binds": True}))
+
+    def test_builtin_sort_uses_row_comparison(self):
+        predicate = keyset_predicate([(Record.created_at, "desc")], [datetime(2024, 1, 1)], 7)
+
+        self.assertEqual(
+            self._sql(predicate), "(records.created_at, records.id) < ('2024-01-01 00:00:00', 7)"
+        )
+
+    def test_nullable_expression_keeps_null_aware_form(self):
+        predicate = keyset_predicate([(field_expression("due", "date"), "asc")], [None], 7)
+
+        sql = self._sql(predicate)
+        self.assertIn("IS NULL", sql)
+        self.assertIn("records.id > 7", sql)
+
+
+class KeysetWalkTests(unittest.TestCase):
+    def setUp(self):
+        self.engine = create_engine("sqlite:///:memory:", future=True)
+        for table in Base.metadata.tables.values():
+            for column in table.columns:
+                if isinstance(column.type, JSONB):
+                    column.type = JSON()
+                if isinstance(column.type, ENUM):
+                    column.type = String()
+        Base.metadata.create_all(self.engine)
+        self.session = sessionmaker(self.engine, expire_on_commit=False)()
+
+        workspace = Workspace(name="Main Workspace")
+        self.session.add(workspace)
+        self.session.flush()
+        self.model = Model(workspace_id=workspace.id, name="Tasks", slug="tasks")
+        self.session.add(self.model)
+        self.session.flush()
+        start = datetime(2024, 1, 1)
+        # Duplicate timestamps force the id tie-breaker to do its job.
+        for index in range(7):
+            self.session.add(
+                Record(
+                    model_id=self.model.id,
+                    workspace_id=workspace.id,
+                    data={"n": index},
+                    created_at=start + timedelta(days=index // 2),
+                )
+            )
+        self.session.commit()
+
+    def tearDown(self):
+        self.session.close()
+        self.engine.dispose()
+
+    def _walk(self, order: str) -> list[int]:
+        columns = [(Record.created_at, order)]
+        seen: list[int] = []
+        cursor = None
+        while True:
+            query = select(Record, Record.created_at).where(Record.model_id == self.model.id)
+            query = order_by_keyset(query, columns)
+            if cursor:
+                values, last_id = decode_cursor(cursor, "created_at:" + order, 1)
+                query = query.where(keyset_predicate(columns, values, last_id))
+            rows = self.session.execute(query.limit(3)).all()
+            if not rows:
+                return seen
+            seen.extend(row[0].data["n"] for row in rows)
+            cursor = encode_cursor("created_at:" + order, [rows[-1][1]], rows[-1][0].id)
+
+    def test_ascending_walk_visits_every_record_once(self):
+        self.assertEqual(self._walk("asc"), [0, 1, 2, 3, 4, 5, 6])
+
+    def test_descending_walk_visits_every_record_once(self):
+        self.assertEqual(self._walk("desc"), [6, 5, 4, 3, 2, 1, 0])
+
+
+if __name__ == "__main__":
+    unittest.main()
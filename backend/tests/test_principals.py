@@ -0,0 +1,121 @@
+import unittest
+
+from jose import jwt
+from sqlalchemy import JSON, String, create_engine
+from sqlalchemy.dialects.postgresql import ENUM, JSONB
+from sqlalchemy.orm import sessionmaker
+
+from app.cache import TTLCache
+from app.core_config import settings
+from app.models import Base, User
+from app.principals import (
+    Principal,
+    evict_principal,
+    get_principal,
+    principal_cache,
+    principal_claims,
+    principal_from_claims,
+)
+from app.security import create_access_token
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TTLCacheTests(unittest.TestCase):
+    def test_entries_expire_and_count_misses(self):
+        clock = Clock()
+        cache = TTLCache(maxsize=2, ttl=10, clock=clock)
+        cache.set("a", 1)
+
+        self.assertEqual(cache.get("a"), 1)
+        clock.now = 11
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = TTLCache(maxsize=2, ttl=10, clock=Clock())
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), 1)
+        self.assertEqual(cache.stats()["size"], 2)
+
+
+class CountingSession:
+    def __init__(self, session):
+        self._session = session
+        self.queries = 0
+
+    async def execute(self, statement):
+        self.queries += 1
+        return self._session.execute(statement)
+
+
+class GetPrincipalTests(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.engine = create_engine("sqlite:///:memory:", future=True)
+        for table in Base.metadata.tables.values():
+            for column in table.columns:
+                if isinstance(column.type, JSONB):
+                    column.type = JSON()
+                if isinstance(column.type, ENUM):
+                    column.type = String()
+        Base.metadata.create_all(self.engine)
+        self.db = sessionmaker(self.engine, expire_on_commit=False)()
+        user = User(email="ada@example.com", password_hash="x", token_version=2)
+        self.db.add(user)
+        self.db.commit()
+        self.user_id = user.id
+        principal_cache.clear()
+
+    async def asyncTearDown(self):
+        self.db.close()
+        self.engine.dispose()
+
+    async def test_second_lookup_is_served_from_cache(self):
+        session = CountingSession(self.db)
+        first = await get_principal(session, self.user_id, 2)
+        queries = session.queries
+        second = await get_principal(session, self.user_id, 2)
+
+        self.assertEqual(second, first)
+        self.assertEqual(session.queries, queries)
+        self.assertEqual(queries, 1)
+
+    async def test_revoked_token_version_is_rejected(self):
+        self.assertIsNone(await get_principal(CountingSession(self.db), self.user_id, 1))
+
+    async def test_eviction_reloads_from_database(self):
+        session = CountingSession(self.db)
+        await get_principal(session, self.user_id, 2)
+        self.db.query(User).update({User.token_version: 3})
+        self.db.commit()
+        evict_principal(self.user_id)
+
+        self.assertIsNone(await get_principal(session, self.user_id, 2))
+        self.assertIsNotNone(await get_principal(session, self.user_id, 3))
+
+
+class EmbeddedClaimsTests(unittest.TestCase):
+    def test_principal_round_trips_through_token(self):
+        principal = Principal(id=7, email="ada@example.com", token_version=4)
+        token = create_access_token("7", version=4, claims=principal_claims(principal))
+        payload = jwt.decode(token, settings.jwt_secret, algorithms=[settings.jwt_algorithm])
+
+        self.assertEqual(principal_from_claims(payload), principal)
+
+    def test_tokens_without_claims_need_a_lookup(self):
+        self.assertIsNone(principal_from_claims({"sub": "7"}))
+
+
+if __name__ == "__main__":
+    unittest.main()
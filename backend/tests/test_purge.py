@@ -0,0 +1,27 @@
+import unittest
+
+from sqlalchemy.dialects import postgresql
+
+from app.models import Model
+from app.purge import purge_statement, tombstone_slug
+
+
+class PurgeTests(unittest.TestCase):
+    def test_purge_deletes_one_ordered_chunk(self):
+        sql = str(purge_statement(7, 500).compile(dialect=postgresql.dialect(),
+                                                  compile_kwargs={"render_postcompile": True}))
+
+        self.assertTrue(sql.startswith("DELETE FROM records WHERE records.id IN (SELECT records.id"))
+        self.assertIn("records.model_id = 7", sql)
+        self.assertIn("ORDER BY records.id", sql)
+        self.assertIn("LIMIT %(param_", sql)
+
+    def test_tombstone_slug_stays_within_column_length(self):
+        slug = tombstone_slug(Model(id=12, slug="x" * 255))
+
+        self.assertEqual(len(slug), 255)
+        self.assertTrue(slug.endswith("~deleted-12"))
+
+
+if __name__ == "__main__":
+    unittest.main()
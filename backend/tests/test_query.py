@@ -0,0 +1,114 @@
+import unittest
+from decimal import Decimal
+
+from fastapi import HTTPException
+from sqlalchemy.dialects import postgresql
+
+from app.query import (
+    FilterSpec,
+    filter_clause,
+    group_expression,
+    metric_expression,
+    parse_filter,
+    parse_projection,
+    sort_columns,
+)
+
+TYPES = {"price": "number", "title": "string", "due": "date", "done": "boolean", "seen": "datetime"}
+
+
+def _sql(clause) -> str:
+    return str(clause.compile(dialect=postgresql.dialect(), compile_kwargs={"render_postcompile": True}))
+
+
+class FilterParsingTests(unittest.TestCase):
+    def test_parses_key_operator_value(self):
+        self.assertEqual(parse_filter("price:between:1,5"), FilterSpec("price", "between", "1,5"))
+
+    def test_value_may_contain_colons(self):
+        self.assertEqual(parse_filter("title:eq:a:b").value, "a:b")
+
+    def test_rejects_unknown_operator(self):
+        with self.assertRaises(HTTPException) as excinfo:
+            parse_filter("price:like:1")
+        self.assertEqual(excinfo.exception.status_code, 422)
+
+
+class FilterClauseTests(unittest.TestCase):
+    def test_number_filters_use_numeric_cast(self):
+        clause = filter_clause(FilterSpec("price", "gte", "10"), TYPES)
+
+        self.assertIn("records_numeric(records.data ->> 'price') >=", _sql(clause))
+        self.assertEqual(clause.right.value, Decimal("10"))
+
+    def test_contains_is_text_only(self):
+        self.assertIn("ILIKE", _sql(filter_clause(FilterSpec("title", "contains", "ac"), TYPES)))
+        with self.assertRaises(HTTPException):
+            filter_clause(FilterSpec("price", "contains", "1"), TYPES)
+
+    def test_range_rejected_on_boolean(self):
+        with self.assertRaises(HTTPException):
+            filter_clause(FilterSpec("done", "gt", "true"), TYPES)
+
+    def test_invalid_value_reports_field(self):
+        with self.assertRaises(HTTPException) as excinfo:
+            filter_clause(FilterSpec("due", "lt", "yesterday"), TYPES)
+        self.assertEqual(excinfo.exception.detail[0]["field"], "due")
+
+    def test_unknown_field(self):
+        with self.assertRaises(HTTPException) as excinfo:
+            filter_clause(FilterSpec("missing", "eq", "x"), TYPES)
+        self.assertEqual(excinfo.exception.detail, [{"field": "missing", "error": "Unknown field"}])
+
+
+class SortColumnTests(unittest.TestCase):
+    def test_multi_column_with_descending_prefix(self):
+        columns = sort_columns("due,-price", "asc", TYPES)
+
+        self.assertEqual([order for _, order in columns], ["asc", "desc"])
+        self.assertIn("records_date", _sql(columns[0][0]))
+        self.assertIn("records_numeric", _sql(columns[1][0]))
+
+    def test_defaults_to_created_at(self):
+        columns = sort_columns(None, "desc", TYPES)
+
+        self.assertEqual(columns[0][1], "desc")
+        self.assertIn("created_at", _sql(columns[0][0]))
+
+
+class AggregateExpressionTests(unittest.TestCase):
+    def test_date_groups_are_truncated_inline(self):
+        sql = _sql(group_expression("due", "week", TYPES))
+
+        self.assertEqual(sql, "CAST(date_trunc('week', records_date(records.data ->> 'due')) AS DATE)")
+
+    def test_datetime_groups_truncate_in_utc(self):
+        self.assertIn("'month'", _sql(group_expression("seen", "month", TYPES)))
+        self.assertIn("'UTC'", _sql(group_expression("seen", "month", TYPES)))
+
+    def test_cannot_group_by_number(self):
+        with self.assertRaises(HTTPException):
+            group_expression("price", "day", TYPES)
+
+    def test_metrics_require_number_fields(self):
+        self.assertEqual(_sql(metric_expression("sum:price", TYPES)), "sum(records_numeric(records.data ->> 'price'))")
+        self.assertEqual(_sql(metric_expression("count", TYPES)), "count(*)")
+        with self.assertRaises(HTTPException):
+            metric_expression("avg:title", TYPES)
+        with self.assertRaises(HTTPException):
+            metric_expression("median:price", TYPES)
+
+
+if __name__ == "__main__":
+    unittest.main()
+
+
+class ProjectionParsingTests(unittest.TestCase):
+    def test_keeps_requested_order_without_duplicates(self):
+        self.assertEqual(parse_projection("title, price,title", TYPES), ["title", "price"])
+        self.assertIsNone(parse_projection(" , ", TYPES))
+
+    def test_rejects_unknown_slugs(self):
+        with self.assertRaises(HTTPException) as ctx:
+            parse_projection("title,secret", TYPES)
+        self.assertEqual(ctx.exception.detail, [{"field": "secret", "error": "Unknown field"}])
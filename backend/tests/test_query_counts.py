@@ -0,0 +1,121 @@
+import json
+import unittest
+
+from sqlalchemy import JSON, String, create_engine, event
+from sqlalchemy.dialects.postgresql import ENUM, JSONB
+from sqlalchemy.orm import sessionmaker
+
+from app.authz import role_cache
+from app.models import Base, Model, ModelField, Record, User, Workspace, WorkspaceMember
+from app.model_schema import schema_cache
+from app.principals import Principal
+from app.routers.models import get_model, get_model_by_slug, list_models
+from app.routers.records import list_records
+from app.routers.workspaces import list_memberships
+from app.schema_registry import schema_registry, slug_registry
+from app.schemas import ModelRead, WorkspaceMembershipRead
+
+
+class SessionAdapter:
+    def __init__(self, session):
+        self._session = session
+
+    async def execute(self, statement):
+        return self._session.execute(statement)
+
+
+class ListingQueryCountTests(unittest.IsolatedAsyncioTestCase):
+    MODELS = 12
+
+    async def asyncSetUp(self):
+        self.engine = create_engine("sqlite:///:memory:", future=True)
+        for table in Base.metadata.tables.values():
+            for column in table.columns:
+                if isinstance(column.type, JSONB):
+                    column.type = JSON()
+                if isinstance(column.type, ENUM):
+                    column.type = String()
+        Base.metadata.create_all(self.engine)
+        db = sessionmaker(self.engine, expire_on_commit=False)()
+        user = User(email="ada@example.com", password_hash="x")
+        workspaces = [Workspace(name=f"Workspace {n}") for n in range(3)]
+        db.add_all([user, *workspaces])
+        db.flush()
+        db.add_all(WorkspaceMember(user_id=user.id, workspace_id=w.id, role="owner") for w in workspaces)
+        for n in range(self.MODELS):
+            model = Model(workspace_id=workspaces[0].id, name=f"Model {n}", slug=f"model-{n}")
+            db.add(model)
+            db.add_all(
+                ModelField(model=model, name=f"F{i}", slug=f"f{i}", data_type="string", position=i) for i in range(4)
+            )
+            db.add_all(
+                Record(model=model, workspace_id=workspaces[0].id, data={"f0": f"value {i}"}) for i in range(3)
+            )
+        db.commit()
+        db.close()
+        self.user = Principal(id=user.id, email=user.email)
+        self.workspace_id = workspaces[0].id
+        self.session = sessionmaker(self.engine, expire_on_commit=False)()
+        self.adapter = SessionAdapter(self.session)
+        self.statements = 0
+        event.listen(self.engine, "before_cursor_execute", self._count)
+        role_cache.clear()
+        schema_registry.clear()
+        slug_registry.clear()
+        schema_cache.clear()
+
+    async def asyncTearDown(self):
+        self.session.close()
+        self.engine.dispose()
+
+    def _count(self, *args):
+        self.statements += 1
+
+    async def test_list_models_uses_fixed_number_of_queries(self):
+        models = await list_models(workspace_id=self.workspace_id, session=self.adapter, current_user=self.user)
+        payload = [ModelRead.model_validate(model) for model in models]
+
+        self.assertEqual(len(payload), self.MODELS)
+        self.assertEqual([f.slug for f in payload[0].fields], ["f0", "f1", "f2", "f3"])
+        self.assertEqual(self.statements, 3)
+
+    async def test_list_memberships_joins_workspaces(self):
+        memberships = await list_memberships(session=self.adapter, current_user=self.user)
+        payload = [WorkspaceMembershipRead.model_validate(m) for m in memberships]
+
+        self.assertEqual(len(payload), 3)
+        self.assertEqual(self.statements, 1)
+
+    async def test_single_model_lookups(self):
+        model_id = self.session.query(Model.id).filter(Model.slug == "model-3").scalar()
+        self.statements = 0
+
+        response = await get_model(model_id, None, session=self.adapter, current_user=self.user)
+        self.assertEqual(ModelRead.model_validate(json.loads(response.body)).slug, "model-3")
+        self.assertEqual(self.statements, 3)
+
+        self.statements = 0
+        response = await get_model_by_slug(
+            "model-4", self.workspace_id, None, session=self.adapter, current_user=self.user
+        )
+        self.assertEqual(len(ModelRead.model_validate(json.loads(response.body)).fields), 4)
+        self.assertEqual(self.statements, 2)
+
+    async def test_warm_record_list_only_queries_records(self):
+        model_id = self.session.query(Model.id).filter(Model.slug == "model-5").scalar()
+        arguments = dict(
+            skip=0, limit=50, cursor=None, include_total=False, sort_by=None, sort_order="asc", q=None,
+            expand=None, fields=None, filter_key=None, filter_value=None, filters=["f0:eq:value 1"],
+            session=self.adapter, current_user=self.user,
+        )
+        await list_records(model_id, **arguments)
+        self.statements = 0
+
+        response = await list_records(model_id, **arguments)
+
+        self.assertEqual(len(json.loads(response.body)["items"]), 1)
+        self.assertEqual(self.statements, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,41 @@
+import unittest
+from unittest import mock
+
+from sqlalchemy.dialects import postgresql
+
+from app.core_config import settings
+from app.record_limits import release_statement, reserve_statement
+
+
+def _sql(statement) -> str:
+    return str(statement.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+
+
+class ReserveStatementTests(unittest.TestCase):
+    def test_reservation_is_one_conditional_upsert(self):
+        with mock.patch.object(settings, "plan_record_limits", {"free": 500, "pro": 100000}):
+            sql = _sql(reserve_statement(4, 2, 25))
+
+        self.assertTrue(sql.startswith("INSERT INTO record_counters (model_id, workspace_id, record_count) SELECT 4"))
+        self.assertIn("ON CONFLICT (model_id) DO UPDATE SET record_count = (record_counters.record_count + excluded.record_count)", sql)
+        self.assertIn("coalesce(workspaces.record_limit, CASE workspaces.plan WHEN 'free' THEN 500 WHEN 'pro' THEN 100000 ELSE 500 END)", sql)
+        self.assertIn("WHERE workspaces.id = 2", sql)
+        self.assertIn("RETURNING record_counters.record_count", sql)
+
+    def test_unlimited_plans_pass_the_check(self):
+        with mock.patch.object(settings, "plan_record_limits", {"free": 500, "enterprise": None}):
+            sql = _sql(reserve_statement(4, 2, 1))
+
+        self.assertIn("WHEN 'enterprise' THEN NULL", sql)
+        self.assertIn("WHERE coalesce(1 <= (SELECT", sql)
+        self.assertIn("WHERE coalesce(record_counters.record_count + excluded.record_count <= (SELECT", sql)
+
+    def test_release_never_goes_negative(self):
+        sql = _sql(release_statement(4, 3))
+
+        self.assertIn("SET record_count=greatest(record_counters.record_count - 3, 0)", sql)
+        self.assertIn("WHERE record_counters.model_id = 4", sql)
+
+
+if __name__ == "__main__":
+    unittest.main()
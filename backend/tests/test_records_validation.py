@@ -6,7 +6,8 @@ from sqlalchemy.dialects.postgresql import ENUM, JSONB
 from sqlalchemy.orm import Session, sessionmaker
 
 from app.models import Base, Workspace, Model, ModelField, Record
-from app.routers.records import validate_record_payload
+from app.model_schema import get_model_schema, schema_cache
+from app.record_validation import batch_errors, validate_record_payload
 
 
 class AsyncSessionStub:
@@ -59,6 +60,8 @@ class ValidateRecordPayloadTests(unittest.IsolatedAsyncioTestCase):
         self.session_factory = sessionmaker(
             self.engine, expire_on_commit=False
         )
+        # Model ids restart with every in-memory database.
+        schema_cache.clear()
 
     async def asyncTearDown(self):
         self.engine.dispose()
@@ -132,6 +135,33 @@ class ValidateRecordPayloadTests(unittest.IsolatedAsyncioTestCase):
                 session, model, {"email": "duplicate@example.com"}, record_id=existing.id
             )
 
+    async def test_unique_field_is_scoped_to_model(self):
+        async with self._async_session() as session:
+            workspace = await self._create_workspace(session)
+            model = Model(workspace_id=workspace.id, name="Contacts", slug="contacts")
+            other_model = Model(workspace_id=workspace.id, name="Leads", slug="leads")
+            unique_field = ModelField(
+                model=model,
+                name="Email",
+                slug="email",
+                data_type="string",
+                is_unique=True,
+            )
+            await session.add_all([model, other_model, unique_field])
+            await session.commit()
+
+            other = Record(
+                model_id=other_model.id,
+                workspace_id=workspace.id,
+                data={"email": "duplicate@example.com"},
+            )
+            await session.add(other)
+            await session.commit()
+
+            await validate_record_payload(
+                session, model, {"email": "duplicate@example.com"}
+            )
+
     async def test_relation_field_requires_existing_record(self):
         async with self._async_session() as session:
             workspace = await self._create_workspace(session)
@@ -232,6 +262,82 @@ class ValidateRecordPayloadTests(unittest.IsolatedAsyncioTestCase):
                 session, main_model, {"owner": related.id}
             )
 
+    async def test_batch_errors_check_uniqueness_within_batch_and_database(self):
+        async with self._async_session() as session:
+            workspace = await self._create_workspace(session)
+            model = Model(workspace_id=workspace.id, name="Contacts", slug="contacts")
+            unique_field = ModelField(
+                model=model,
+                name="Email",
+                slug="email",
+                data_type="string",
+                is_unique=True,
+            )
+            await session.add_all([model, unique_field])
+            await session.commit()
+
+            existing = Record(
+                model_id=model.id,
+                workspace_id=workspace.id,
+                data={"email": "taken@example.com"},
+            )
+            await session.add(existing)
+            await session.commit()
+
+            schema = await get_model_schema(session, model)
+            errors = await batch_errors(
+                session,
+                schema,
+                [
+                    {"email": "new@example.com"},
+                    {"email": "taken@example.com"},
+                    {"email": "new@example.com"},
+                    {"email": 5},
+                ],
+            )
+
+            self.assertEqual(
+                errors,
+                [
+                    {},
+                    {"email": "Value must be unique"},
+                    {"email": "Value is duplicated within the batch"},
+                    {"email": "Must be a string"},
+                ],
+            )
+
+    async def test_batch_errors_resolve_relations_together(self):
+        async with self._async_session() as session:
+            workspace = await self._create_workspace(session)
+            target_model = Model(
+                workspace_id=workspace.id, name="Accounts", slug="accounts"
+            )
+            main_model = Model(workspace_id=workspace.id, name="Tasks", slug="tasks")
+            await session.add_all([target_model, main_model])
+            await session.flush()
+            relation_field = ModelField(
+                model=main_model,
+                name="Owner",
+                slug="owner",
+                data_type="relation",
+                config={"workspace_id": workspace.id, "model_id": target_model.id},
+            )
+            await session.add(relation_field)
+            related = Record(
+                model_id=target_model.id,
+                workspace_id=workspace.id,
+                data={"name": "Owner"},
+            )
+            await session.add(related)
+            await session.commit()
+
+            schema = await get_model_schema(session, main_model)
+            errors = await batch_errors(
+                session, schema, [{"owner": related.id}, {"owner": 999}]
+            )
+
+            self.assertEqual(errors, [{}, {"owner": "Related record not found"}])
+
 
 if __name__ == "__main__":
     unittest.main()
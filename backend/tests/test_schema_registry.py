@@ -0,0 +1,86 @@
+import json
+import unittest
+from datetime import datetime
+
+from app.authz import role_cache
+from app.models import Model, ModelField
+from app.principals import Principal, principal_cache
+from app.routers.models import get_model, get_model_by_slug
+from app.schema_registry import (
+    _on_model_changed,
+    etag_matches,
+    invalidate_model,
+    lookup_by_slug,
+    register_model,
+    schema_registry,
+    slug_registry,
+)
+
+
+class NoDatabase:
+    async def execute(self, statement):
+        raise AssertionError("registry hits must not query the database")
+
+
+def _model(version=1):
+    model = Model(id=5, workspace_id=2, name="Contacts", slug="contacts", description=None, schema_version=version)
+    model.fields = [
+        ModelField(id=1, name="Email", slug="email", data_type="string", is_required=True, is_unique=True, position=0)
+    ]
+    model.created_at = datetime(2024, 1, 1)
+    return model
+
+
+class SchemaRegistryTests(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        schema_registry.clear()
+        slug_registry.clear()
+        role_cache.clear()
+        role_cache.set((1, 2), "member")
+        self.user = Principal(id=1, email="ada@example.com")
+
+    async def test_etag_follows_schema_version(self):
+        first = register_model(_model(version=1))
+        second = register_model(_model(version=2))
+
+        self.assertNotEqual(first.etag, second.etag)
+        self.assertEqual(json.loads(second.body)["fields"][0]["slug"], "email")
+        self.assertIs(lookup_by_slug(2, "contacts"), second)
+        self.assertIsNone(lookup_by_slug(3, "contacts"))
+
+    async def test_if_none_match_returns_304_without_queries(self):
+        entry = register_model(_model())
+
+        response = await get_model(5, f'W/{entry.etag}, "other"', session=NoDatabase(), current_user=self.user)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.headers["etag"], entry.etag)
+
+        response = await get_model_by_slug("contacts", 2, None, session=NoDatabase(), current_user=self.user)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.body, entry.body)
+
+    async def test_invalidation_drops_every_cache(self):
+        register_model(_model())
+        invalidate_model(5)
+
+        self.assertIsNone(schema_registry.get(5))
+        self.assertIsNone(lookup_by_slug(2, "contacts"))
+
+    async def test_notifications_drop_models_and_principals(self):
+        register_model(_model())
+        principal_cache.set(1, self.user)
+
+        _on_model_changed(None, 0, "model_changes", "5")
+        _on_model_changed(None, 0, "model_changes", "principal:1")
+
+        self.assertIsNone(schema_registry.get(5))
+        self.assertIsNone(principal_cache.get(1))
+
+    def test_etag_matching(self):
+        self.assertTrue(etag_matches("*", '"a"'))
+        self.assertFalse(etag_matches(None, '"a"'))
+        self.assertFalse(etag_matches('"b"', '"a"'))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,40 @@
+import unittest
+
+from sqlalchemy.dialects import postgresql
+
+from app.search import prefix_query, search_clause
+
+
+def _sql(statement) -> str:
+    return str(statement.compile(dialect=postgresql.dialect(), compile_kwargs={"render_postcompile": True}))
+
+
+class SearchTests(unittest.TestCase):
+    def test_prefix_query_keeps_only_words(self):
+        self.assertEqual(prefix_query("Ada  Love-lace!"), "ada:* & love:* & lace:*")
+        self.assertIsNone(prefix_query("&|!"))
+
+    def test_clause_uses_indexed_expressions(self):
+        match, score = search_clause("ada")
+        sql = _sql(match)
+
+        self.assertIn("to_tsvector(CAST('simple' AS REGCONFIG), records_search_text(records.data)) @@ to_tsquery(", sql)
+        self.assertIn("records_search_text(records.data) ILIKE", sql)
+        self.assertIn("records_search_text(records.data) %%> ", sql)
+        self.assertIn("ts_rank(", _sql(score))
+        self.assertIn("word_similarity(", _sql(score))
+
+    def test_clause_escapes_like_wildcards(self):
+        match, _ = search_clause("50%_off")
+
+        self.assertEqual(match.compile(dialect=postgresql.dialect()).params["records_search_text_1"], "%50\\%\\_off%")
+
+    def test_punctuation_only_query_skips_text_search(self):
+        match, score = search_clause("!!")
+
+        self.assertNotIn("to_tsquery", _sql(match))
+        self.assertNotIn("ts_rank", _sql(score))
+
+
+if __name__ == "__main__":
+    unittest.main()
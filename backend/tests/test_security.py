@@ -0,0 +1,46 @@
+import asyncio
+import threading
+import time
+import unittest
+
+from app.core_config import settings
+from app.security import _run_password_work, password_hashing_stats, pwd_context
+
+
+class PasswordWorkTests(unittest.IsolatedAsyncioTestCase):
+    async def test_concurrency_is_bounded_and_queue_drains(self):
+        lock = threading.Lock()
+        active = peak = 0
+
+        def work(value):
+            nonlocal active, peak
+            with lock:
+                active += 1
+                peak = max(peak, active)
+            time.sleep(0.02)
+            with lock:
+                active -= 1
+            return value
+
+        tasks = [asyncio.create_task(_run_password_work(work, n)) for n in range(settings.password_hash_concurrency * 3)]
+        await asyncio.sleep(0.005)
+        self.assertGreater(password_hashing_stats()["queued"], 0)
+
+        self.assertEqual(await asyncio.gather(*tasks), list(range(len(tasks))))
+        self.assertLessEqual(peak, settings.password_hash_concurrency)
+        stats = password_hashing_stats()
+        self.assertEqual((stats["queued"], stats["running"]), (0, 0))
+
+
+class WorkFactorTests(unittest.TestCase):
+    def test_hashes_with_another_cost_need_rehash(self):
+        salt_and_checksum = "a" * 53
+        current = f"$2b${settings.bcrypt_rounds:02d}${salt_and_checksum}"
+        weaker = f"$2b${settings.bcrypt_rounds - 1:02d}${salt_and_checksum}"
+
+        self.assertFalse(pwd_context.needs_update(current))
+        self.assertTrue(pwd_context.needs_update(weaker))
+
+
+if __name__ == "__main__":
+    unittest.main()
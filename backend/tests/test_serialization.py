@@ -0,0 +1,53 @@
+import json
+import unittest
+from datetime import datetime
+
+from app.schemas import RecordListResponse, RecordRead
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+
+from app.serialization import RECORD_COLUMNS, record_columns, record_page_json
+
+
+def _row(record_id: int, data: dict, updated_by=None) -> tuple:
+    created = datetime(2024, 5, 1, 12, 30, 15, 123456)
+    # Postgres renders jsonb text with spaces after separators.
+    return (record_id, 3, 1, 9, updated_by, json.dumps(data), created, datetime(2024, 5, 2))
+
+
+class RecordPageJsonTests(unittest.TestCase):
+    def test_matches_pydantic_rendering(self):
+        rows = [_row(1, {"name": "Ada", "tags": ["a", "b"], "n": 1.5}), _row(2, {}, updated_by=4)]
+
+        body = record_page_json(rows, 2, True, "abc")
+
+        expected = RecordListResponse(
+            items=[
+                RecordRead(**{column.key: (json.loads(value) if column.key == "data" else value)
+                              for column, value in zip(RECORD_COLUMNS, row)})
+                for row in rows
+            ],
+            has_more=True,
+            total=2,
+            next_cursor="abc",
+        )
+        self.assertEqual(json.loads(body), json.loads(expected.model_dump_json()))
+
+    def test_empty_page(self):
+        self.assertEqual(
+            json.loads(record_page_json([], None, False, None)),
+            {"items": [], "total": None, "has_more": False, "next_cursor": None},
+        )
+
+    def test_projection_builds_a_slim_object_in_sql(self):
+        sql = str(select(*record_columns(["name", "email"])).compile(dialect=postgresql.dialect()))
+
+        self.assertIn(
+            "CAST(jsonb_build_object(%(param_1)s, records.data -> %(data_1)s, "
+            "%(param_2)s, records.data -> %(data_2)s) AS TEXT) AS data",
+            sql,
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
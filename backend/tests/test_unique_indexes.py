@@ -0,0 +1,28 @@
+import unittest
+
+from app.models import Model
+from app.unique_indexes import UNIQUE_INDEX_JOB_KIND, schedule_unique_indexes
+
+
+class CollectingSession:
+    def __init__(self):
+        self.added = []
+
+    def add(self, instance):
+        self.added.append(instance)
+
+
+class ScheduleUniqueIndexesTests(unittest.TestCase):
+    def test_job_records_sorted_plan_for_the_model(self):
+        session = CollectingSession()
+        model = Model(id=4, workspace_id=2, slug="contacts")
+
+        job = schedule_unique_indexes(session, model, 9, {"phone", "email"}, {"code"})
+
+        self.assertEqual(session.added, [job])
+        self.assertEqual((job.kind, job.model_id, job.workspace_id, job.created_by), (UNIQUE_INDEX_JOB_KIND, 4, 2, 9))
+        self.assertEqual(job.result, {"create": ["email", "phone"], "drop": ["code"]})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,7 +1,7 @@
 'use client'
 
 import Link from 'next/link'
-import { useEffect, useMemo, useState } from 'react'
+import { useEffect, useState } from 'react'
 import { AxiosError } from 'axios'
 import { useParams, usePathname, useRouter, useSearchParams } from 'next/navigation'
 import { api, type PaginatedRecordsResponse } from '@/lib/api'
@@ -26,15 +26,29 @@ interface ModelDefinition {
   created_at?: string
 }
 
+interface RelatedRecord {
+  id: number
+  model_id: number
+  data: Record<string, any>
+}
+
 interface RecordRow {
   id: number
   data: Record<string, any>
   created_at: string
   updated_at: string
+  expanded?: Record<string, RelatedRecord | null> | null
+}
+
+// Label a related record by its first text value, falling back to its id.
+const relatedLabel = (related: RelatedRecord) => {
+  const label = Object.values(related.data || {}).find((value) => typeof value === 'string' && value.trim())
+  return label ? String(label) : `#${related.id}`
 }
 
-const fieldValue = (value: any, field: ModelField) => {
+const fieldValue = (value: any, field: ModelField, related?: RelatedRecord | null) => {
   if (value === undefined || value === null) return '—'
+  if (field.data_type === 'relation' && related) return relatedLabel(related)
   if (field.data_type === 'boolean') return value ? 'Yes' : 'No'
   if (field.data_type === 'date') return new Date(value).toLocaleDateString()
   if (field.data_type === 'datetime') return new Date(value).toLocaleString()
@@ -138,6 +152,8 @@ export default function RecordsPage() {
   const [model, setModel] = useState<ModelDefinition | null>(null)
   const [records, setRecords] = useState<RecordRow[]>([])
   const [search, setSearch] = useState('')
+  const [query, setQuery] = useState('')
+  const [hiddenSlugs, setHiddenSlugs] = useState<string[]>([])
   const [sortBy, setSortBy] = useState<string | null>('created_at')
   const [sortOrder, setSortOrder] = useState<'asc' | 'desc'>('desc')
   const [filterKey, setFilterKey] = useState('')
@@ -151,6 +167,8 @@ export default function RecordsPage() {
   const [editingId, setEditingId] = useState<number | null>(null)
   const [editingData, setEditingData] = useState<Record<string, any>>({})
   const [hasMore, setHasMore] = useState(false)
+  // cursors[n] is the cursor that loads page n; page 0 starts without one.
+  const [cursors, setCursors] = useState<(string | null)[]>([null])
   const [usageEstimate, setUsageEstimate] = useState(0)
   const planLimit = 500
 
@@ -170,14 +188,11 @@ export default function RecordsPage() {
     }
   }
 
-  const displayRecords = useMemo(() => {
-    if (!search.trim()) return records
-    return records.filter((record) =>
-      Object.values(record.data || {}).some((value) =>
-        String(value).toLowerCase().includes(search.toLowerCase())
-      )
-    )
-  }, [records, search])
+  // Search runs on the server across all pages; wait for typing to pause.
+  useEffect(() => {
+    const timer = setTimeout(() => setQuery(search.trim()), 300)
+    return () => clearTimeout(timer)
+  }, [search])
 
   const fetchModel = async () => {
     if (!slug || !workspaceId || !token) return
@@ -208,15 +223,36 @@ export default function RecordsPage() {
     }
   }
 
+  const visibleFields = (model?.fields || []).filter((field) => !hiddenSlugs.includes(field.slug))
+  // Only visible columns are read from the server; editing loads the full record.
+  const projectedSlugs = hiddenSlugs.length ? visibleFields.map((field) => field.slug).join(',') : ''
+
+  // Related records come embedded in the page instead of one request each.
+  const relationSlugs = visibleFields
+    .filter((field) => field.data_type === 'relation')
+    .map((field) => field.slug)
+    .join(',')
+
+  const toggleColumn = (slug: string) =>
+    setHiddenSlugs((prev) => (prev.includes(slug) ? prev.filter((item) => item !== slug) : [...prev, slug]))
+
   const fetchRecords = async (modelId: number, options?: { resetPage?: boolean }) => {
-    if (options?.resetPage) setPage(0)
+    const targetPage = options?.resetPage ? 0 : page
+    if (options?.resetPage) {
+      setPage(0)
+      setCursors([null])
+    }
     setLoading(true)
     setError('')
     try {
       const res = await api.get<PaginatedRecordsResponse<RecordRow>>(`/models/${modelId}/records`, {
         params: {
-          skip: (options?.resetPage ? 0 : page * pageSize),
+          cursor: (options?.resetPage ? null : cursors[targetPage]) || undefined,
           limit: pageSize,
+          include_total: options?.resetPage || undefined,
+          q: query || undefined,
+          expand: relationSlugs || undefined,
+          fields: projectedSlugs || undefined,
           sort_by: sortBy || undefined,
           sort_order: sortOrder,
           filter_key: filterKey || undefined,
@@ -225,7 +261,12 @@ export default function RecordsPage() {
       })
       setRecords(res.data.items)
       setHasMore(res.data.has_more)
-      setUsageEstimate(res.data.total)
+      setCursors((prev) => {
+        const next = options?.resetPage ? [null] : prev.slice(0, targetPage + 1)
+        next[targetPage + 1] = res.data.next_cursor
+        return next
+      })
+      if (res.data.total !== null) setUsageEstimate(res.data.total)
     } catch (err) {
       const status = (err as AxiosError)?.response?.status
       if (status === 401) {
@@ -286,7 +327,7 @@ export default function RecordsPage() {
       fetchRecords(model.id, { resetPage: true })
     }
     // eslint-disable-next-line react-hooks/exhaustive-deps
-  }, [model?.id, sortBy, sortOrder, filterKey, filterValue, pageSize])
+  }, [model?.id, query, projectedSlugs, sortBy, sortOrder, filterKey, filterValue, pageSize])
 
   useEffect(() => {
     if (model?.id) {
@@ -311,9 +352,16 @@ export default function RecordsPage() {
     }
   }
 
-  const startEditing = (record: RecordRow) => {
-    setEditingId(record.id)
-    setEditingData(record.data)
+  const startEditing = async (record: RecordRow) => {
+    setError('')
+    try {
+      // Rows may only hold the visible columns; saving replaces the whole document.
+      const res = await api.get<RecordRow>(`/records/${record.id}`)
+      setEditingId(record.id)
+      setEditingData(res.data.data)
+    } catch (err) {
+      setError('Unable to load record')
+    }
   }
 
   const saveEdit = async () => {
@@ -380,6 +428,7 @@ export default function RecordsPage() {
               onChange={(e) => setSortBy(e.target.value || null)}
               className="bg-slate-900 border border-slate-800 rounded-lg px-3 py-2"
             >
+              {search.trim() && <option value="">Sort by relevance</option>}
               <option value="created_at">Sort by created</option>
               <option value="updated_at">Sort by updated</option>
               {model?.fields.map((field) => (
@@ -420,6 +469,23 @@ export default function RecordsPage() {
             )}
           </div>
           <div className="flex items-center gap-2">
+            <details className="relative">
+              <summary className="cursor-pointer bg-slate-900 border border-slate-800 rounded-lg px-3 py-2 text-sm">
+                Columns ({visibleFields.length}/{model?.fields.length || 0})
+              </summary>
+              <div className="absolute right-0 z-10 mt-2 w-56 space-y-1 bg-slate-900 border border-slate-800 rounded-lg p-3">
+                {model?.fields.map((field) => (
+                  <label key={field.id} className="flex items-center gap-2 text-sm text-slate-300">
+                    <input
+                      type="checkbox"
+                      checked={!hiddenSlugs.includes(field.slug)}
+                      onChange={() => toggleColumn(field.slug)}
+                    />
+                    {field.name}
+                  </label>
+                ))}
+              </div>
+            </details>
             <label className="text-sm text-slate-400">Page size</label>
             <select
               value={pageSize}
@@ -475,7 +541,7 @@ export default function RecordsPage() {
           <table className="min-w-full text-sm">
             <thead className="bg-slate-900/60 border-b border-slate-800">
               <tr>
-                {model?.fields.map((field) => (
+                {visibleFields.map((field) => (
                   <th key={field.id} className="px-4 py-3 text-left text-slate-300">
                     {field.name}
                   </th>
@@ -486,9 +552,9 @@ export default function RecordsPage() {
               </tr>
             </thead>
             <tbody>
-              {displayRecords.map((record) => (
+              {records.map((record) => (
                 <tr key={record.id} className="border-b border-slate-900/60 hover:bg-slate-900/40">
-                  {model?.fields.map((field) => (
+                  {visibleFields.map((field) => (
                     <td key={field.id} className="px-4 py-3 align-top">
                       {editingId === record.id ? (
                         <FieldInput
@@ -497,7 +563,7 @@ export default function RecordsPage() {
                           onChange={(val) => setEditingData((prev) => ({ ...prev, [field.slug]: val }))}
                         />
                       ) : (
-                        <span className="text-slate-200">{fieldValue(record.data[field.slug], field)}</span>
+                        <span className="text-slate-200">{fieldValue(record.data[field.slug], field, record.expanded?.[field.slug])}</span>
                       )}
                     </td>
                   ))}
@@ -528,9 +594,9 @@ export default function RecordsPage() {
                   </td>
                 </tr>
               ))}
-              {!displayRecords.length && (
+              {!records.length && (
                 <tr>
-                  <td colSpan={(model?.fields.length || 0) + 3} className="px-4 py-6 text-center text-slate-400">
+                  <td colSpan={visibleFields.length + 3} className="px-4 py-6 text-center text-slate-400">
                     No records yet. Create your first one.
                   </td>
                 </tr>
@@ -550,7 +616,7 @@ export default function RecordsPage() {
             </button>
             <span className="text-sm text-slate-300">Page {page + 1}</span>
             <button
-              disabled={!hasMore}
+              disabled={!hasMore || !cursors[page + 1]}
               onClick={() => setPage((p) => p + 1)}
               className="border border-slate-800 px-3 py-2 rounded disabled:opacity-50"
             >
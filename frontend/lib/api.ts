@@ -31,10 +31,12 @@ api.interceptors.response.use(
  * Common API response helpers
  *
  * - GET /models/:modelId/records returns a paginated object with the queried items,
- *   the total count for the applied filters, and a has_more flag for pagination.
+ *   a has_more flag, and an opaque next_cursor to pass back as `cursor` for the next page.
+ *   The total count for the applied filters is only computed when `include_total=true`.
  */
 export interface PaginatedRecordsResponse<T> {
   items: T[]
-  total: number
+  total: number | null
   has_more: boolean
+  next_cursor: string | null
 }